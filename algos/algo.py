@@ -1,10 +1,15 @@
-import copy
 from utils.Solution import Solution
 from utils.Shape import Shape
+from utils.ShapeCatalog import ShapeCatalog
 from utils.Container import Container
+from utils.ContainerContext import ContainerContext
+from utils.Instrumentation import INSTRUMENTATION
+from utils.NFPCache import NFPCache
 from enum import Enum
 import random
-from shapely.geometry import Polygon, Point
+import time
+import numpy as np
+from shapely.geometry import Polygon
 
 random.seed(0)
 
@@ -26,21 +31,34 @@ class FindPositionClassification(Enum):
     BOTTOM_RIGHT = "bottom_right"
     TOP_RIGHT = "top_right"
 
+# For each corner: the x and y steps pointing away from it, and the order in which candidate offsets are tried
+POSITION_ORDERS = {
+    FindPositionClassification.BOTTOM_LEFT: ((1, 1), lambda xs, ys: np.lexsort((xs, ys))),  # Sort by y, then by x
+    FindPositionClassification.TOP_LEFT: ((1, -1), lambda xs, ys: np.lexsort((xs, -ys))),  # Sort by descending y, then by x
+    FindPositionClassification.TOP_RIGHT: ((-1, -1), lambda xs, ys: np.lexsort((-ys, -xs))),  # Sort by descending x, then by descending y
+    FindPositionClassification.BOTTOM_RIGHT: ((-1, 1), lambda xs, ys: np.lexsort((ys, -xs))),  # Sort by descending x, then by y
+}
+# Number of ordered candidates checked exactly per batch
+CANDIDATE_BATCH_SIZE = 8
+
 class Algo:
     """
     Base class for algorithms involving shapes and containers.
 
     Attributes:
-        Shapes (list[Shape]): List of shapes to be packed.
+        Shapes (ShapeCatalog): The catalog of shapes to be packed.
         Container (Container): The container in which the shapes should be packed.
         TriesOnRandomCreation (int): Number of tries allowed for random solution creation.
+        Container_Context (ContainerContext): The container's cached geometry, built once per run.
+        NFP_Cache (NFPCache): Cache of the no-fit polygons between the shapes' geometries and of their inner-fit regions.
+        Deadline (float): The time.time() time after which solutions are no longer extended, or None for no deadline.
     """
-    def __init__(self, shapes: list[Shape], cont: Container, tries_on_random_creation: int = 100,instance_name: str = ""):
+    def __init__(self, shapes: ShapeCatalog, cont: Container, tries_on_random_creation: int = 100,instance_name: str = ""):
         """
         Initializes the Algo class with shapes, container, and number of tries for random creation.
 
         Args:
-            shapes (list[Shape]): List of shapes to be packed.
+            shapes (ShapeCatalog): The catalog of shapes to be packed.
             cont (Container): The container in which the shapes should be packed.
             tries_on_random_creation (int): Number of tries allowed for random solution creation.
             instance_name (str): The name of the instance for identification.
@@ -49,6 +67,18 @@ class Algo:
         self.Container = cont
         self.TriesOnRandomCreation = tries_on_random_creation
         self.Instance_Name = instance_name
+        self.Container_Context = ContainerContext(cont)
+        self.NFP_Cache = NFPCache(self.Container_Context)
+        self.Deadline = None
+
+    def is_time_up(self) -> bool:
+        """
+        Checks whether the deadline has passed. Placement loops check it between shapes and stop early, keeping what they placed.
+
+        Returns:
+            bool: True if there is a deadline and it has passed, False otherwise.
+        """
+        return self.Deadline is not None and time.time() >= self.Deadline
 
     def sort_shapes_by_value(self, shapes_list) -> list[Shape]:
         """
@@ -60,8 +90,7 @@ class Algo:
         Returns:
             list[Shape]: A new list of shapes sorted by value.
         """
-        shapes_copy = copy.deepcopy(shapes_list)
-        return sorted(shapes_copy, key=lambda s: s.Value, reverse=True)
+        return self.Shapes.sort_shapes(shapes_list, "value")
 
     def sort_shapes_by_real_value(self, shapes_list) -> list[Shape]:
         """
@@ -73,8 +102,7 @@ class Algo:
         Returns:
             list[Shape]: A new list of shapes sorted by real value.
         """
-        shapes_copy = copy.deepcopy(shapes_list)
-        return sorted(shapes_copy, key=lambda s: s.real_value, reverse=True)
+        return self.Shapes.sort_shapes(shapes_list, "real_value")
 
     def sort_shapes_by_area(self, shapes_list) -> list[Shape]:
         """
@@ -86,22 +114,21 @@ class Algo:
         Returns:
             list[Shape]: A new list of shapes sorted by area.
         """
-        shapes_copy = copy.deepcopy(shapes_list)
-        return sorted(shapes_copy, key=lambda s: s.get_area())
+        return self.Shapes.sort_shapes(shapes_list, "area")
 
-    def shuffle_shape_list(self, shapes_list) -> list[Shape]:
+    def shuffle_shape_list(self, shapes_list, rng=random) -> list[Shape]:
         """
         Shuffles the list of shapes randomly.
 
         Args:
             shapes_list (list[Shape]): List of shapes to be shuffled.
+            rng: The random number generator to use.
 
         Returns:
             list[Shape]: A new list of shuffled shapes.
         """
-        shapes_copy = copy.deepcopy(shapes_list)
-        shuffled = shapes_copy[:]
-        random.shuffle(shuffled)
+        shuffled = list(shapes_list)
+        rng.shuffle(shuffled)
         return shuffled
 
     def sort_by_perimeter(self, shapes_list) -> list[Shape]:
@@ -114,8 +141,7 @@ class Algo:
         Returns:
             list[Shape]: A new list of shapes sorted by perimeter.
         """
-        shapes_copy = copy.deepcopy(shapes_list)
-        return sorted(shapes_copy, key=lambda s: s.get_perimeter())
+        return self.Shapes.sort_shapes(shapes_list, "perimeter")
 
     def find_ranges(self, s: Shape) -> tuple[int, int, int, int]:
         """
@@ -127,15 +153,9 @@ class Algo:
         Returns:
             tuple[int, int, int, int]: The minimum and maximum x and y offsets within which the shape can be placed.
         """
-        min_shape_x = min(s.X_cor)
-        max_shape_x = max(s.X_cor)
-        min_shape_y = min(s.Y_cor)
-        max_shape_y = max(s.Y_cor)
+        min_shape_x, min_shape_y, max_shape_x, max_shape_y = s.Prototype.Bounds
 
-        min_container_x = min(self.Container.X_cor)
-        max_container_x = max(self.Container.X_cor)
-        min_container_y = min(self.Container.Y_cor)
-        max_container_y = max(self.Container.Y_cor)
+        min_container_x, min_container_y, max_container_x, max_container_y = self.Container_Context.Bounds
 
         min_x = min_container_x - min_shape_x
         max_x = max_container_x - max_shape_x
@@ -144,39 +164,54 @@ class Algo:
 
         return min_x, min_y, max_x, max_y
 
-    def create_random_offset_solution(self, shapes_list) -> Solution:
+    def create_random_offset_solution(self, shapes_list, rng=random) -> Solution:
         """
         Creates a solution by placing shapes at random offsets within the container.
 
+        Offsets are sampled uniformly from each shape's inner-fit region, so every sample keeps the shape inside the container.
+
         Args:
             shapes_list (list[Shape]): List of shapes to be placed.
+            rng: The random number generator to use for the order of the shapes and their offsets.
 
         Returns:
             Solution: A solution containing the placed shapes.
         """
-        s = Solution(TYPE, self.Instance_Name, META, self.Container, [])
-        solution_shapes_list = self.shuffle_shape_list(shapes_list)
+        s = Solution(TYPE, self.Instance_Name, META, self.Container, [], self.Container_Context)
+        solution_shapes_list = self.shuffle_shape_list(shapes_list, rng)
 
         for shape in solution_shapes_list:
-            min_x, min_y, max_x, max_y = self.find_ranges(shape)
+            if self.is_time_up():
+                break
+            inner_fit_region = self.NFP_Cache.get_inner_fit_region(shape)
 
             for i in range(self.TriesOnRandomCreation):
-                x_sample = random.randint(min_x, max_x)
-                y_sample = random.randint(min_y, max_y)
-                shape.X_offset = x_sample
-                shape.Y_offset = y_sample
-                s.Shapes.append(shape)
-
-                ans = s.is_valid()
-                if ans:
+                x_sample, y_sample = inner_fit_region.sample(rng)
+                if x_sample is None:
+                    break
+                if s.can_place(shape, x_sample, y_sample):
+                    s.add_shape(shape, x_sample, y_sample)
                     break
-                else:
-                    shape.X_offset = 0
-                    shape.Y_offset = 0
-                    s.Shapes.remove(shape)
 
         return s
 
+    def create_solution_from_placement(self, placement: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]) -> Solution:
+        """
+        Rebuilds a solution from the compact placement of its shapes, as returned by Solution.get_placement.
+
+        Args:
+            placement (tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]): The prototype ids, copy numbers, x offsets and
+                y offsets of the placed shapes.
+
+        Returns:
+            Solution: The solution holding the shapes at their offsets.
+        """
+        prototype_ids, copies, x_offsets, y_offsets = placement
+        shapes = [Shape(self.Shapes.Prototypes[prototype_id], copy_number, x_offset, y_offset)
+                  for prototype_id, copy_number, x_offset, y_offset
+                  in zip(prototype_ids.tolist(), copies.tolist(), x_offsets.tolist(), y_offsets.tolist())]
+        return Solution(TYPE, self.Instance_Name, META, self.Container, shapes, self.Container_Context)
+
     def create_bottom_left_solution(self, sorted_shapes) -> Solution:
         """
         Creates a solution by placing shapes starting from the bottom-left corner of the container.
@@ -187,8 +222,10 @@ class Algo:
         Returns:
             Solution: A solution containing the placed shapes.
         """
-        s = Solution(TYPE, self.Instance_Name, META, self.Container, [])
+        s = Solution(TYPE, self.Instance_Name, META, self.Container, [], self.Container_Context)
         for shape in sorted_shapes:
+            if self.is_time_up():
+                break
             self.find_bottom_left_position(shape, s)
         return s
 
@@ -202,8 +239,10 @@ class Algo:
         Returns:
             Solution: A solution containing the placed shapes.
         """
-        s = Solution(TYPE, self.Instance_Name, META, self.Container, [])
+        s = Solution(TYPE, self.Instance_Name, META, self.Container, [], self.Container_Context)
         for shape in sorted_shapes:
+            if self.is_time_up():
+                break
             self.find_top_left_position(shape, s)
         return s
 
@@ -217,8 +256,10 @@ class Algo:
         Returns:
             Solution: A solution containing the placed shapes.
         """
-        s = Solution(TYPE, self.Instance_Name, META, self.Container, [])
+        s = Solution(TYPE, self.Instance_Name, META, self.Container, [], self.Container_Context)
         for shape in sorted_shapes:
+            if self.is_time_up():
+                break
             self.find_top_right_position(shape, s)
         return s
 
@@ -232,61 +273,75 @@ class Algo:
         Returns:
             Solution: A solution containing the placed shapes.
         """
-        s = Solution(TYPE, self.Instance_Name, META, self.Container, [])
+        s = Solution(TYPE, self.Instance_Name, META, self.Container, [], self.Container_Context)
         for shape in sorted_shapes:
+            if self.is_time_up():
+                break
             self.find_bottom_right_position(shape, s)
         return s
 
-    def find_bottom_left_position(self, shape: Shape, curr_solution: Solution) -> tuple[int, int]:
+    def find_position(self, shape: Shape, curr_solution: Solution, classification: FindPositionClassification) -> tuple[int, int]:
         """
-        Finds the best bottom-left position for a shape within the current solution.
+        Places a shape at the feasible position closest to the corner given by the classification.
+
+        The candidate positions are the vertices of the shape's feasible region, computed from the no-fit polygons of the
+        shapes already placed, so only a handful of them need an exact check. Candidates are generated and filtered in one
+        vectorized pass, then checked exactly in small ordered batches until one fits.
+
+        The search is skipped if it already failed from the same corner for a shape of the same geometry in the same or a fuller
+        layout, and a failure is recorded in the solution for the shape's identical copies. This is a heuristic, since the new
+        vertices of a fuller layout could offer a position the earlier search did not try.
 
         Args:
             shape (Shape): The shape to be placed.
             curr_solution (Solution): The current solution to which the shape will be added.
+            classification (FindPositionClassification): The corner to place the shape closest to.
 
         Returns:
             tuple[int, int]: The x and y offsets for placing the shape, or (None, None) if no valid position is found.
         """
-        min_x = min(self.Container.X_cor)
-        real_min_y = min(self.Container.Y_cor)
-        y_of_min_x = max(self.Container.Y_cor)
-        for x, y in zip(self.Container.X_cor, self.Container.Y_cor):
-            if x == min_x and y < y_of_min_x:
-                y_of_min_x = y
-        shape_width = max(shape.X_cor) - min(shape.X_cor)
-        shape_height = max(shape.Y_cor) - min(shape.Y_cor)
-        candidate_positions = [(min_x, real_min_y), (min_x + shape_width, y_of_min_x + shape_height)]  # Start with the bottom-left corner
-        for located_shape in curr_solution.Shapes:
-            poly = located_shape.create_polygon_object()
-            minx, miny, maxx, maxy = poly.bounds
-
-            candidate_positions.append((maxx + 1, miny + 1))  # Right of the shape
-            candidate_positions.append((minx + 1, maxy + 1))  # Above the shape
-
-        candidate_positions = sorted(set(candidate_positions), key=lambda pos: (pos[1], pos[0]))  # Sort by y, then by x
-
-        for x, y in candidate_positions:
-            candidate_point = Point(x, y)
-            for located_shape in curr_solution.Shapes:
-                poly = located_shape.create_polygon_object()
-                if poly.contains(candidate_point):
-                    continue
-            possible_x_offset = x - min(shape.X_cor)
-            possible_y_offset = y - min(shape.Y_cor)
-            shape.X_offset = possible_x_offset
-            shape.Y_offset = possible_y_offset
-            curr_solution.Shapes.append(shape)
-            is_valid = curr_solution.is_valid()
-            if is_valid:
+        event = f"find_{classification.value}_position"
+        INSTRUMENTATION.count(f"{event}.calls")
+        if curr_solution.is_known_misfit(shape, classification.value):
+            INSTRUMENTATION.count(f"{event}.known_misfits")
+            return None, None
+        direction, order = POSITION_ORDERS[classification]
+        # Aligning the shape's corner with the container's anchor vertex is the natural first position
+        anchor_x, anchor_y = self.Container_Context.Anchors[classification.value]
+        min_shape_x, min_shape_y, max_shape_x, max_shape_y = shape.Prototype.Bounds
+        anchor_offset = (anchor_x - (min_shape_x if direction[0] > 0 else max_shape_x), anchor_y - (min_shape_y if direction[1] > 0 else max_shape_y))
+        candidate_xs, candidate_ys = self.NFP_Cache.find_feasible_positions(shape, curr_solution, direction, [anchor_offset])
+        candidate_order = order(candidate_xs, candidate_ys)
+        candidate_xs, candidate_ys = candidate_xs[candidate_order], candidate_ys[candidate_order]
+        INSTRUMENTATION.count(f"{event}.candidates_generated", len(candidate_xs))
+
+        for start in range(0, len(candidate_xs), CANDIDATE_BATCH_SIZE):
+            batch_xs = candidate_xs[start:start + CANDIDATE_BATCH_SIZE]
+            batch_ys = candidate_ys[start:start + CANDIDATE_BATCH_SIZE]
+            INSTRUMENTATION.count(f"{event}.candidates_tested", len(batch_xs))
+            feasible = np.flatnonzero(curr_solution.can_place_many(shape, batch_xs, batch_ys))
+            if len(feasible):
+                possible_x_offset, possible_y_offset = int(batch_xs[feasible[0]]), int(batch_ys[feasible[0]])
+                curr_solution.add_shape(shape, possible_x_offset, possible_y_offset)
+                INSTRUMENTATION.count(f"{event}.candidates_accepted")
                 return possible_x_offset, possible_y_offset
-            else:
-                shape.X_offset = 0
-                shape.Y_offset = 0
-                curr_solution.Shapes.remove(shape)
 
+        curr_solution.record_misfit(shape, classification.value)
         return None, None
 
+    def find_bottom_left_position(self, shape: Shape, curr_solution: Solution) -> tuple[int, int]:
+        """
+        Finds the best bottom-left position for a shape within the current solution.
+
+        Args:
+            shape (Shape): The shape to be placed.
+            curr_solution (Solution): The current solution to which the shape will be added.
+
+        Returns:
+            tuple[int, int]: The x and y offsets for placing the shape, or (None, None) if no valid position is found.
+        """
+        return self.find_position(shape, curr_solution, FindPositionClassification.BOTTOM_LEFT)
+
     def find_top_left_position(self, shape: Shape, curr_solution: Solution) -> tuple[int, int]:
         """
         Finds the best top-left position for a shape within the current solution.
@@ -298,43 +353,7 @@ class Algo:
         Returns:
             tuple[int, int]: The x and y offsets for placing the shape, or (None, None) if no valid position is found.
         """
-        min_x = min(self.Container.X_cor)
-        real_max_y = max(self.Container.Y_cor)
-        y_of_min_x = min(self.Container.Y_cor)
-        for x, y in zip(self.Container.X_cor, self.Container.Y_cor):
-            if x == min_x and y > y_of_min_x:
-                y_of_min_x = y
-        shape_width = max(shape.X_cor) - min(shape.X_cor)
-        shape_height = max(shape.Y_cor) - min(shape.Y_cor)
-        candidate_positions = [(min_x, real_max_y), (min_x + shape_width, y_of_min_x - shape_height)]
-        for located_shape in curr_solution.Shapes:
-            poly = located_shape.create_polygon_object()
-            minx, miny, maxx, maxy = poly.bounds
-            candidate_positions.append((maxx + 1, maxy - 1))  # Right of the shape
-            candidate_positions.append((minx + 1, miny - 1))  # Below the shape
-
-        candidate_positions = sorted(set(candidate_positions), key=lambda pos: (pos[1], pos[0]), reverse=True)  # Sort by y, then by x
-
-        for x, y in candidate_positions:
-            candidate_point = Point(x, y)
-            for located_shape in curr_solution.Shapes:
-                poly = located_shape.create_polygon_object()
-                if poly.contains(candidate_point):
-                    continue
-            possible_x_offset = x - min(shape.X_cor)
-            possible_y_offset = y - max(shape.Y_cor)
-            shape.X_offset = possible_x_offset
-            shape.Y_offset = possible_y_offset
-            curr_solution.Shapes.append(shape)
-            is_valid = curr_solution.is_valid()
-            if is_valid:
-                return possible_x_offset, possible_y_offset
-            else:
-                shape.X_offset = 0
-                shape.Y_offset = 0
-                curr_solution.Shapes.remove(shape)
-
-        return None, None
+        return self.find_position(shape, curr_solution, FindPositionClassification.TOP_LEFT)
 
     def find_top_right_position(self, shape: Shape, curr_solution: Solution) -> tuple[int, int]:
         """
@@ -347,43 +366,7 @@ class Algo:
         Returns:
             tuple[int, int]: The x and y offsets for placing the shape, or (None, None) if no valid position is found.
         """
-        max_y = max(self.Container.Y_cor)
-        real_max_x = max(self.Container.X_cor)
-        x_of_max_y = min(self.Container.X_cor)
-        for x, y in zip(self.Container.X_cor, self.Container.Y_cor):
-            if y == max_y and x > x_of_max_y:
-                x_of_max_y = x
-        shape_width = max(shape.X_cor) - min(shape.X_cor)
-        shape_height = max(shape.Y_cor) - min(shape.Y_cor)
-        candidate_positions = [(real_max_x, max_y), (x_of_max_y - shape_width, max_y - shape_height)]
-        for located_shape in curr_solution.Shapes:
-            poly = located_shape.create_polygon_object()
-            minx, miny, maxx, maxy = poly.bounds
-            candidate_positions.append((minx - 1, maxy - 1))  # Left of the shape
-            candidate_positions.append((maxx - 1, miny - 1))  # Below the shape
-
-        candidate_positions = sorted(set(candidate_positions), key=lambda pos: (pos[0], pos[1]), reverse=True)  # Sort by x, then by y
-
-        for x, y in candidate_positions:
-            candidate_point = Point(x, y)
-            for located_shape in curr_solution.Shapes:
-                poly = located_shape.create_polygon_object()
-                if poly.contains(candidate_point):
-                    continue
-            possible_x_offset = x - max(shape.X_cor)
-            possible_y_offset = y - max(shape.Y_cor)
-            shape.X_offset = possible_x_offset
-            shape.Y_offset = possible_y_offset
-            curr_solution.Shapes.append(shape)
-            is_valid = curr_solution.is_valid()
-            if is_valid:
-                return possible_x_offset, possible_y_offset
-            else:
-                shape.X_offset = 0
-                shape.Y_offset = 0
-                curr_solution.Shapes.remove(shape)
-
-        return None, None
+        return self.find_position(shape, curr_solution, FindPositionClassification.TOP_RIGHT)
 
     def find_bottom_right_position(self, shape: Shape, curr_solution: Solution) -> tuple[int, int]:
         """
@@ -396,71 +379,77 @@ class Algo:
         Returns:
             tuple[int, int]: The x and y offsets for placing the shape, or (None, None) if no valid position is found.
         """
-        min_y = min(self.Container.Y_cor)
-        real_max_x = max(self.Container.X_cor)
-        x_of_min_y = min(self.Container.X_cor)
-        for x, y in zip(self.Container.X_cor, self.Container.Y_cor):
-            if y == min_y and x > x_of_min_y:
-                x_of_min_y = x
-        shape_width = max(shape.X_cor) - min(shape.X_cor)
-        shape_height = max(shape.Y_cor) - min(shape.Y_cor)
-        candidate_positions = [(real_max_x, min_y), (x_of_min_y - shape_width, min_y + shape_height)]
-        for located_shape in curr_solution.Shapes:
-            poly = located_shape.create_polygon_object()
-            minx, miny, maxx, maxy = poly.bounds
-            candidate_positions.append((minx - 1, miny + 1))  # Left of the shape
-            candidate_positions.append((maxx - 1, maxy + 1))  # Above the shape
-
-        candidate_positions = sorted(set(candidate_positions), key=lambda pos: (pos[0], pos[1]), reverse=True)  # Sort by x, then by y
-
-        for x, y in candidate_positions:
-            candidate_point = Point(x, y)
-            for located_shape in curr_solution.Shapes:
-                poly = located_shape.create_polygon_object()
-                if poly.contains(candidate_point):
-                    continue
-            possible_x_offset = x - max(shape.X_cor)
-            possible_y_offset = y - min(shape.Y_cor)
-            shape.X_offset = possible_x_offset
-            shape.Y_offset = possible_y_offset
-            curr_solution.Shapes.append(shape)
-            is_valid = curr_solution.is_valid()
-            if is_valid:
-                return possible_x_offset, possible_y_offset
-            else:
-                shape.X_offset = 0
-                shape.Y_offset = 0
-                curr_solution.Shapes.remove(shape)
+        return self.find_position(shape, curr_solution, FindPositionClassification.BOTTOM_RIGHT)
 
-        return None, None
+    def slide_shape(self, solution: Solution, shape: Shape, direction: tuple[int, int]) -> None:
+        """
+        Slides a shape of a solution along an axis as far as it can go while keeping the solution valid.
 
-    def push_shapes_left(self, solution: Solution) -> Solution:
+        The exact slide distance is confirmed with can_place. If the shape touches the container's boundary in a way the distance
+        calculation does not stop at, the distance is instead found by binary search up to the calculated one.
+
+        Args:
+            solution (Solution): The solution holding the shape. It is modified in place.
+            shape (Shape): The shape to slide.
+            direction (tuple[int, int]): The direction to slide in, one of (1, 0), (-1, 0), (0, 1) and (0, -1).
+        """
+        x_sign, y_sign = direction
+        INSTRUMENTATION.count("push_shapes.slides")
+        distance = solution.get_slide_distance(shape, direction)
+        if distance == 0:
+            return
+        x_offset, y_offset = shape.X_offset, shape.Y_offset
+        if solution.can_place(shape, x_offset + x_sign * distance, y_offset + y_sign * distance):
+            solution.move_shape(shape, x_offset + x_sign * distance, y_offset + y_sign * distance)
+            return
+
+        INSTRUMENTATION.count("push_shapes.binary_searches")
+        low, high = 0, distance - 1
+        while low < high:
+            INSTRUMENTATION.count("push_shapes.binary_search_probes")
+            sample = (low + high + 1) // 2
+            if solution.can_place(shape, x_offset + x_sign * sample, y_offset + y_sign * sample):
+                low = sample
+            else:
+                high = sample - 1
+        if low > 0:
+            solution.move_shape(shape, x_offset + x_sign * low, y_offset + y_sign * low)
+
+    def push_shapes(self, solution: Solution, direction: tuple[int, int]) -> Solution:
         """
-        Mutates a solution by pushing shapes to the left as much as possible while maintaining validity.
+        Mutates a solution by sliding its shapes as far as possible in one direction, starting with the shapes closest to the
+        side of the container they are pushed towards.
 
         Args:
             solution (Solution): The current solution to mutate.
+            direction (tuple[int, int]): The direction to push in, one of (1, 0), (-1, 0), (0, 1) and (0, -1).
 
         Returns:
-            Solution: The mutated solution with shapes pushed to the left.
+            Solution: The mutated solution with shapes pushed in the given direction.
         """
-        mutated_solution = copy.deepcopy(solution)
-        solution_shapes_sorted = sorted(mutated_solution.Shapes, key=lambda s: min(s.get_real_coords()[0]))
+        mutated_solution = solution.clone()
+        x_sign, y_sign = direction
+        axis = 0 if x_sign else 1
+        sign = x_sign or y_sign
+        solution_shapes_sorted = sorted(mutated_solution.Shapes, key=lambda s: s.get_bounds()[axis], reverse=sign > 0)
 
         for shape in solution_shapes_sorted:
-            left_limit = min(solution.Container.X_cor)
-            right_limit = min(shape.get_real_coords()[0])
-            while left_limit + 0.5 < right_limit - 0.5:
-                sample_x = (left_limit + right_limit) // 2
-                original_x_offset = shape.X_offset
-                shape.X_offset += sample_x - right_limit
-                if mutated_solution.is_valid():
-                    right_limit = sample_x
-                else:
-                    shape.X_offset = original_x_offset
-                    left_limit = sample_x
+            if self.is_time_up():
+                break
+            self.slide_shape(mutated_solution, shape, direction)
         return mutated_solution
 
+    def push_shapes_left(self, solution: Solution) -> Solution:
+        """
+        Mutates a solution by pushing shapes to the left as much as possible while maintaining validity.
+
+        Args:
+            solution (Solution): The current solution to mutate.
+
+        Returns:
+            Solution: The mutated solution with shapes pushed to the left.
+        """
+        return self.push_shapes(solution, (-1, 0))
 
     def push_shapes_down(self, solution: Solution) -> Solution:
         """
@@ -472,23 +461,7 @@ class Algo:
         Returns:
             Solution: The mutated solution with shapes pushed down.
         """
-        mutated_solution = copy.deepcopy(solution)
-        solution_shapes_sorted = sorted(mutated_solution.Shapes, key=lambda s: min(s.get_real_coords()[1]))
-
-        for shape in solution_shapes_sorted:
-            bottom_limit = min(solution.Container.Y_cor)
-            top_limit = min(shape.get_real_coords()[1])
-            while bottom_limit + 0.5 < top_limit - 0.5:
-                sample_y = (bottom_limit + top_limit) // 2
-                original_y_offset = shape.Y_offset
-                shape.Y_offset += sample_y - top_limit
-                if mutated_solution.is_valid():
-                    top_limit = sample_y
-                else:
-                    shape.Y_offset = original_y_offset
-                    bottom_limit = sample_y
-
-        return mutated_solution
+        return self.push_shapes(solution, (0, -1))
 
     def push_shapes_up(self, solution: Solution) -> Solution:
         """
@@ -500,23 +473,7 @@ class Algo:
         Returns:
             Solution: The mutated solution with shapes pushed up.
         """
-        mutated_solution = copy.deepcopy(solution)
-        solution_shapes_sorted = sorted(mutated_solution.Shapes, key=lambda s: min(s.get_real_coords()[1]), reverse=True)
-
-        for shape in solution_shapes_sorted:
-            top_limit = max(solution.Container.Y_cor)
-            bottom_limit = max(shape.get_real_coords()[1])
-            while bottom_limit + 0.5 < top_limit - 0.5:
-                sample_y = (bottom_limit + top_limit) // 2
-                original_y_offset = shape.Y_offset
-                shape.Y_offset += sample_y - bottom_limit
-                if mutated_solution.is_valid():
-                    bottom_limit = sample_y
-                else:
-                    shape.Y_offset = original_y_offset
-                    top_limit = sample_y
-
-        return mutated_solution
+        return self.push_shapes(solution, (0, 1))
 
     def push_shapes_right(self, solution: Solution) -> Solution:
         """
@@ -528,22 +485,7 @@ class Algo:
         Returns:
             Solution: The mutated solution with shapes pushed to the right.
         """
-        mutated_solution = copy.deepcopy(solution)
-        solution_shapes_sorted = sorted(mutated_solution.Shapes, key=lambda s: min(s.get_real_coords()[0]), reverse=True)
-
-        for shape in solution_shapes_sorted:
-            right_limit = max(solution.Container.X_cor)
-            left_limit = max(shape.get_real_coords()[0])
-            while left_limit + 0.5 < right_limit - 0.5:
-                sample_x = (left_limit + right_limit) // 2
-                original_x_offset = shape.X_offset
-                shape.X_offset += sample_x - left_limit
-                if mutated_solution.is_valid():
-                    left_limit = sample_x
-                else:
-                    shape.X_offset = original_x_offset
-                    right_limit = sample_x
-        return mutated_solution
+        return self.push_shapes(solution, (1, 0))
 
     def fit_remaining_shapes_in_solution(self, solution: Solution, classification: FindPositionClassification) -> Solution:
         """
@@ -556,14 +498,15 @@ class Algo:
         Returns:
             Solution: The solution with as many remaining shapes as possible fit in.
         """
-        solution_copy = copy.deepcopy(solution)
-        solution_shape_ids = [shape.Index for shape in solution_copy.Shapes]
-        remaining_shapes = [shape for shape in self.Shapes if shape.Index not in solution_shape_ids]
-        remaining_shapes = self.sort_shapes_by_value(remaining_shapes)
+        solution_copy = solution.clone()
+        remaining_shapes = [shape for shape in self.sort_shapes_by_value(self.Shapes) if shape not in solution_copy]
 
         for shape in remaining_shapes:
-            remaining_area = solution_copy.get_remaining_area_in_container()
-            if shape.get_area() > remaining_area:
+            if self.is_time_up():
+                break
+            # Shapes too large for every connected part of the free space are skipped without a search
+            if not solution_copy.can_fit(shape):
+                INSTRUMENTATION.count("fit_remaining_shapes.pruned")
                 continue
             if classification == FindPositionClassification.BOTTOM_LEFT:
                 self.find_bottom_left_position(shape, solution_copy)
@@ -589,5 +532,4 @@ class Algo:
         Returns:
             Polygon: A Shapely Polygon object representing the shape.
         """
-        vertices = [(x + x_offset, y + y_offset) for x, y in zip(shape.X_cor, shape.Y_cor)]
-        return Polygon(vertices)
+        return shape.Prototype.get_polygon(x_offset, y_offset)
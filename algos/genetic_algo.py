@@ -1,15 +1,79 @@
+import json
 import logging
+import os
+import threading
 import time
 from tqdm import tqdm
 from .algo import Algo, FindPositionClassification
 from utils.Container import Container
 from utils.Shape import Shape
 from utils.Solution import Solution
+from utils.utils import save_npz_atomically, write_json_atomically
 import random
-from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from functools import partial
+from utils.ExecutionBackend import ExecutionBackend
+from utils.FitnessCache import FitnessCache
+from utils.Instrumentation import INSTRUMENTATION
+from utils.SharedCoordinateStore import SharedCoordinateStore
 
 random.seed(0)
 
+# The mutation strategies applied to every solution, in tie-breaking order
+MUTATIONS = ("mutate_left_down", "mutate_down_left", "mutate_up_left", "mutate_left_up",
+             "mutate_right_down", "mutate_down_right", "mutate_right_up", "mutate_up_right")
+# The construction heuristics that decode the shapes of every pair of parents, in tie-breaking order
+CROSSOVER_DECODERS = ("create_bottom_left_solution", "create_bottom_right_solution", "create_top_left_solution", "create_top_right_solution")
+
+# The structured events of a run, one per generation plus one at the start and end. Nothing is formatted unless a handler is
+# attached, as main.py does to write them to a JSON-lines file. They are kept out of the run log.
+TELEMETRY = logging.getLogger("telemetry")
+TELEMETRY.propagate = False
+
+# The GeneticAlgo of a worker process and the shared coordinate store it reads the instance from, set up by init_worker
+_worker_algo = None
+_worker_store = None
+
+
+def init_worker(store_descriptor: tuple, pop_size: int, gens: int, tries_on_random_creation: int, instance_name: str,
+                deadline: float = None, instrumentation: bool = False) -> None:
+    """
+    Initializes a worker process of the process backend from the instance in shared memory, so tasks only need to carry placements.
+
+    Args:
+        store_descriptor (tuple): The descriptor of the SharedCoordinateStore holding the instance.
+        pop_size (int): The size of the population.
+        gens (int): The number of generations to run.
+        tries_on_random_creation (int): Number of tries allowed for random solution creation.
+        instance_name (str): The name of the instance.
+        deadline (float): The time.time() time at which the run has to stop, or None.
+        instrumentation (bool): Whether the worker records instrumentation events.
+    """
+    global _worker_algo, _worker_store
+    INSTRUMENTATION.Enabled = instrumentation
+    _worker_store = SharedCoordinateStore.attach(store_descriptor)
+    _worker_algo = GeneticAlgo(_worker_store.build_catalog(), _worker_store.build_container(), pop_size, gens, tries_on_random_creation,
+                               instance_name)
+    _worker_algo.Deadline = deadline
+
+
+def run_in_worker(method_name: str, *args):
+    """
+    Calls a method of the worker's GeneticAlgo. Used as the task function of the process backend.
+    The events the task recorded are returned with its result, so the main process merges them as the task completes.
+
+    Args:
+        method_name (str): The name of the method to call.
+        *args: The arguments of the method.
+
+    Returns:
+        tuple: The method's return value, and the events the task recorded or None if instrumentation is disabled.
+    """
+    result = getattr(_worker_algo, method_name)(*args)
+    return result, INSTRUMENTATION.pop() if INSTRUMENTATION.Enabled else None
+
+
 class GeneticAlgo(Algo):
     """
     A class representing a genetic algorithm for solving the max packing polygons problem.
@@ -20,9 +84,24 @@ class GeneticAlgo(Algo):
         curr_generation (list[Solution]): Current generation of solutions.
         next_generation (list[Solution]): Next generation of solutions.
         instance_name (str): Name of the instance for logging purposes.
+        Backend_Kind (str): The kind of execution backend to run on: "serial", "thread" or "process".
+        Workers (int): The number of workers of the backend, or None for one per CPU.
+        Backend (ExecutionBackend): The execution backend of the current run, or None to evaluate tasks in this process.
+        Fitness_Cache (FitnessCache): The results of deterministic tasks, keyed by a fingerprint of the task, or None if caching is
+            disabled. It lives in this process, which dispatches the tasks of all workers.
+        Time_Limit (float): The wall-clock budget of a run in seconds, or None for no limit.
+        Output_Path (str): Where to write the best solution every time it improves, or None to not write it.
+        Best_Solution (Solution): The best solution found so far in the current run.
+        Checkpoint_Path (str): Where to save the population periodically, or None to not save it.
+        Checkpoint_Interval (int): The number of generations between checkpoints.
+        Resume (bool): Whether a run continues from the checkpoint at Checkpoint_Path, if there is one.
+        Busy_Time (float): The seconds the workers spent on tasks of the current generation, to measure their utilisation.
+        Busy_Time_Lock (threading.Lock): Guards Busy_Time, which tasks of the thread backend update from their threads.
     """
 
-    def __init__(self, shapes: list[Shape], cont: Container, pop_size: int, gens: int, tries_on_random_creation: int, instance_name: str):
+    def __init__(self, shapes: list[Shape], cont: Container, pop_size: int, gens: int, tries_on_random_creation: int, instance_name: str,
+                 backend: str = "process", workers: int = None, cache_size: int = 1024, time_limit: float = None, output_path: str = None,
+                 checkpoint_path: str = None, checkpoint_interval: int = 1, resume: bool = False):
         """
         Initializes the GeneticAlgo class with shapes, container, population size, number of generations, and instance name.
 
@@ -33,74 +112,379 @@ class GeneticAlgo(Algo):
             gens (int): The number of generations to run.
             tries_on_random_creation (int): Number of tries allowed for random solution creation.
             instance_name (str): The name of the instance for logging.
+            backend (str): The kind of execution backend to run on: "serial", "thread" or "process".
+            workers (int): The number of workers of the backend. Defaults to one per CPU.
+            cache_size (int): The maximum number of entries of the fitness cache, or 0 to disable it.
+            time_limit (float): The wall-clock budget of a run in seconds. Defaults to no limit.
+            output_path (str): Where to write the best solution every time it improves. Defaults to not writing it.
+            checkpoint_path (str): Where to save the population periodically. Defaults to not saving it.
+            checkpoint_interval (int): The number of generations between checkpoints.
+            resume (bool): Whether to continue from the checkpoint at checkpoint_path, if there is one.
         """
         super().__init__(shapes, cont, tries_on_random_creation, instance_name)
+        if checkpoint_interval < 1:
+            raise Exception("Checkpoint interval must be at least 1")
         if pop_size < 2:
             raise Exception("Population size must be at least 2")
         self.population_size = pop_size
         self.max_generations = gens
         self.curr_generation = []
         self.next_generation = []
+        self.Backend_Kind = backend
+        self.Workers = workers
+        self.Backend = None
+        self.Fitness_Cache = FitnessCache(cache_size) if cache_size > 0 else None
+        self.Time_Limit = time_limit
+        self.Output_Path = output_path
+        self.Best_Solution = None
+        self.Checkpoint_Path = checkpoint_path
+        self.Checkpoint_Interval = checkpoint_interval
+        self.Resume = resume
+        self.Busy_Time = 0.0
+        self.Busy_Time_Lock = threading.Lock()
 
     def run(self) -> Solution:
         """
-        Runs the genetic algorithm, generating solutions over multiple generations.
+        Runs the genetic algorithm on an execution backend that lives for the whole run.
+
+        If there is a time limit, the run stops when it is reached and returns the best solution found so far. Running tasks stop
+        placing shapes at the deadline and return what they placed, and every improvement is written to the output path as soon
+        as it is found.
+
+        With the process backend, the instance's geometry is placed in shared memory once, and each worker attaches to it when it
+        starts. After that, tasks and results only carry compact placements. If instrumentation is enabled, the events recorded
+        by each task come back with its result and are merged into this process's as it completes.
 
         Returns:
             Solution: The best solution found after running the algorithm.
         """
+        self.Deadline = time.time() + self.Time_Limit if self.Time_Limit is not None else None
+        self.Best_Solution = None
+        self.emit_event("run_start", instance=self.Instance_Name, items=len(self.Shapes), population_size=self.population_size,
+                        generations=self.max_generations, backend=self.Backend_Kind, time_limit=self.Time_Limit)
         start_time = time.time()
-        self.curr_generation = self.generate_base_gen()
-        end_time = time.time()
-        duration = end_time - start_time
-        max_sol = max(self.curr_generation, key=lambda s: s.grade())
-        logging.info(f"Base generation completed in {duration:.3f} seconds\nBest solution with value: {max_sol.grade()}")
+        store = SharedCoordinateStore.create(self.Shapes, self.Container) if self.Backend_Kind == "process" else None
+        try:
+            initargs = (store.get_descriptor() if store else None, self.population_size, self.max_generations, self.TriesOnRandomCreation,
+                        self.Instance_Name, self.Deadline, INSTRUMENTATION.Enabled)
+            with ExecutionBackend(self.Backend_Kind, self.Workers, init_worker, initargs) as backend:
+                self.Backend = backend
+                try:
+                    solution = self.run_generations()
+                finally:
+                    self.Backend = None
+            self.emit_event("run_end", instance=self.Instance_Name, best_grade=solution.grade(), items_placed=len(solution),
+                            duration=round(time.time() - start_time, 3))
+            return solution
+        finally:
+            if store:
+                store.close()
+
+    def run_generations(self) -> Solution:
+        """
+        Generates solutions over multiple generations.
+
+        Returns:
+            Solution: The best solution found.
+        """
+        if self.Resume and self.Checkpoint_Path is not None and os.path.exists(self.Checkpoint_Path):
+            generation = self.load_checkpoint()
+            max_sol = max(self.curr_generation, key=lambda s: s.grade())
+            logging.info("Resumed from %s after generation %d\nBest solution with value: %d", self.Checkpoint_Path, generation,
+                         self.Best_Solution.grade())
+        else:
+            self.reset_busy_time()
+            start_time = time.time()
+            self.curr_generation = self.generate_base_gen()
+            end_time = time.time()
+            duration = end_time - start_time
+            max_sol = max(self.curr_generation, key=lambda s: s.grade())
+            self.record_best(max_sol)
+            logging.info("Base generation completed in %.3f seconds\nBest solution with value: %d", duration, max_sol.grade())
+            self.emit_generation_event(0, duration)
+            generation = 0
+            self.save_checkpoint(generation)
         best_grade_so_far = max_sol.grade()
-        with tqdm(total=self.max_generations, desc=f"Running genetic algorithm - Best Grade in baseGen: {best_grade_so_far}", unit="gen") as pbar:
-            for i in range(self.max_generations):
-                logging.info(f"Starting generation {i + 1}")
+        with tqdm(total=self.max_generations, initial=generation, desc=f"Running genetic algorithm - Best Grade in baseGen: {best_grade_so_far}",
+                  unit="gen") as pbar:
+            for i in range(generation, self.max_generations):
+                if self.is_time_up():
+                    logging.info("Time limit reached after %d generations", i)
+                    break
+                logging.info("Starting generation %d", i + 1)
+                self.reset_busy_time()
                 start_time = time.time()
                 self.next_generation = self.generate_next_gen()
                 end_time = time.time()
                 duration = end_time - start_time
                 self.curr_generation = self.next_generation
+                generation = i + 1
                 max_sol = max(self.curr_generation, key=lambda s: s.grade())
+                self.record_best(max_sol)
                 best_grade_so_far = max_sol.grade()
-                logging.info(f"Generation {i + 1} completed in {duration:.3f} seconds\nBest solution with value: {best_grade_so_far}")
-                if len(max_sol.Shapes) == len(self.Shapes):
-                    logging.info(f"Found optimal solution in generation {i + 1}")
+                logging.info("Generation %d completed in %.3f seconds\nBest solution with value: %d", i + 1, duration, best_grade_so_far)
+                self.emit_generation_event(generation, duration)
+                if self.Fitness_Cache is not None:
+                    logging.info("%s", self.Fitness_Cache)
+                if generation % self.Checkpoint_Interval == 0:
+                    self.save_checkpoint(generation)
+                if len(max_sol) == len(self.Shapes):
+                    logging.info("Found optimal solution in generation %d", i + 1)
                     break
                 pbar.set_description(f"Running genetic algorithm - Best Grade in gen {i+1}: {best_grade_so_far}")
                 pbar.update(1)
 
-        sol = max(self.curr_generation, key=lambda s: s.grade())
-        logging.info(f"Best solution found: {sol}")
+        if generation % self.Checkpoint_Interval != 0:
+            self.save_checkpoint(generation)
+        sol = self.Best_Solution
+        logging.info("Best solution found with value %d, placing %d of %d items", sol.grade(), len(sol), len(self.Shapes))
         return sol
 
+    def emit_event(self, event: str, **fields) -> None:
+        """
+        Emits a structured telemetry event. It is only built and serialized if a handler is listening.
+
+        Args:
+            event (str): The name of the event.
+            **fields: The fields of the event. They should be JSON-serializable.
+        """
+        if TELEMETRY.hasHandlers():
+            TELEMETRY.info(event, extra={"fields": fields})
+
+    def emit_generation_event(self, generation: int, duration: float) -> None:
+        """
+        Emits the telemetry event of a completed generation: the grades of its population, the items placed by its best solution,
+        its duration and how busy the workers were.
+
+        Args:
+            generation (int): The number of the generation, 0 for the base generation.
+            duration (float): The seconds the generation took.
+        """
+        if not TELEMETRY.hasHandlers() or not self.curr_generation:
+            return
+        grades = np.array([solution.grade() for solution in self.curr_generation], dtype=np.float64)
+        best = max(self.curr_generation, key=lambda s: s.grade())
+        workers = self.Backend.Max_Workers if self.Backend is not None else 1
+        fields = {"generation": generation, "best_grade": best.grade(), "best_so_far": self.Best_Solution.grade(),
+                  "grade_min": int(grades.min()), "grade_max": int(grades.max()), "grade_mean": round(float(grades.mean()), 3),
+                  "grade_std": round(float(grades.std()), 3), "population": len(grades), "items_placed": len(best),
+                  "items": len(self.Shapes), "duration": round(duration, 3),
+                  "worker_utilisation": round(self.Busy_Time / (duration * workers), 3) if duration > 0 else None}
+        if self.Fitness_Cache is not None:
+            fields["cache_hit_rate"] = round(self.Fitness_Cache.get_hit_rate(), 3)
+        self.emit_event("generation", **fields)
+
+    def reset_busy_time(self) -> None:
+        """
+        Starts measuring the workers' busy time anew, for the next generation.
+        """
+        with self.Busy_Time_Lock:
+            self.Busy_Time = 0.0
+
+    def record_busy_time(self, future: Future) -> None:
+        """
+        Adds the time a completed task ran to the workers' busy time. Called when the task's future is done.
+
+        Args:
+            future (Future): The future of a construct_placement or apply_mutation task.
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self.Busy_Time_Lock:
+            self.Busy_Time += future.result()[2]
+
+    def get_checkpoint_state(self, generation: int) -> dict[str, np.ndarray]:
+        """
+        Collects the state a run needs to continue: the placements of the current generation and of the best solution, the
+        generation counter and the random state.
+
+        The placements are concatenated into flat arrays, with solution_starts giving where each solution starts. The best
+        solution comes last.
+
+        Args:
+            generation (int): The number of generations completed.
+
+        Returns:
+            dict[str, np.ndarray]: The state, as named arrays.
+        """
+        placements = [solution.get_placement() for solution in self.curr_generation] + [self.Best_Solution.get_placement()]
+        return {
+            "algorithm": np.array(type(self).__name__),
+            "instance_name": np.array(self.Instance_Name),
+            "generation": np.array(generation),
+            "solution_starts": np.concatenate(([0], np.cumsum([len(placement[0]) for placement in placements]))),
+            "prototype_ids": np.concatenate([placement[0] for placement in placements]),
+            "copies": np.concatenate([placement[1] for placement in placements]),
+            "x_offsets": np.concatenate([placement[2] for placement in placements]),
+            "y_offsets": np.concatenate([placement[3] for placement in placements]),
+            "random_state": np.array(json.dumps(random.getstate())),
+        }
+
+    def set_checkpoint_state(self, state) -> int:
+        """
+        Restores the state collected by get_checkpoint_state.
+
+        Args:
+            state: The named arrays of a checkpoint.
+
+        Returns:
+            int: The number of generations completed.
+        """
+        starts = state["solution_starts"].tolist()
+        arrays = [state[name] for name in ("prototype_ids", "copies", "x_offsets", "y_offsets")]
+        solutions = [self.create_solution_from_placement(tuple(array[start:end] for array in arrays)) for start, end in zip(starts[:-1], starts[1:])]
+        self.curr_generation = solutions[:-1]
+        self.Best_Solution = solutions[-1]
+        version, internal_state, gauss_next = json.loads(str(state["random_state"]))
+        random.setstate((version, tuple(internal_state), gauss_next))
+        return int(state["generation"])
+
+    def save_checkpoint(self, generation: int) -> None:
+        """
+        Saves the state of the run to Checkpoint_Path atomically, if checkpoints are enabled.
+
+        Args:
+            generation (int): The number of generations completed.
+        """
+        if self.Checkpoint_Path is None:
+            return
+        save_npz_atomically(self.get_checkpoint_state(generation), self.Checkpoint_Path)
+        logging.info("Checkpoint after generation %d saved to %s", generation, self.Checkpoint_Path)
+
+    def load_checkpoint(self) -> int:
+        """
+        Restores the state of a run from Checkpoint_Path. A generation smaller than the population size, saved after a time limit
+        cut it short, is filled up again.
+
+        Returns:
+            int: The number of generations completed.
+
+        Raises:
+            Exception: If the checkpoint was saved by another algorithm or for another instance, or holds no generation.
+        """
+        with np.load(self.Checkpoint_Path) as state:
+            algorithm, instance_name = str(state["algorithm"]), str(state["instance_name"])
+            if algorithm != type(self).__name__ or instance_name != self.Instance_Name:
+                raise Exception(f"Checkpoint {self.Checkpoint_Path} was saved by {algorithm} for instance {instance_name}")
+            generation = self.set_checkpoint_state(state)
+        if not self.curr_generation:
+            raise Exception(f"Checkpoint {self.Checkpoint_Path} holds no solutions")
+        if len(self.curr_generation) < self.population_size:
+            logging.info("Checkpoint %s holds %d of %d solutions, filling the generation up with copies of the best ones",
+                         self.Checkpoint_Path, len(self.curr_generation), self.population_size)
+            self.fill_generation()
+        return generation
+
+    def fill_generation(self) -> None:
+        """
+        Fills the current generation up to the population size with copies of its solutions, best first. The current generation
+        is sorted by grade.
+        """
+        missing = self.population_size - len(self.curr_generation)
+        copies = [self.curr_generation[i % len(self.curr_generation)].clone() for i in range(missing)]
+        self.curr_generation = sorted(self.curr_generation + copies, key=lambda s: s.grade(), reverse=True)
+
+    def get_remaining_time(self) -> float:
+        """
+        Returns the time left until the deadline of the current run.
+
+        Returns:
+            float: The remaining time in seconds, or None if there is no time limit.
+        """
+        if self.Deadline is None:
+            return None
+        return max(0.0, self.Deadline - time.time())
+
+    def record_best(self, solution: Solution) -> None:
+        """
+        Keeps a solution as the best so far if it improves on it, and writes it to the output path atomically, so the file always
+        holds a complete solution even if the run is killed.
+
+        Args:
+            solution (Solution): A newly found solution.
+        """
+        if self.Best_Solution is not None and solution.grade() <= self.Best_Solution.grade():
+            return
+        self.Best_Solution = solution
+        if self.Output_Path is not None:
+            write_json_atomically(solution.export_to_json(), self.Output_Path)
+            logging.info("New best solution with value %d written to %s", solution.grade(), self.Output_Path)
+
+    def collect_results(self, futures: list[Future]) -> list:
+        """
+        Waits for the results of some tasks until they are all done or the deadline passes. Tasks that have not started by then
+        are cancelled. If none is done, waits for the first one, so there is always at least one result.
+
+        Args:
+            futures (list[Future]): The futures of the tasks.
+
+        Returns:
+            list: The result of each task, or None for the tasks that were not done in time.
+        """
+        done, not_done = wait(futures, timeout=self.get_remaining_time())
+        if not done:
+            done, not_done = wait(futures, return_when=FIRST_COMPLETED)
+        for future in not_done:
+            future.cancel()
+        return [future.result() if future in done else None for future in futures]
+
     def generate_next_gen(self) -> list[Solution]:
         """
         Generates the next generation of solutions by mutating and crossing over the current generation.
 
+        Every mutation strategy of every solution and every crossover decoder of every pair is a separate task of one flat task graph.
+        Results are reduced as they complete, and the crossovers of a pair are scheduled as soon as both of its parents are mutated.
+
         Returns:
             list[Solution]: The new generation of solutions.
         """
-        futures = []
-        with ProcessPoolExecutor() as executor:
-            for child in self.curr_generation:
-                futures.append(executor.submit(self.mutate, child))
-
-        new_gen = [future.result() for future in futures]
-        max_sol = max(new_gen, key=lambda s: s.grade())
-        futures = []
-        with ProcessPoolExecutor() as executor:
-            for index1, parent1 in enumerate(new_gen):
-                for index2, parent2 in enumerate(new_gen):
-                    if index1 < index2:
-                        futures.append(executor.submit(self.crossover, parent1, parent2))
-        new_gen = [future.result() for future in futures]
-        new_gen.append(max_sol)
-        new_gen = sorted(new_gen, key=lambda s: s.grade(), reverse=True)
-        return new_gen[:self.population_size]
+        population = len(self.curr_generation)
+        pending = set()
+        mutation_tasks = {}
+        for child_index, child in enumerate(self.curr_generation):
+            placement = child.get_placement(canonical=True)
+            for order, method_name in enumerate(MUTATIONS):
+                future = self.submit_cached("apply_mutation", method_name, placement)
+                # Identical tasks share a cached future, so a future can stand for several tasks
+                mutation_tasks.setdefault(future, []).append((child_index, order))
+                pending.add(future)
+
+        remaining_mutations = [len(MUTATIONS)] * population
+        best_mutations = [None] * population
+        best_crossovers = {}
+        crossover_tasks = {}
+        new_gen = [None] * population
+        while pending:
+            done, pending = wait(pending, timeout=self.get_remaining_time(), return_when=FIRST_COMPLETED)
+            if not done:
+                logging.info("Time limit reached during a generation, keeping the solutions found so far")
+                for future in pending:
+                    future.cancel()
+                break
+            for future in done:
+                grade, placement, _ = future.result()
+                if self.Best_Solution is not None and grade > self.Best_Solution.grade():
+                    self.record_best(self.create_solution_from_placement(placement))
+                for child_index, order in mutation_tasks.pop(future, []):
+                    best_mutations[child_index] = self.reduce_best(best_mutations[child_index], grade, order, placement)
+                    remaining_mutations[child_index] -= 1
+                    if remaining_mutations[child_index] == 0:
+                        new_gen[child_index] = self.create_solution_from_placement(best_mutations[child_index][2])
+                        for crossover_future, pair, order in self.submit_crossovers(new_gen, child_index):
+                            crossover_tasks.setdefault(crossover_future, []).append((pair, order))
+                            pending.add(crossover_future)
+                for pair, order in crossover_tasks.pop(future, []):
+                    best_crossovers[pair] = self.reduce_best(best_crossovers.get(pair), grade, order, placement)
+
+        # Solutions whose mutations did not finish in time stay as they were
+        mutated_gen = [child if mutated is None else mutated for child, mutated in zip(self.curr_generation, new_gen)]
+        mutated_gen = sorted(mutated_gen, key=lambda s: s.grade(), reverse=True)
+        new_gen = [self.create_solution_from_placement(best_crossovers[pair][2]) for pair in sorted(best_crossovers)]
+        new_gen.append(mutated_gen[0])
+        new_gen = sorted(new_gen, key=lambda s: s.grade(), reverse=True)[:self.population_size]
+        # Crossovers cancelled at the time limit leave the generation short, so it is filled up with the best other mutated solutions
+        new_gen += mutated_gen[1:self.population_size - len(new_gen) + 1]
+        return new_gen
 
     def generate_base_gen(self) -> list[Solution]:
         """
@@ -109,25 +493,202 @@ class GeneticAlgo(Algo):
         Returns:
             list[Solution]: The base generation of solutions.
         """
-        shapes_sorted_by_real_value = self.sort_shapes_by_real_value(self.Shapes)
-        with ProcessPoolExecutor() as executor:
-            futures = []
-            for i in range(self.population_size):
-                if i % 5 == 0:
-                    futures.append(executor.submit(self.create_bottom_right_solution, shapes_sorted_by_real_value))
-                elif i % 5 == 1:
-                    futures.append(executor.submit(self.create_bottom_left_solution, shapes_sorted_by_real_value))
-                elif i % 5 == 2:
-                    futures.append(executor.submit(self.create_top_right_solution, shapes_sorted_by_real_value))
-                elif i % 5 == 3:
-                    futures.append(executor.submit(self.create_top_left_solution, shapes_sorted_by_real_value))
-                else:
-                    futures.append(executor.submit(self.create_random_offset_solution, shapes_sorted_by_real_value))
-
-        solutions = [future.result() for future in futures]
+        shapes_sorted_by_real_value = self.get_shape_positions(self.sort_shapes_by_real_value(self.Shapes))
+        futures = []
+        for i in range(self.population_size):
+            if i % 5 == 0:
+                futures.append(self.submit_cached("construct_placement", "create_bottom_right_solution", shapes_sorted_by_real_value))
+            elif i % 5 == 1:
+                futures.append(self.submit_cached("construct_placement", "create_bottom_left_solution", shapes_sorted_by_real_value))
+            elif i % 5 == 2:
+                futures.append(self.submit_cached("construct_placement", "create_top_right_solution", shapes_sorted_by_real_value))
+            elif i % 5 == 3:
+                futures.append(self.submit_cached("construct_placement", "create_top_left_solution", shapes_sorted_by_real_value))
+            else:
+                futures.append(self.submit("construct_placement", "create_random_offset_solution", shapes_sorted_by_real_value,
+                                           random.getrandbits(32)))
+
+        solutions = [self.create_solution_from_placement(result[1]) for result in self.collect_results(futures) if result is not None]
         base_gen = sorted(solutions, key=lambda s: s.grade(), reverse=True)
         return base_gen
 
+    def submit_crossovers(self, new_gen: list[Solution], child_index: int) -> list[tuple[Future, tuple[int, int], int]]:
+        """
+        Submits the crossover decoders of every pair made of a newly mutated solution and one mutated before it.
+
+        Args:
+            new_gen (list[Solution]): The mutated solutions, None where the mutations are not done yet.
+            child_index (int): The position of the newly mutated solution.
+
+        Returns:
+            list[tuple[Future, tuple[int, int], int]]: For each submitted task, its future, its pair and the decoder's position in
+            CROSSOVER_DECODERS.
+        """
+        tasks = []
+        for other_index in range(len(new_gen)):
+            if other_index == child_index or new_gen[other_index] is None:
+                continue
+            pair = (min(child_index, other_index), max(child_index, other_index))
+            shape_positions = self.get_shape_positions(self.get_crossover_shapes(new_gen[pair[0]], new_gen[pair[1]]))
+            for order, method_name in enumerate(CROSSOVER_DECODERS):
+                tasks.append((self.submit_cached("construct_placement", method_name, shape_positions), pair, order))
+        return tasks
+
+    def submit(self, method_name: str, *args) -> Future:
+        """
+        Submits a call of one of the algorithm's methods to the execution backend, or makes it right away if there is none.
+
+        Args:
+            method_name (str): The name of the method to call.
+            *args: The arguments of the method. The process backend sends them to a worker, so they should be compact.
+
+        Returns:
+            Future: The future result of the call.
+        """
+        if self.Backend is not None and not self.Backend.Shares_Memory:
+            worker_future = self.Backend.submit(run_in_worker, method_name, *args)
+            future = Future()
+            # Cancelling the task's future cancels the worker's task too, unless it already started
+            future.add_done_callback(lambda f: worker_future.cancel() if f.cancelled() else None)
+            worker_future.add_done_callback(partial(self.unwrap_worker_result, future))
+        elif self.Backend is not None:
+            future = self.Backend.submit(getattr(self, method_name), *args)
+        else:
+            future = Future()
+            future.set_result(getattr(self, method_name)(*args))
+        future.add_done_callback(self.record_busy_time)
+        return future
+
+    @staticmethod
+    def unwrap_worker_result(future: Future, worker_future: Future) -> None:
+        """
+        Completes the future of a task run by a worker process with the method's return value, and merges the events the task
+        recorded into this process's instrumentation. Called when the worker's future is done.
+
+        Args:
+            future (Future): The future of the task, as returned by submit.
+            worker_future (Future): The future of the run_in_worker call.
+        """
+        if worker_future.cancelled():
+            future.cancel()
+            return
+        exception = worker_future.exception()
+        if exception is None:
+            result, events = worker_future.result()
+            # The events are merged even if the task's result is no longer wanted
+            if events is not None:
+                INSTRUMENTATION.merge(events)
+        if not future.set_running_or_notify_cancel():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def submit_cached(self, method_name: str, *args) -> Future:
+        """
+        Submits a deterministic task, unless the same task was submitted before and its result is still in the fitness cache.
+        Tasks still running are cached too, so a duplicate submitted meanwhile waits for the same result.
+
+        Args:
+            method_name (str): The name of the method to call.
+            *args: The arguments of the method.
+
+        Returns:
+            Future: The future result of the call.
+        """
+        if self.Fitness_Cache is None:
+            return self.submit(method_name, *args)
+        key = self.Fitness_Cache.fingerprint(method_name, *args)
+        future = self.Fitness_Cache.get(key)
+        # A task cancelled at a time limit has no result to share
+        if future is None or future.cancelled():
+            future = self.submit(method_name, *args)
+            self.Fitness_Cache.put(key, future)
+        return future
+
+    @staticmethod
+    def reduce_best(best: tuple, grade: int, order: int, placement: tuple) -> tuple:
+        """
+        Keeps the better of the best result so far and a newly completed one. Equal grades go to the task that comes first.
+
+        Args:
+            best (tuple): The best (grade, order, placement) so far, or None.
+            grade (int): The grade of the new result.
+            order (int): The position of the new result's task among its alternatives.
+            placement (tuple): The placement of the new result.
+
+        Returns:
+            tuple: The best (grade, order, placement).
+        """
+        if best is None or grade > best[0] or (grade == best[0] and order < best[1]):
+            return grade, order, placement
+        return best
+
+    def get_shape_positions(self, shapes_list: list[Shape]) -> np.ndarray:
+        """
+        Encodes a list of shapes as their positions in the catalog, to send it to a worker.
+
+        Args:
+            shapes_list (list[Shape]): Copies of the catalog's items.
+
+        Returns:
+            np.ndarray: The positions of the shapes in the catalog, in list order.
+        """
+        return np.array([self.Shapes.get_item_position(shape) for shape in shapes_list], dtype=np.int64)
+
+    def construct_placement(self, method_name: str, shape_positions: np.ndarray, seed: int = None) -> tuple[int, tuple, float]:
+        """
+        Creates a solution with one of the create_*_solution methods and returns its grade and compact placement, and how long
+        it took.
+
+        Args:
+            method_name (str): The name of the create_*_solution method.
+            shape_positions (np.ndarray): The positions in the catalog of the shapes to pack, in packing order.
+            seed (int): Seeds a random number generator of the task's own, which is passed to the method. Randomized methods need
+                it, since forked workers start from the same random state and would otherwise create the same solutions. The
+                random module is left alone, as threads share it with the run.
+
+        Returns:
+            tuple[int, tuple, float]: The grade and the placement of the created solution, and the seconds it took.
+        """
+        start_time = time.perf_counter()
+        with INSTRUMENTATION.timer(f"operator.{method_name}"):
+            shapes_list = [self.Shapes[position] for position in shape_positions.tolist()]
+            args = (shapes_list,) if seed is None else (shapes_list, random.Random(seed))
+            solution = getattr(self, method_name)(*args)
+        return solution.grade(), solution.get_placement(), time.perf_counter() - start_time
+
+    def apply_mutation(self, method_name: str, placement: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]) -> tuple[int, tuple, float]:
+        """
+        Mutates a solution given by its compact placement with one of the mutate_* strategies, and measures how long it took.
+
+        Args:
+            method_name (str): The name of the mutate_* method.
+            placement (tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]): The placement of the solution to mutate.
+
+        Returns:
+            tuple[int, tuple, float]: The grade and the placement of the mutated solution, and the seconds it took.
+        """
+        start_time = time.perf_counter()
+        with INSTRUMENTATION.timer(f"operator.{method_name}"):
+            solution = getattr(self, method_name)(self.create_solution_from_placement(placement))
+        return solution.grade(), solution.get_placement(), time.perf_counter() - start_time
+
+    def get_crossover_shapes(self, parent1: Solution, parent2: Solution) -> list[Shape]:
+        """
+        Collects the shapes of two parent solutions, sorted by value, for the crossover decoders to pack.
+
+        Args:
+            parent1 (Solution): The first parent solution.
+            parent2 (Solution): The second parent solution.
+
+        Returns:
+            list[Shape]: The shapes of both parents, each copy once, sorted by value.
+        """
+        shapes_list = parent1.Shapes + [shape for shape in parent2.Shapes if shape not in parent1]
+        return self.sort_shapes_by_value(shapes_list)
+
     def mutate(self, solution: Solution) -> Solution:
         """
         Applies multiple mutation strategies to a solution.
@@ -138,18 +699,7 @@ class GeneticAlgo(Algo):
         Returns:
             Solution: The mutated solution with the best grade.
         """
-        futures = []
-        with ProcessPoolExecutor() as executor:
-            futures.append(executor.submit(self.mutate_left_down, solution))
-            futures.append(executor.submit(self.mutate_down_left, solution))
-            futures.append(executor.submit(self.mutate_up_left, solution))
-            futures.append(executor.submit(self.mutate_left_up, solution))
-            futures.append(executor.submit(self.mutate_right_down, solution))
-            futures.append(executor.submit(self.mutate_down_right, solution))
-            futures.append(executor.submit(self.mutate_right_up, solution))
-            futures.append(executor.submit(self.mutate_up_right, solution))
-
-        solutions = [future.result() for future in futures]
+        solutions = [getattr(self, method_name)(solution) for method_name in MUTATIONS]
         max_sol = max(solutions, key=lambda s: s.grade())
 
         return max_sol
@@ -285,18 +835,7 @@ class GeneticAlgo(Algo):
         Returns:
             Solution: The resulting solution from the crossover.
         """
-        shapes_set = set(parent1.Shapes)
-        for shape in parent2.Shapes:
-            if shape.Index not in [s.Index for s in shapes_set]:
-                shapes_set.add(shape)
-        shapes_sorted_by_calculated_value = self.sort_shapes_by_value(list(shapes_set))
-        futures = []
-        with ProcessPoolExecutor() as executor:
-            futures.append(executor.submit(self.create_bottom_left_solution, list(shapes_sorted_by_calculated_value)))
-            futures.append(executor.submit(self.create_bottom_right_solution, list(shapes_sorted_by_calculated_value)))
-            futures.append(executor.submit(self.create_top_left_solution, list(shapes_sorted_by_calculated_value)))
-            futures.append(executor.submit(self.create_top_right_solution, list(shapes_sorted_by_calculated_value)))
-
-        solutions = [future.result() for future in futures]
+        shapes_sorted_by_calculated_value = self.get_crossover_shapes(parent1, parent2)
+        solutions = [getattr(self, method_name)(list(shapes_sorted_by_calculated_value)) for method_name in CROSSOVER_DECODERS]
         max_sol = max(solutions, key=lambda s: s.grade())
         return max_sol
@@ -0,0 +1,269 @@
+import json
+import numpy as np
+from .genetic_algo import GeneticAlgo
+from utils.Container import Container
+from utils.ShapeCatalog import ShapeCatalog
+from utils.Solution import Solution
+
+# The placement heuristics a genome can be decoded with. A genome's heuristic tag is an index into this tuple.
+HEURISTICS = ("create_bottom_left_solution", "create_bottom_right_solution", "create_top_left_solution", "create_top_right_solution")
+# The sort criteria used to seed the base generation, together with every heuristic
+SEED_CRITERIA = ("real_value", "value", "area")
+
+
+class PermutationGeneticAlgo(GeneticAlgo):
+    """
+    A genetic algorithm whose genomes are an order of the items plus a heuristic tag, instead of placed solutions.
+
+    A genome is decoded by packing the items in its order with the create_*_solution method its tag selects. Crossover and
+    mutation only touch the integer arrays, so genomes are cheap to copy, hash and send to workers.
+
+    Attributes:
+        Genomes (list[tuple[np.ndarray, int]]): The genome of each solution of the current generation: the positions of the items
+            in the catalog, in packing order, and the index of the heuristic in HEURISTICS.
+        Mutation_Rate (float): The probability of each mutation operator being applied to a child.
+        Tournament_Size (int): The number of solutions competing in each parent selection.
+        Elite_Count (int): The number of best solutions carried over to the next generation unchanged.
+        Rng (np.random.Generator): The random number generator of the operators.
+    """
+
+    def __init__(self, shapes: ShapeCatalog, cont: Container, pop_size: int, gens: int, tries_on_random_creation: int, instance_name: str,
+                 backend: str = "process", workers: int = None, cache_size: int = 1024, time_limit: float = None, output_path: str = None,
+                 checkpoint_path: str = None, checkpoint_interval: int = 1, resume: bool = False,
+                 mutation_rate: float = 0.3, tournament_size: int = 3, elite_count: int = 1, seed: int = 0):
+        """
+        Initializes the PermutationGeneticAlgo class.
+
+        Args:
+            shapes (ShapeCatalog): The catalog of shapes to be packed.
+            cont (Container): The container in which the shapes should be packed.
+            pop_size (int): The size of the population.
+            gens (int): The number of generations to run.
+            tries_on_random_creation (int): Number of tries allowed for random solution creation.
+            instance_name (str): The name of the instance for logging.
+            backend (str): The kind of execution backend to run on: "serial", "thread" or "process".
+            workers (int): The number of workers of the backend. Defaults to one per CPU.
+            cache_size (int): The maximum number of entries of the fitness cache, or 0 to disable it.
+            time_limit (float): The wall-clock budget of a run in seconds. Defaults to no limit.
+            output_path (str): Where to write the best solution every time it improves. Defaults to not writing it.
+            checkpoint_path (str): Where to save the population periodically. Defaults to not saving it.
+            checkpoint_interval (int): The number of generations between checkpoints.
+            resume (bool): Whether to continue from the checkpoint at checkpoint_path, if there is one.
+            mutation_rate (float): The probability of each mutation operator being applied to a child.
+            tournament_size (int): The number of solutions competing in each parent selection.
+            elite_count (int): The number of best solutions carried over to the next generation unchanged.
+            seed (int): The seed of the random number generator.
+
+        Raises:
+            Exception: If the number of elites is not smaller than the population size.
+        """
+        super().__init__(shapes, cont, pop_size, gens, tries_on_random_creation, instance_name, backend, workers, cache_size,
+                         time_limit, output_path, checkpoint_path, checkpoint_interval, resume)
+        if not 0 <= elite_count < pop_size:
+            raise Exception("Number of elites must be smaller than the population size")
+        self.Genomes = []
+        self.Mutation_Rate = mutation_rate
+        self.Tournament_Size = tournament_size
+        self.Elite_Count = elite_count
+        self.Rng = np.random.default_rng(seed)
+
+    def generate_base_gen(self) -> list[Solution]:
+        """
+        Generates the initial base generation. It is seeded with every heuristic applied to the items sorted by each of
+        SEED_CRITERIA, and filled up with random orders and heuristics.
+
+        Returns:
+            list[Solution]: The base generation of solutions.
+        """
+        genomes = [(self.Shapes.Orders[criterion], tag) for criterion in SEED_CRITERIA for tag in range(len(HEURISTICS))]
+        genomes = genomes[:self.population_size]
+        while len(genomes) < self.population_size:
+            genomes.append((self.Rng.permutation(len(self.Shapes)), int(self.Rng.integers(len(HEURISTICS)))))
+        return self.select_survivors(genomes, self.decode_genomes(genomes))
+
+    def generate_next_gen(self) -> list[Solution]:
+        """
+        Generates the next generation: the elites of the current generation, and children bred from parents chosen by tournament
+        with order crossover and swap and insert mutations. Children not decoded before the time limit are replaced by the best
+        solutions of the current generation after the elites.
+
+        Returns:
+            list[Solution]: The new generation of solutions.
+        """
+        grades = np.array([solution.grade() for solution in self.curr_generation])
+        children = []
+        for _ in range(self.population_size - self.Elite_Count):
+            parent1 = self.Genomes[self.tournament_select(grades)]
+            parent2 = self.Genomes[self.tournament_select(grades)]
+            children.append(self.mutate_genome(self.crossover_genomes(parent1, parent2)))
+        ranking = np.argsort(-grades, kind="stable").tolist()
+        elites = ranking[:self.Elite_Count]
+        genomes = [self.Genomes[i] for i in elites] + children
+        solutions = [self.curr_generation[i] for i in elites] + self.decode_genomes(children)
+        missing = sum(solution is None for solution in solutions)
+        spares = ranking[self.Elite_Count:self.Elite_Count + missing]
+        genomes += [self.Genomes[i] for i in spares]
+        solutions += [self.curr_generation[i] for i in spares]
+        return self.select_survivors(genomes, solutions)
+
+    def get_checkpoint_state(self, generation: int) -> dict[str, np.ndarray]:
+        """
+        Collects the state a run needs to continue, including the genomes and the state of the operators' random number generator.
+
+        Args:
+            generation (int): The number of generations completed.
+
+        Returns:
+            dict[str, np.ndarray]: The state, as named arrays.
+        """
+        state = super().get_checkpoint_state(generation)
+        state["genome_orders"] = np.array([order for order, _ in self.Genomes], dtype=np.int64).reshape(len(self.Genomes), -1)
+        state["genome_tags"] = np.array([tag for _, tag in self.Genomes], dtype=np.int64)
+        state["numpy_random_state"] = np.array(json.dumps(self.Rng.bit_generator.state))
+        return state
+
+    def set_checkpoint_state(self, state) -> int:
+        """
+        Restores the state collected by get_checkpoint_state.
+
+        Args:
+            state: The named arrays of a checkpoint.
+
+        Returns:
+            int: The number of generations completed.
+        """
+        generation = super().set_checkpoint_state(state)
+        self.Genomes = list(zip(state["genome_orders"], state["genome_tags"].tolist()))
+        self.Rng.bit_generator.state = json.loads(str(state["numpy_random_state"]))
+        return generation
+
+    def fill_generation(self) -> None:
+        """
+        Fills the current generation up to the population size with copies of its solutions, best first, and their genomes.
+        """
+        missing = self.population_size - len(self.curr_generation)
+        sources = [i % len(self.curr_generation) for i in range(missing)]
+        self.curr_generation = self.select_survivors(self.Genomes + [self.Genomes[i] for i in sources],
+                                                     self.curr_generation + [self.curr_generation[i].clone() for i in sources])
+
+    def select_survivors(self, genomes: list[tuple[np.ndarray, int]], solutions: list[Solution]) -> list[Solution]:
+        """
+        Sorts a generation by grade, best first, and keeps its genomes in the same order. Genomes without a solution are dropped.
+
+        Args:
+            genomes (list[tuple[np.ndarray, int]]): The genomes of the generation.
+            solutions (list[Solution]): The decoded solution of each genome, or None if it was not decoded.
+
+        Returns:
+            list[Solution]: The solutions, sorted by grade.
+        """
+        decoded = [i for i in range(len(solutions)) if solutions[i] is not None]
+        order = sorted(decoded, key=lambda i: solutions[i].grade(), reverse=True)
+        self.Genomes = [genomes[i] for i in order]
+        return [solutions[i] for i in order]
+
+    def decode_genomes(self, genomes: list[tuple[np.ndarray, int]]) -> list[Solution]:
+        """
+        Decodes genomes on the execution backend by packing their items in order with the heuristic of their tag. Genomes seen
+        before are served from the fitness cache.
+
+        Args:
+            genomes (list[tuple[np.ndarray, int]]): The genomes to decode.
+
+        Returns:
+            list[Solution]: The solution of each genome, or None for the genomes not decoded before the time limit.
+        """
+        futures = [self.submit_cached("construct_placement", HEURISTICS[tag], order) for order, tag in genomes]
+        return [None if result is None else self.create_solution_from_placement(result[1]) for result in self.collect_results(futures)]
+
+    def tournament_select(self, grades: np.ndarray) -> int:
+        """
+        Chooses a parent: the best of a few solutions drawn at random.
+
+        Args:
+            grades (np.ndarray): The grade of each solution of the current generation.
+
+        Returns:
+            int: The position of the chosen solution in the current generation.
+        """
+        contestants = self.Rng.integers(len(grades), size=self.Tournament_Size)
+        return int(contestants[np.argmax(grades[contestants])])
+
+    def order_crossover(self, order1: np.ndarray, order2: np.ndarray) -> np.ndarray:
+        """
+        Performs order crossover (OX): the child keeps a random slice of the first order in place, and the remaining items fill
+        the other positions in the order they appear in the second.
+
+        Args:
+            order1 (np.ndarray): The item order of the first parent.
+            order2 (np.ndarray): The item order of the second parent.
+
+        Returns:
+            np.ndarray: The item order of the child.
+        """
+        start, end = np.sort(self.Rng.choice(len(order1) + 1, size=2, replace=False))
+        in_slice = np.zeros(len(order1), dtype=bool)
+        in_slice[order1[start:end]] = True
+        rest = order2[~in_slice[order2]]
+        return np.concatenate((rest[:start], order1[start:end], rest[start:]))
+
+    def crossover_genomes(self, genome1: tuple[np.ndarray, int], genome2: tuple[np.ndarray, int]) -> tuple[np.ndarray, int]:
+        """
+        Breeds a child genome: its order comes from order crossover and its heuristic from one of the parents, chosen at random.
+
+        Args:
+            genome1 (tuple[np.ndarray, int]): The first parent genome.
+            genome2 (tuple[np.ndarray, int]): The second parent genome.
+
+        Returns:
+            tuple[np.ndarray, int]: The child genome.
+        """
+        tag = genome1[1] if self.Rng.random() < 0.5 else genome2[1]
+        return self.order_crossover(genome1[0], genome2[0]), tag
+
+    def swap_mutation(self, order: np.ndarray) -> np.ndarray:
+        """
+        Swaps two random items of an order.
+
+        Args:
+            order (np.ndarray): The item order to mutate.
+
+        Returns:
+            np.ndarray: The mutated order.
+        """
+        mutated = order.copy()
+        i, j = self.Rng.integers(len(order), size=2)
+        mutated[[i, j]] = mutated[[j, i]]
+        return mutated
+
+    def insert_mutation(self, order: np.ndarray) -> np.ndarray:
+        """
+        Moves a random item of an order to another random position.
+
+        Args:
+            order (np.ndarray): The item order to mutate.
+
+        Returns:
+            np.ndarray: The mutated order.
+        """
+        i, j = self.Rng.integers(len(order), size=2)
+        return np.insert(np.delete(order, i), j, order[i])
+
+    def mutate_genome(self, genome: tuple[np.ndarray, int]) -> tuple[np.ndarray, int]:
+        """
+        Applies each mutation operator to a genome with probability Mutation_Rate: a swap, an insert and a change of heuristic.
+
+        Args:
+            genome (tuple[np.ndarray, int]): The genome to mutate.
+
+        Returns:
+            tuple[np.ndarray, int]: The mutated genome.
+        """
+        order, tag = genome
+        if len(order) > 1 and self.Rng.random() < self.Mutation_Rate:
+            order = self.swap_mutation(order)
+        if len(order) > 1 and self.Rng.random() < self.Mutation_Rate:
+            order = self.insert_mutation(order)
+        if self.Rng.random() < self.Mutation_Rate:
+            tag = int(self.Rng.integers(len(HEURISTICS)))
+        return order, tag
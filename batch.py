@@ -0,0 +1,171 @@
+import argparse
+import csv
+import glob
+import io
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from algos.genetic_algo import GeneticAlgo
+from algos.permutation_genetic_algo import PermutationGeneticAlgo
+from utils.utils import cache_instance, load_cached_instance, read_instance_cache_metadata, write_atomically, write_json_atomically
+
+SUMMARY_FIELDS = ["instance", "path", "items", "placed_items", "value", "runtime", "status"]
+
+def setup_logging():
+    log_file = 'batch_logs.txt'
+    if os.path.exists(log_file):
+        os.remove(log_file)
+    logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Genetic Algorithm for Shape Placement over many instances')
+    parser.add_argument('inputs', type=str, nargs='+', help='Instance directories (searched recursively) or glob patterns')
+    parser.add_argument('--pop_size', type=int, default=4, help='Population size')
+    parser.add_argument('--gens', type=int, default=5, help='Number of generations')
+    parser.add_argument('--tries', type=int, default=10, help='Tries on random creation')
+    parser.add_argument('--mode', type=str, default='solution', choices=['solution', 'permutation'],
+                        help='Evolve placed solutions, or item orders decoded by a placement heuristic')
+    parser.add_argument('--time-limit', type=float, default=None, help='Wall-clock budget per instance in seconds')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Instances solved at the same time (default: one per CPU)')
+    parser.add_argument('--prefetch', type=int, default=4, help='Instances converted to the instance cache ahead of the solves')
+    parser.add_argument('--output-dir', type=str, default='./solutions', help='Directory for the solution files and the summary')
+    return parser.parse_args()
+
+def find_instances(inputs: list[str]) -> list[str]:
+    """
+    Collects the instance files given as directories or glob patterns.
+
+    Args:
+        inputs (list[str]): Directories, which are searched recursively for .json files, or glob patterns.
+
+    Returns:
+        list[str]: The instance paths, without duplicates.
+    """
+    paths = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            paths.extend(glob.glob(os.path.join(pattern, '**', '*.json'), recursive=True))
+        else:
+            paths.extend(glob.glob(pattern, recursive=True))
+    return sorted(set(paths))
+
+def prepare_instance(path: str) -> tuple[str, int]:
+    """
+    Converts an instance to the instance cache, unless it is cached already, and reads its number of items, copies included,
+    from the conversion's metadata to schedule the longest instances first. Runs in a worker process, so the instances are
+    parsed in parallel, and each only once.
+
+    Args:
+        path (str): The path of the instance file.
+
+    Returns:
+        tuple[str, int]: The path of the instance's conversion and its number of items, or (None, -1) if the file is not an
+        instance.
+    """
+    try:
+        cache_path = cache_instance(path)
+        if cache_path is None:
+            return None, -1
+        return cache_path, read_instance_cache_metadata(cache_path)["items"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, -1
+
+def solve_instance(path: str, cache_path: str, args: argparse.Namespace) -> dict:
+    """
+    Solves one instance in a worker process and writes its solution file.
+
+    The instance is memory-mapped from the instance cache. The genetic algorithm runs on the serial backend, since the batch
+    already uses one worker process per instance.
+
+    Args:
+        path (str): The path of the instance file.
+        cache_path (str): The path of the instance's conversion in the instance cache.
+        args (argparse.Namespace): The command-line arguments.
+
+    Returns:
+        dict: The instance's row of the summary.
+    """
+    cont, shapes = load_cached_instance(cache_path)
+    output_path = os.path.join(args.output_dir, f"{cont.Instance_Name}_solution.json")
+    algo_class = PermutationGeneticAlgo if args.mode == 'permutation' else GeneticAlgo
+    algo = algo_class(pop_size=args.pop_size, gens=args.gens, tries_on_random_creation=args.tries, cont=cont, shapes=shapes,
+                      instance_name=cont.Instance_Name, backend='serial', time_limit=args.time_limit, output_path=output_path)
+    start_time = time.time()
+    solution = algo.run()
+    duration = time.time() - start_time
+    write_json_atomically(solution.export_to_json(), output_path)
+    return {"instance": cont.Instance_Name, "path": path, "items": len(shapes), "placed_items": len(solution), "value": solution.grade(),
+            "runtime": round(duration, 3), "status": "ok"}
+
+def write_summary(rows: list[dict], summary_path: str) -> None:
+    """
+    Writes the summary CSV atomically, so it can be read while the batch is still running.
+
+    Args:
+        rows (list[dict]): The rows of the summary, one per finished instance.
+        summary_path (str): The path of the summary file.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=SUMMARY_FIELDS)
+    writer.writeheader()
+    writer.writerows(rows)
+    write_atomically(summary_path, lambda file: file.write(buffer.getvalue()))
+
+def main():
+    # Setup logging
+    setup_logging()
+
+    # Parse command-line arguments
+    args = parse_arguments()
+    if args.jobs < 1:
+        raise Exception("Number of jobs must be positive")
+    if args.prefetch < 1:
+        raise Exception("Prefetch must be positive")
+    summary_path = os.path.join(args.output_dir, 'summary.csv')
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as solver:
+        # Convert the instances to the instance cache in the worker processes a few at a time, so that solves start as soon as
+        # the first conversions finish, and solve the largest converted instance first, by the item count of its conversion
+        instances = find_instances(args.inputs)
+        logging.info(f"Found {len(instances)} files, solving {args.jobs} instances at a time")
+
+        pending_paths = deque(instances)
+        converting = {}
+        ready = {}
+        running = {}
+        item_counts = {}
+        while pending_paths or converting or ready or running:
+            while pending_paths and len(converting) < args.prefetch:
+                path = pending_paths.popleft()
+                converting[solver.submit(prepare_instance, path)] = path
+            while ready and len(running) < args.jobs:
+                path = max(ready, key=lambda path: item_counts[path])
+                logging.info(f"Solving {path} with {item_counts[path]} items")
+                running[solver.submit(solve_instance, path, ready.pop(path), args)] = path
+            done, _ = wait(list(converting) + list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in converting:
+                    path = converting.pop(future)
+                    cache_path, item_counts[path] = future.result()
+                    if cache_path is None:
+                        logging.info(f"Skipping {path}, which is not an instance")
+                    else:
+                        ready[path] = cache_path
+                    continue
+                path = running.pop(future)
+                try:
+                    row = future.result()
+                except Exception as e:
+                    logging.error(f"Solving {path} failed: {e}")
+                    row = {"instance": "", "path": path, "items": item_counts[path], "status": f"failed: {e}"}
+                logging.info(f"Finished {path}: {row}")
+                rows.append(row)
+            write_summary(rows, summary_path)
+    write_summary(rows, summary_path)
+    logging.info(f"Batch completed, summary written to {summary_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from algos.genetic_algo import GeneticAlgo
+from utils.Solution import Solution
+from utils.utils import load_instance, write_json_atomically
+
+# The benchmarked instances, from small to large, each with fixed parameters and a fixed seed. Without a time limit a case's grade
+# is reproducible. The large case would take too long to complete, so it runs on a time limit and its grade measures throughput.
+BENCHMARK_CASES = [
+    {"name": "jigsaw_small", "instance": "data/example_instances/examples_00/jigsaw_a_36.cgshop2024_instance.json",
+     "pop_size": 4, "gens": 2, "tries": 10, "seed": 0, "time_limit": None},
+    {"name": "random_mid", "instance": "data/example_instances/examples_00/random_a_200.cgshop2024_instance.json",
+     "pop_size": 4, "gens": 1, "tries": 10, "seed": 0, "time_limit": None},
+    {"name": "atris_large", "instance": "data/example_instances/examples_01/atris1064.cgshop2024_instance.json",
+     "pop_size": 2, "gens": 1, "tries": 10, "seed": 0, "time_limit": 120},
+]
+# The measurements compared against the baseline: whether a higher value is better, and a change too small to be a regression
+# whatever the threshold, since timings of a fraction of a second are mostly noise
+METRICS = {"total_time": (False, 0.5), "base_gen_time": (False, 0.5), "mutate_time": (False, 0.5), "crossover_time": (False, 0.5),
+           "peak_memory_mb": (False, 10), "grade": (True, 0)}
+
+
+class BenchmarkGeneticAlgo(GeneticAlgo):
+    """
+    A genetic algorithm that measures the time spent in each phase of a run. It runs on the serial backend, so every task runs in
+    this process and is timed on its own, although mutations and crossovers of a generation are interleaved.
+
+    Attributes:
+        Phase_Times (dict[str, float]): The seconds spent on the base generation, on mutations and on crossovers.
+        In_Base_Gen (bool): Whether the base generation is being generated, which tells its construct_placement tasks from the
+            crossovers'.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, backend="serial", **kwargs)
+        self.Phase_Times = {"base_gen_time": 0.0, "mutate_time": 0.0, "crossover_time": 0.0}
+        self.In_Base_Gen = False
+
+    def generate_base_gen(self) -> list[Solution]:
+        start_time = time.perf_counter()
+        self.In_Base_Gen = True
+        try:
+            return super().generate_base_gen()
+        finally:
+            self.In_Base_Gen = False
+            self.Phase_Times["base_gen_time"] += time.perf_counter() - start_time
+
+    def apply_mutation(self, method_name: str, placement: tuple) -> tuple[int, tuple, float]:
+        start_time = time.perf_counter()
+        try:
+            return super().apply_mutation(method_name, placement)
+        finally:
+            self.Phase_Times["mutate_time"] += time.perf_counter() - start_time
+
+    def construct_placement(self, method_name: str, shape_positions, seed: int = None) -> tuple[int, tuple, float]:
+        if self.In_Base_Gen:
+            return super().construct_placement(method_name, shape_positions, seed)
+        start_time = time.perf_counter()
+        try:
+            return super().construct_placement(method_name, shape_positions, seed)
+        finally:
+            self.Phase_Times["crossover_time"] += time.perf_counter() - start_time
+
+
+def setup_logging():
+    log_file = 'benchmark_logs.txt'
+    if os.path.exists(log_file):
+        os.remove(log_file)
+    logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Benchmark of the Genetic Algorithm on bundled instances')
+    parser.add_argument('--cases', type=str, nargs='+', default=None, choices=[case["name"] for case in BENCHMARK_CASES],
+                        help='Cases to run (default: all)')
+    parser.add_argument('--history', type=str, default='./benchmarks/history.json', help='JSON file every run is appended to')
+    parser.add_argument('--baseline', type=str, default='./benchmarks/baseline.json', help='JSON file of the results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results of this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Relative change beyond which a slower, larger or lower-graded result is a regression')
+    return parser.parse_args()
+
+def run_case(case: dict) -> dict:
+    """
+    Runs one benchmark case. It is called in a fresh process, so the peak memory belongs to the case alone.
+
+    Args:
+        case (dict): The case, as in BENCHMARK_CASES.
+
+    Returns:
+        dict: The measurements of the case.
+    """
+    random.seed(case["seed"])
+    cont, shapes = load_instance(os.path.join(os.path.dirname(os.path.abspath(__file__)), case["instance"]))
+    algo = BenchmarkGeneticAlgo(shapes, cont, case["pop_size"], case["gens"], case["tries"], cont.Instance_Name,
+                                time_limit=case["time_limit"])
+    start_time = time.perf_counter()
+    solution = algo.run()
+    total_time = time.perf_counter() - start_time
+    # ru_maxrss is in kilobytes on Linux
+    peak_memory_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result = {"total_time": total_time, **algo.Phase_Times, "peak_memory_mb": peak_memory_mb, "grade": solution.grade(),
+              "placed_items": len(solution)}
+    return {name: round(value, 3) if isinstance(value, float) else value for name, value in result.items()}
+
+def get_commit() -> str:
+    """
+    Returns the git commit the benchmark runs on.
+
+    Returns:
+        str: The commit hash, or None outside a git repository.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def find_regressions(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+    """
+    Compares the results with the baseline. A measurement regresses if it is worse than the baseline's by more than the threshold,
+    and by more than the metric's minimum change.
+
+    Args:
+        results (dict[str, dict]): The measurements of each case.
+        baseline (dict[str, dict]): The baseline measurements of each case.
+        threshold (float): The relative change allowed.
+
+    Returns:
+        list[str]: A description of each regression.
+    """
+    regressions = []
+    for name, measurements in results.items():
+        for metric, (higher_is_better, min_change) in METRICS.items():
+            if name not in baseline or metric not in baseline[name]:
+                continue
+            old, new = baseline[name][metric], measurements[metric]
+            change = old - new if higher_is_better else new - old
+            if change > max(abs(old) * threshold, min_change):
+                regressions.append(f"{name}: {metric} went from {old} to {new}")
+    return regressions
+
+def main():
+    # Setup logging
+    setup_logging()
+
+    # Parse command-line arguments
+    args = parse_arguments()
+    cases = [case for case in BENCHMARK_CASES if args.cases is None or case["name"] in args.cases]
+
+    # Run every case in a new process, so neither memory nor caches carry over between cases
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for case in cases:
+        logging.info(f"Running benchmark case {case['name']}: {case}")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[case["name"]] = executor.submit(run_case, case).result()
+        logging.info(f"Benchmark case {case['name']} completed: {results[case['name']]}")
+        print(f"{case['name']}: {results[case['name']]}")
+
+    # Append the run to the history
+    run = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": get_commit(), "results": results}
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history, 'r') as file:
+            history = json.load(file)
+    history.append(run)
+    write_json_atomically(history, args.history)
+
+    # Compare with the baseline
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file:
+            regressions = find_regressions(results, json.load(file)["results"], args.threshold)
+    for regression in regressions:
+        logging.warning(f"Regression: {regression}")
+        print(f"Regression: {regression}")
+    if args.save_baseline:
+        write_json_atomically(run, args.baseline)
+        logging.info(f"Saved the results as the baseline in {args.baseline}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import argparse
-import json
+import cProfile
 import logging
 import os
-from algos.genetic_algo import GeneticAlgo
-from utils.utils import load_json_from_file
+from logging.handlers import RotatingFileHandler
+from algos.genetic_algo import TELEMETRY, GeneticAlgo
+from algos.permutation_genetic_algo import PermutationGeneticAlgo
+from utils.Instrumentation import INSTRUMENTATION
+from utils.JsonLinesFormatter import JsonLinesFormatter
+from utils.utils import load_instance, write_json_atomically
 import time
 
 def setup_logging():
@@ -12,13 +16,37 @@ def setup_logging():
         os.remove(log_file)
     logging.basicConfig(filename="logs.txt",level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def setup_telemetry(instance_name: str) -> str:
+    # Every run gets its own JSON-lines file, rotated when it grows large
+    telemetry_file = f"./telemetry/{instance_name}_{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+    os.makedirs(os.path.dirname(telemetry_file), exist_ok=True)
+    handler = RotatingFileHandler(telemetry_file, maxBytes=10 * 1024 * 1024, backupCount=5)
+    handler.setFormatter(JsonLinesFormatter())
+    TELEMETRY.setLevel(logging.INFO)
+    TELEMETRY.addHandler(handler)
+    return telemetry_file
+
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Genetic Algorithm for Shape Placement')
     parser.add_argument('--pop_size', type=int, default=4, help='Population size')
     parser.add_argument('--gens', type=int, default=5, help='Number of generations')
     parser.add_argument('--tries', type=int, default=10, help='Tries on random creation')
     parser.add_argument('--instance', type=str, required=True, help='Path to instance JSON file')
-    return parser.parse_args()
+    parser.add_argument('--mode', type=str, default='solution', choices=['solution', 'permutation'],
+                        help='Evolve placed solutions, or item orders decoded by a placement heuristic')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='Wall-clock budget in seconds. The best solution so far is written whenever it improves')
+    parser.add_argument('--checkpoint-every', type=int, default=1, help='Generations between checkpoints (0 disables them)')
+    parser.add_argument('--resume', action='store_true', help='Continue from the latest checkpoint of the instance')
+    parser.add_argument('--cache-size', type=int, default=1024, help='Entries of the fitness cache (0 disables it)')
+    parser.add_argument('--backend', type=str, default='process', choices=['serial', 'thread', 'process'], help='Execution backend')
+    parser.add_argument('--workers', type=int, default=None, help='Number of workers of the backend (default: one per CPU)')
+    parser.add_argument('--profile', action='store_true', help='Count and time the hot paths, in all workers, and save the counters')
+    parser.add_argument('--pstats', type=str, default=None, help='Also profile the main process with cProfile and save the stats here')
+    args = parser.parse_args()
+    if args.resume and args.checkpoint_every <= 0:
+        parser.error("--resume needs checkpoints, so it cannot be combined with --checkpoint-every 0")
+    return args
 
 def main():
     # Setup logging
@@ -28,22 +56,40 @@ def main():
     args = parse_arguments()
 
     # Load instance data
-    instance_data = load_json_from_file(args.instance)
+    instance_data = load_instance(args.instance)
     logging.info(f"Loaded instance data from {args.instance}")
+    telemetry_file = setup_telemetry(instance_data[0].Instance_Name)
+    logging.info(f"Writing telemetry to {telemetry_file}")
 
     # Initialize genetic algorithm with parameters
-    algo = GeneticAlgo(pop_size=args.pop_size, gens=args.gens, tries_on_random_creation=args.tries, cont=instance_data[0], shapes=instance_data[1], instance_name= instance_data[0].Instance_Name)
-    logging.info(f"Initialized Genetic Algorithm with pop_size={args.pop_size}, gens={args.gens}, tries_on_random_creation={args.tries}")
+    output_path = f"./solutions/{instance_data[0].Instance_Name}_solution.json"
+    checkpoint_path = f"./checkpoints/{instance_data[0].Instance_Name}_checkpoint.npz" if args.checkpoint_every > 0 else None
+    algo_class = PermutationGeneticAlgo if args.mode == 'permutation' else GeneticAlgo
+    algo = algo_class(pop_size=args.pop_size, gens=args.gens, tries_on_random_creation=args.tries, cont=instance_data[0], shapes=instance_data[1], instance_name= instance_data[0].Instance_Name,
+                        backend=args.backend, workers=args.workers, cache_size=args.cache_size,
+                        time_limit=args.time_limit, output_path=output_path,
+                        checkpoint_path=checkpoint_path, checkpoint_interval=max(args.checkpoint_every, 1), resume=args.resume)
+    logging.info(f"Initialized Genetic Algorithm with pop_size={args.pop_size}, gens={args.gens}, tries_on_random_creation={args.tries}, mode={args.mode}, backend={args.backend}, workers={args.workers}, cache_size={args.cache_size}, time_limit={args.time_limit}, checkpoint_every={args.checkpoint_every}, resume={args.resume}")
 
     # Run the algorithm
+    INSTRUMENTATION.Enabled = args.profile
+    profiler = cProfile.Profile() if args.pstats else None
     start_time = time.time()
+    if profiler:
+        profiler.enable()
     solution = algo.run()
+    if profiler:
+        profiler.disable()
+        profiler.dump_stats(args.pstats)
+        logging.info(f"Saved the cProfile stats to {args.pstats}")
     end_time = time.time()
     duration = end_time - start_time
     logging.info(f"Algorithm execution completed\nTotal time taken: {duration:.3f} seconds")
-    json_data = solution.export_to_json()
-    with open(f"./solutions/{solution.Name}_solution.json", 'w') as file:
-        json.dump(json_data, file, indent=4)
+    if args.profile:
+        profile_path = f"./profiles/{instance_data[0].Instance_Name}_profile.json"
+        write_json_atomically(INSTRUMENTATION.snapshot(), profile_path)
+        logging.info(f"Instrumentation counters, saved to {profile_path}:\n{INSTRUMENTATION}")
+    write_json_atomically(solution.export_to_json(), output_path)
     solution.visualize_solution()
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+from .Container import Container
+from .PreparedGeometry import PreparedGeometry
+
+
+class ContainerContext:
+    """
+    The container's geometry, computed once per run and shared by the algorithm, its solutions and its workers.
+
+    Attributes:
+        Container (Container): The container the context describes.
+        Polygon (Polygon): The container's Shapely polygon.
+        Prepared_Polygon (PreparedGeometry): The container's polygon prepared for fast contains checks, one copy per thread.
+        Bounds (tuple[int, int, int, int]): The container's bounding box (minx, miny, maxx, maxy).
+        Area (float): The container's area.
+        Anchors (dict[str, tuple[int, int]]): For each corner ("bottom_left", "top_left", "top_right", "bottom_right"), the
+            container vertex to start packing from: the lowest vertex on the left edge for bottom-left, the highest for top-left,
+            the right-most vertex on the top edge for top-right and the right-most vertex on the bottom edge for bottom-right.
+        Raster_Masks (dict[int, tuple]): The raster mask of each item type on the container's occupancy grid, by prototype id,
+            computed on first use by OccupancyGrid.get_mask.
+        Core_Sizes (dict[int, tuple[float, float, float]]): The size of each item type's core in the free space tracking of the
+            solutions, by prototype id, computed on first use by FreeSpace.get_core_size.
+    """
+
+    def __init__(self, cont: Container):
+        """
+        Initializes the context from a container.
+
+        Args:
+            cont (Container): The container to describe.
+        """
+        self.Container = cont
+        self.Polygon = cont.get_polygon_object()
+        self.Prepared_Polygon = PreparedGeometry(self.Polygon)
+        self.Area = self.Polygon.area
+        min_x, max_x = min(cont.X_cor), max(cont.X_cor)
+        min_y, max_y = min(cont.Y_cor), max(cont.Y_cor)
+        self.Bounds = (min_x, min_y, max_x, max_y)
+        vertices = list(zip(cont.X_cor, cont.Y_cor))
+        self.Anchors = {
+            "bottom_left": min((x, y) for x, y in vertices if x == min_x),
+            "top_left": max((x, y) for x, y in vertices if x == min_x),
+            "top_right": max((x, y) for x, y in vertices if y == max_y),
+            "bottom_right": max((x, y) for x, y in vertices if y == min_y),
+        }
+        self.Raster_Masks = {}
+        self.Core_Sizes = {}
+
+    def contains(self, polygon) -> bool:
+        """
+        Checks whether a polygon lies fully inside the container.
+
+        Args:
+            polygon (Polygon): The polygon to check.
+
+        Returns:
+            bool: True if the polygon lies inside the container, False otherwise.
+        """
+        return self.Prepared_Polygon.get().contains(polygon)
@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+# The supported kinds of backend
+BACKEND_KINDS = ("serial", "thread", "process")
+
+
+class ExecutionBackend:
+    """
+    Runs tasks in this process, on a pool of threads or on a pool of processes, behind a single interface.
+
+    Attributes:
+        Kind (str): One of BACKEND_KINDS.
+        Max_Workers (int): The number of workers of the pool. Always 1 for the serial backend.
+        Shares_Memory (bool): Whether tasks run in this process and can use its objects directly.
+        Executor (Executor): The underlying pool, or None for the serial backend.
+    """
+
+    def __init__(self, kind: str = "process", max_workers: int = None, initializer=None, initargs: tuple = ()):
+        """
+        Initializes the backend and starts its workers.
+
+        Args:
+            kind (str): One of BACKEND_KINDS.
+            max_workers (int): The number of workers. Defaults to the number of CPUs.
+            initializer (callable): Called with initargs when a worker process starts. Only used by the process backend, since
+                the other backends share this process's objects.
+            initargs (tuple): The arguments of the initializer.
+
+        Raises:
+            Exception: If the kind is unknown or the number of workers is not positive.
+        """
+        if kind not in BACKEND_KINDS:
+            raise Exception(f"Unknown backend {kind}, expected one of {', '.join(BACKEND_KINDS)}")
+        if max_workers is not None and max_workers < 1:
+            raise Exception("Number of workers must be positive")
+        self.Kind = kind
+        self.Shares_Memory = kind != "process"
+        if kind == "serial":
+            self.Max_Workers = 1
+            self.Executor = None
+        elif kind == "thread":
+            self.Max_Workers = max_workers or os.cpu_count() or 1
+            self.Executor = ThreadPoolExecutor(max_workers=self.Max_Workers)
+        else:
+            self.Max_Workers = max_workers or os.cpu_count() or 1
+            self.Executor = ProcessPoolExecutor(max_workers=self.Max_Workers, initializer=initializer, initargs=initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, fn, *args) -> Future:
+        """
+        Schedules a task. The serial backend runs it right away and returns a completed future.
+
+        Args:
+            fn (callable): The task function. For the process backend it has to be picklable.
+            *args: The arguments of the task.
+
+        Returns:
+            Future: The future result of the task.
+        """
+        if self.Executor is not None:
+            return self.Executor.submit(fn, *args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self) -> None:
+        """
+        Waits for the scheduled tasks and stops the workers.
+        """
+        if self.Executor is not None:
+            self.Executor.shutdown()
@@ -0,0 +1,113 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+
+class FitnessCache:
+    """
+    A bounded least-recently-used cache of evaluation results, keyed by a fingerprint of what was evaluated.
+
+    Attributes:
+        Max_Size (int): The maximum number of entries. The least recently used entry is evicted when it is exceeded.
+        Entries (OrderedDict): Maps a fingerprint to its result, from least to most recently used.
+        Hits (int): The number of lookups that found an entry.
+        Misses (int): The number of lookups that did not.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initializes an empty cache.
+
+        Args:
+            max_size (int): The maximum number of entries.
+
+        Raises:
+            Exception: If the maximum size is not positive.
+        """
+        if max_size < 1:
+            raise Exception("Cache size must be positive")
+        self.Max_Size = max_size
+        self.Entries = OrderedDict()
+        self.Hits = 0
+        self.Misses = 0
+
+    def __len__(self):
+        return len(self.Entries)
+
+    def __str__(self):
+        """
+        Returns a summary of the cache's use, for the run log.
+
+        Returns:
+            str: The number of hits and misses, the hit rate and the number of entries.
+        """
+        return (f"Fitness cache: {self.Hits} hits, {self.Misses} misses ({self.get_hit_rate():.1%} hit rate), "
+                f"{len(self)}/{self.Max_Size} entries")
+
+    @staticmethod
+    def fingerprint(*parts) -> bytes:
+        """
+        Calculates a canonical fingerprint of the given values. Arrays are fingerprinted by their dtype, shape and contents.
+
+        Args:
+            *parts: Strings, numbers, NumPy arrays, or tuples of them.
+
+        Returns:
+            bytes: A 16-byte digest of the values.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        pending = list(parts)
+        while pending:
+            part = pending.pop(0)
+            if isinstance(part, tuple):
+                digest.update(b"(%d" % len(part))
+                pending[:0] = part
+            elif isinstance(part, np.ndarray):
+                array = np.ascontiguousarray(part)
+                digest.update(f"{array.dtype.str}{array.shape}".encode())
+                digest.update(array.tobytes())
+            else:
+                digest.update(repr(part).encode())
+            digest.update(b";")
+        return digest.digest()
+
+    def get(self, key: bytes):
+        """
+        Looks up a result and marks it as recently used.
+
+        Args:
+            key (bytes): The fingerprint to look up.
+
+        Returns:
+            The cached result, or None if there is none.
+        """
+        value = self.Entries.get(key)
+        if value is None:
+            self.Misses += 1
+            return None
+        self.Hits += 1
+        self.Entries.move_to_end(key)
+        return value
+
+    def put(self, key: bytes, value) -> None:
+        """
+        Stores a result, evicting the least recently used entry if the cache is full.
+
+        Args:
+            key (bytes): The fingerprint of what was evaluated.
+            value: The result.
+        """
+        self.Entries[key] = value
+        self.Entries.move_to_end(key)
+        if len(self.Entries) > self.Max_Size:
+            self.Entries.popitem(last=False)
+
+    def get_hit_rate(self) -> float:
+        """
+        Calculates the share of lookups that found an entry.
+
+        Returns:
+            float: The hit rate, or 0 if there were no lookups.
+        """
+        lookups = self.Hits + self.Misses
+        return self.Hits / lookups if lookups else 0.0
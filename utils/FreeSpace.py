@@ -0,0 +1,249 @@
+import numpy as np
+import shapely
+from .ContainerContext import ContainerContext
+from .ShapePrototype import ShapePrototype
+
+# The clearance is the container's longer side divided by this
+FREE_SPACE_CLEARANCE_RESOLUTION = 256
+# Number of pending placements above which the components are computed again from all placed shapes instead of one by one
+FREE_SPACE_REBUILD_THRESHOLD = 32
+# Slack on the size comparisons, for the rounding of the coordinates that overlay operations create
+FREE_SPACE_TOLERANCE = 1e-6
+# Mitre limit of the items' erosion, high enough that no corner is bevelled, since a bevel erodes less than the exact erosion
+FREE_SPACE_MITRE_LIMIT = 1e9
+
+
+class FreeSpace:
+    """
+    The free space of a solution, split into connected components with their bounding boxes and areas, to skip the items that
+    are too large for every component without searching for a position.
+
+    Placed shapes may not touch, so the free space itself is connected through the gaps between them, however small. The
+    components are therefore those of the free space eroded by a clearance: the points of the container farther than the
+    clearance from its boundary and from every placed shape. An item's core, the largest part of its polygon eroded by the same
+    clearance, lies inside a single component wherever the item is placed. An item whose core is larger than every component, in
+    area or in either side of its bounding box, cannot be placed.
+
+    The erosions are computed so that the components are never smaller, and the cores never larger, than the exact ones, which
+    keeps the check conservative.
+
+    Placing or removing a shape only records it, and the changes are applied when the components are next needed. A placed shape
+    is subtracted from the components it overlaps. The region freed by a removed shape, less what the shapes around it still
+    block, is merged with the components it touches. After many changes the components are computed again from all placed shapes.
+
+    Attributes:
+        Context (ContainerContext): The container's cached geometry.
+        Clearance (float): The distance the free space and the items are eroded by.
+        Region (Polygon): The container eroded by the clearance, or None until the components are first computed.
+        Components (list[Polygon]): The connected components of the eroded free space, or None if they have to be computed again.
+        Areas (np.ndarray): The area of each component.
+        Widths (np.ndarray): The width of each component's bounding box.
+        Heights (np.ndarray): The height of each component's bounding box.
+        Pending (list[tuple[bool, ShapePrototype, int, int]]): The changes since the components were computed: whether a shape
+            was placed or removed, its prototype and its offsets.
+        Core_Sizes (dict[int, tuple[float, float, float]]): The area, width and height of each item's core, by prototype id,
+            shared with the free space of the other solutions of the container.
+    """
+
+    def __init__(self, context: ContainerContext):
+        """
+        Initializes the free space of an empty container.
+
+        Args:
+            context (ContainerContext): The container's cached geometry. Its Core_Sizes cache holds the sizes of the items' cores.
+        """
+        min_x, min_y, max_x, max_y = context.Bounds
+        self.Context = context
+        self.Clearance = max(max_x - min_x, max_y - min_y, 1) / FREE_SPACE_CLEARANCE_RESOLUTION
+        self.Region = None
+        self.Components = None
+        self.Areas = None
+        self.Widths = None
+        self.Heights = None
+        self.Pending = []
+        self.Core_Sizes = context.Core_Sizes
+
+    def copy(self) -> "FreeSpace":
+        """
+        Creates an independent copy of the free space. The component polygons, which are never modified, are shared.
+
+        Returns:
+            FreeSpace: The copy of the free space.
+        """
+        free_space_copy = FreeSpace.__new__(FreeSpace)
+        free_space_copy.__dict__.update(self.__dict__)
+        free_space_copy.Pending = list(self.Pending)
+        return free_space_copy
+
+    def record(self, occupied: bool, prototype: ShapePrototype, x_offset: int, y_offset: int) -> None:
+        """
+        Records that a shape was placed or removed. A move is a removal followed by a placement.
+
+        Args:
+            occupied (bool): True if the shape was placed, False if it was removed.
+            prototype (ShapePrototype): The shape's prototype.
+            x_offset (int): The x offset of the shape.
+            y_offset (int): The y offset of the shape.
+        """
+        if self.Components is None:
+            return
+        if len(self.Pending) >= FREE_SPACE_REBUILD_THRESHOLD:
+            # Computing the components again is cheaper than applying the changes one by one
+            self.Components = None
+            self.Pending = []
+            return
+        self.Pending.append((occupied, prototype, x_offset, y_offset))
+
+    def get_blocked_region(self, polygons):
+        """
+        Returns the region within the clearance of some shapes. Arcs are replaced by their chords, which lie inside the exact
+        region, so the components it is subtracted from are never too small.
+
+        Args:
+            polygons: The polygon or array of polygons of the shapes.
+
+        Returns:
+            The polygon or array of polygons of the shapes grown by the clearance.
+        """
+        return shapely.buffer(polygons, self.Clearance, quad_segs=1)
+
+    def update(self, get_placed_polygons, get_polygons_near) -> None:
+        """
+        Brings the components up to date with the changes since they were computed.
+
+        Args:
+            get_placed_polygons: A function returning the polygons of all placed shapes, called if the components are computed
+                from scratch.
+            get_polygons_near: A function returning the polygons of the placed shapes whose bounding boxes intersect a bounding
+                box, called for the removed shapes.
+        """
+        if self.Components is None:
+            if self.Region is None:
+                # A negative buffer removes the chords' segments rather than the exact arcs, so it is never smaller than the erosion
+                self.Region = shapely.buffer(self.Context.Polygon, -self.Clearance, quad_segs=1)
+            region = self.Region
+            placed_polygons = get_placed_polygons()
+            if placed_polygons:
+                region = shapely.difference(region, shapely.union_all(self.get_blocked_region(np.array(placed_polygons, dtype=object))))
+            components = list(shapely.get_parts(region))
+        else:
+            if not self.Pending:
+                return
+            components = self.Components
+            for occupied, prototype, x_offset, y_offset in self.Pending:
+                blocked_region = self.get_blocked_region(prototype.get_polygon(x_offset, y_offset))
+                if occupied:
+                    components = self.subtract(components, blocked_region)
+                else:
+                    components = self.merge(components, self.get_freed_region(blocked_region, get_polygons_near))
+        components = [component for component in components if component.area > 0]
+        polygons = np.array(components, dtype=object)
+        bounds = shapely.bounds(polygons).reshape(-1, 4)
+        self.Areas = shapely.area(polygons)
+        self.Widths = bounds[:, 2] - bounds[:, 0]
+        self.Heights = bounds[:, 3] - bounds[:, 1]
+        self.Components = components
+        self.Pending = []
+
+    @staticmethod
+    def subtract(components: list, blocked_region) -> list:
+        """
+        Subtracts a blocked region from the components it overlaps, splitting them where it cuts through.
+
+        Args:
+            components (list[Polygon]): The components before the subtraction.
+            blocked_region (Polygon): The region to subtract.
+
+        Returns:
+            list[Polygon]: The components after the subtraction.
+        """
+        overlapping = shapely.intersects(np.array(components, dtype=object), blocked_region)
+        if not overlapping.any():
+            return components
+        kept = [component for component, is_overlapping in zip(components, overlapping) if not is_overlapping]
+        # One overlay over all the overlapping components keeps their parts from sharing edges after the coordinates are rounded
+        cut = shapely.difference(shapely.union_all([component for component, is_overlapping in zip(components, overlapping) if is_overlapping]),
+                                 blocked_region)
+        return kept + list(shapely.get_parts(cut))
+
+    def get_freed_region(self, blocked_region, get_polygons_near):
+        """
+        Calculates the part of a removed shape's blocked region that is free again: the part inside the eroded container that no
+        shape placed now blocks. Changes are applied after the fact, so the shapes placed now include those placed after the
+        removal, which are subtracted again by their own pending placements.
+
+        Args:
+            blocked_region (Polygon): The blocked region of the removed shape.
+            get_polygons_near: A function returning the polygons of the placed shapes whose bounding boxes intersect a bounding box.
+
+        Returns:
+            Geometry: The freed region.
+        """
+        freed_region = shapely.intersection(blocked_region, self.Region)
+        # Only shapes within the clearance of the blocked region can block part of it
+        min_x, min_y, max_x, max_y = blocked_region.bounds
+        neighbours = get_polygons_near((min_x - self.Clearance, min_y - self.Clearance, max_x + self.Clearance, max_y + self.Clearance))
+        if neighbours:
+            freed_region = shapely.difference(freed_region, shapely.union_all(self.get_blocked_region(np.array(neighbours, dtype=object))))
+        return freed_region
+
+    @staticmethod
+    def merge(components: list, freed_region) -> list:
+        """
+        Merges a freed region with the components it touches, joining them into one where it connects them.
+
+        Args:
+            components (list[Polygon]): The components before the merge.
+            freed_region (Geometry): The freed region.
+
+        Returns:
+            list[Polygon]: The components after the merge.
+        """
+        if freed_region.is_empty:
+            return components
+        touching = shapely.intersects(np.array(components, dtype=object), freed_region)
+        kept = [component for component, is_touching in zip(components, touching) if not is_touching]
+        merged = shapely.union_all([component for component, is_touching in zip(components, touching) if is_touching] + [freed_region])
+        return kept + list(shapely.get_parts(merged))
+
+    def get_core_size(self, prototype: ShapePrototype) -> tuple[float, float, float]:
+        """
+        Returns the size of an item's core, computing it on first use.
+
+        Args:
+            prototype (ShapePrototype): The item.
+
+        Returns:
+            tuple[float, float, float]: The area, width and height of the largest part of the item eroded by the clearance, or
+            zeros if nothing is left of it.
+        """
+        core_size = self.Core_Sizes.get(prototype.Id)
+        if core_size is None:
+            # Mitred corners erode more than round ones, so the core is never larger than the exact one
+            parts = shapely.get_parts(shapely.buffer(prototype.Base_Polygon, -self.Clearance, join_style="mitre",
+                                                     mitre_limit=FREE_SPACE_MITRE_LIMIT))
+            core_size = (0.0, 0.0, 0.0)
+            if len(parts):
+                core = max(parts, key=lambda part: part.area)
+                min_x, min_y, max_x, max_y = core.bounds
+                core_size = (core.area, max_x - min_x, max_y - min_y)
+            self.Core_Sizes[prototype.Id] = core_size
+        return core_size
+
+    def can_fit(self, prototype: ShapePrototype) -> bool:
+        """
+        Checks whether some component is at least as large as an item's core in area and in both sides of its bounding box. Only
+        meaningful once the components are up to date.
+
+        Args:
+            prototype (ShapePrototype): The item to check.
+
+        Returns:
+            bool: False if the item surely cannot be placed, True if it may fit.
+        """
+        area, width, height = self.get_core_size(prototype)
+        if area == 0:
+            return True
+        return bool(np.any((self.Areas * (1 + FREE_SPACE_TOLERANCE) >= area)
+                           & (self.Widths + FREE_SPACE_TOLERANCE >= width)
+                           & (self.Heights + FREE_SPACE_TOLERANCE >= height)))
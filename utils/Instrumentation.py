@@ -0,0 +1,129 @@
+import time
+from contextlib import nullcontext
+
+
+class Instrumentation:
+    """
+    Counters and timers of the solver's hot paths. They cost a single check while disabled, which is the default.
+
+    Every process has its own instance, INSTRUMENTATION. Worker processes send theirs to the main process, which merges them.
+    Under the thread backend, increments from different threads may occasionally be lost, so counts are approximate there.
+
+    Attributes:
+        Enabled (bool): Whether events are recorded.
+        Counters (dict[str, int]): The number of times each event happened. A timed event counts its calls.
+        Timers (dict[str, float]): The seconds spent in each timed event.
+    """
+
+    def __init__(self):
+        """
+        Initializes disabled instrumentation with no events.
+        """
+        self.Enabled = False
+        self.Counters = {}
+        self.Timers = {}
+
+    def __str__(self):
+        """
+        Returns the counters and timers, one per line, for the run log.
+
+        Returns:
+            str: The events sorted by name, with the total and mean time of the timed ones.
+        """
+        lines = []
+        for name in sorted(self.Counters.keys() | self.Timers.keys()):
+            count = self.Counters.get(name, 0)
+            if name in self.Timers:
+                seconds = self.Timers[name]
+                lines.append(f"{name}: {count} calls, {seconds:.3f} s total, {1000 * seconds / max(count, 1):.3f} ms per call")
+            else:
+                lines.append(f"{name}: {count}")
+        return "\n".join(lines)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Records that an event happened.
+
+        Args:
+            name (str): The name of the event.
+            amount (int): How many times it happened.
+        """
+        if self.Enabled:
+            self.Counters[name] = self.Counters.get(name, 0) + amount
+
+    def timer(self, name: str):
+        """
+        Returns a context manager that counts and times the code it wraps as an event.
+
+        Args:
+            name (str): The name of the event.
+
+        Returns:
+            A context manager recording the event, or one doing nothing if the instrumentation is disabled.
+        """
+        if not self.Enabled:
+            return nullcontext()
+        return _Timer(self, name)
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        Returns a copy of the recorded events, to save them or send them to another process.
+
+        Returns:
+            dict[str, dict]: The counters and the timers.
+        """
+        return {"counters": dict(self.Counters), "timers": dict(self.Timers)}
+
+    def merge(self, snapshot: dict[str, dict]) -> None:
+        """
+        Adds the events of a snapshot, taken in another process, to these.
+
+        Args:
+            snapshot (dict[str, dict]): The snapshot to add.
+        """
+        for name, count in snapshot["counters"].items():
+            self.Counters[name] = self.Counters.get(name, 0) + count
+        for name, seconds in snapshot["timers"].items():
+            self.Timers[name] = self.Timers.get(name, 0.0) + seconds
+
+    def pop(self) -> dict[str, dict]:
+        """
+        Returns the recorded events and clears them, so each is only sent once.
+
+        Returns:
+            dict[str, dict]: The counters and the timers.
+        """
+        snapshot = self.snapshot()
+        self.reset()
+        return snapshot
+
+    def reset(self) -> None:
+        """
+        Clears the recorded events.
+        """
+        self.Counters = {}
+        self.Timers = {}
+
+
+class _Timer:
+    """
+    Records the duration of a with block as an event of an Instrumentation.
+    """
+
+    def __init__(self, instrumentation: Instrumentation, name: str):
+        self.Instrumentation = instrumentation
+        self.Name = name
+        self.Start = None
+
+    def __enter__(self):
+        self.Start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        instrumentation = self.Instrumentation
+        instrumentation.Counters[self.Name] = instrumentation.Counters.get(self.Name, 0) + 1
+        instrumentation.Timers[self.Name] = instrumentation.Timers.get(self.Name, 0.0) + time.perf_counter() - self.Start
+
+
+# The instrumentation of this process
+INSTRUMENTATION = Instrumentation()
@@ -0,0 +1,25 @@
+import json
+import logging
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats log records as JSON objects, one per line, for dashboards to tail without parsing free text.
+
+    The message of a record is the name of the event, and its fields are passed in the record's "fields" extra attribute, as in
+    logger.info("generation", extra={"fields": {...}}). Nothing is serialized unless a handler emits the record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Serializes a record as a single line of JSON.
+
+        Args:
+            record (logging.LogRecord): The record to format.
+
+        Returns:
+            str: The JSON object, with the time and the name of the event followed by the event's fields.
+        """
+        event = {"time": round(record.created, 3), "event": record.getMessage()}
+        event.update(getattr(record, "fields", {}))
+        return json.dumps(event, default=str)
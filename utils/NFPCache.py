@@ -0,0 +1,502 @@
+import bisect
+import math
+import random
+import threading
+import numpy as np
+import shapely
+from shapely.geometry import LineString, Point, Polygon, box
+from shapely.geometry.polygon import orient
+from .ContainerContext import ContainerContext
+from .PreparedGeometry import PreparedGeometry
+from .Shape import Shape
+from .Solution import Solution
+
+
+def _cross(o: tuple, a: tuple, b: tuple) -> float:
+    """
+    Calculates the z component of the cross product of the vectors o->a and o->b.
+
+    Args:
+        o (tuple): The common origin.
+        a (tuple): The end of the first vector.
+        b (tuple): The end of the second vector.
+
+    Returns:
+        float: Positive for a counter-clockwise turn, negative for a clockwise turn and zero if the points are collinear.
+    """
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+def _in_triangle(p: tuple, a: tuple, b: tuple, c: tuple) -> bool:
+    """
+    Checks whether a point lies inside or on the boundary of a counter-clockwise triangle.
+    """
+    return _cross(a, b, p) >= 0 and _cross(b, c, p) >= 0 and _cross(c, a, p) >= 0
+
+
+def _is_convex(points: list[tuple], piece: list[int]) -> bool:
+    """
+    Checks whether a counter-clockwise polygon, given as indices into points, is convex.
+    """
+    n = len(piece)
+    for k in range(n):
+        if _cross(points[piece[k - 1]], points[piece[k]], points[piece[(k + 1) % n]]) < 0:
+            return False
+    return True
+
+
+def triangulate_polygon(points: list[tuple]) -> list[list[int]]:
+    """
+    Triangulates a simple counter-clockwise polygon by ear clipping.
+
+    Args:
+        points (list[tuple]): The vertices of the polygon, without repeating the first vertex.
+
+    Returns:
+        list[list[int]]: The triangles, as counter-clockwise triples of indices into points.
+
+    Raises:
+        Exception: If no ear can be found, which only happens for non-simple polygons.
+    """
+    remaining = list(range(len(points)))
+    triangles = []
+    while len(remaining) > 3:
+        for k in range(len(remaining)):
+            i_prev, i, i_next = remaining[k - 1], remaining[k], remaining[(k + 1) % len(remaining)]
+            a, b, c = points[i_prev], points[i], points[i_next]
+            turn = _cross(a, b, c)
+            if turn == 0:
+                # A collinear vertex adds nothing to the polygon
+                remaining.pop(k)
+                break
+            if turn < 0:
+                continue
+            if any(_in_triangle(points[j], a, b, c) for j in remaining if points[j] not in (a, b, c)):
+                continue
+            triangles.append([i_prev, i, i_next])
+            remaining.pop(k)
+            break
+        else:
+            raise Exception("Could not triangulate polygon")
+    if _cross(points[remaining[0]], points[remaining[1]], points[remaining[2]]) != 0:
+        triangles.append(remaining)
+    return triangles
+
+
+def convex_decomposition(x_cor, y_cor) -> list[np.ndarray]:
+    """
+    Decomposes a simple polygon into convex pieces by merging the triangles of an ear clipping triangulation (Hertel-Mehlhorn).
+
+    Args:
+        x_cor (list[int]): The x-coordinates of the polygon.
+        y_cor (list[int]): The y-coordinates of the polygon.
+
+    Returns:
+        list[np.ndarray]: The vertices of each convex piece, as arrays of shape (k, 2).
+    """
+    polygon = orient(Polygon(list(zip(x_cor, y_cor))), sign=1.0)
+    points = list(polygon.exterior.coords)[:-1]
+    if _is_convex(points, list(range(len(points)))):
+        return [np.array(points, dtype=float)]
+
+    pieces = triangulate_polygon(points)
+    merged = True
+    while merged:
+        merged = False
+        edge_owner = {}
+        for piece_index, piece in enumerate(pieces):
+            for k in range(len(piece)):
+                edge_owner[(piece[k], piece[(k + 1) % len(piece)])] = piece_index
+        for (u, v), first in edge_owner.items():
+            second = edge_owner.get((v, u))
+            if second is None or second == first:
+                continue
+            # Rotate the first piece to run v..u and the second to run u..v, then glue them along the diagonal
+            a, b = pieces[first], pieces[second]
+            a = a[a.index(v):] + a[:a.index(v)]
+            b = b[b.index(u):] + b[:b.index(u)]
+            candidate = a + b[1:-1]
+            if _is_convex(points, candidate):
+                pieces[first] = candidate
+                pieces.pop(second)
+                merged = True
+                break
+    return [np.array([points[i] for i in piece], dtype=float) for piece in pieces]
+
+
+def union_all(geometries):
+    """
+    Unites geometries with integer vertices. If the floating-point overlay runs into a division by zero, which happens for some
+    nearly collinear edges far from the origin, the union is computed again with snap rounding to the integer grid.
+
+    Args:
+        geometries: The geometries to unite.
+
+    Returns:
+        Geometry: The union of the geometries.
+    """
+    with np.errstate(divide="raise", invalid="raise"):
+        try:
+            return shapely.union_all(geometries)
+        except FloatingPointError:
+            return shapely.union_all(geometries, grid_size=1)
+
+
+def minkowski_difference(pieces_a: list[np.ndarray], pieces_b: list[np.ndarray]):
+    """
+    Calculates the Minkowski difference A - B of two polygons given by their convex pieces.
+
+    The difference of two convex pieces is the convex hull of the pairwise vertex differences, and the difference of the
+    polygons is the union of the differences of their pieces.
+
+    Args:
+        pieces_a (list[np.ndarray]): The convex pieces of A.
+        pieces_b (list[np.ndarray]): The convex pieces of B.
+
+    Returns:
+        Geometry: The Minkowski difference of A and B.
+    """
+    hulls = []
+    for piece_a in pieces_a:
+        for piece_b in pieces_b:
+            differences = (piece_a[:, None, :] - piece_b[None, :, :]).reshape(-1, 2)
+            hulls.append(shapely.multipoints(differences).convex_hull)
+    return union_all(hulls)
+
+
+class InnerFitRegion:
+    """
+    The set of offsets at which a shape lies fully inside the container, with a sampler of uniformly distributed offsets.
+
+    Attributes:
+        Region (Geometry): The inner-fit region. Offsets on its boundary are feasible.
+        Prepared_Region (PreparedGeometry): The region prepared for fast point checks, one copy per thread.
+        Triangles (list[tuple]): A triangulation of the region used for sampling, or None if the region has holes.
+            Regions without area, and regions with holes, are sampled by rejection from their bounding box instead.
+        Cumulative_Areas (list[float]): The running total of the triangles' areas.
+    """
+
+    def __init__(self, region):
+        """
+        Initializes the inner-fit region and triangulates it for sampling.
+
+        Args:
+            region (Geometry): The inner-fit region.
+        """
+        self.Region = region
+        self.Triangles = []
+        self.Cumulative_Areas = []
+        self.Prepared_Region = PreparedGeometry(region)
+        for part in shapely.get_parts(region):
+            if not isinstance(part, Polygon) or part.area == 0:
+                continue
+            if part.interiors:
+                self.Triangles = None
+                break
+            points = list(orient(part, sign=1.0).exterior.coords)[:-1]
+            try:
+                self.Triangles.extend(tuple(points[i] for i in triangle) for triangle in triangulate_polygon(points))
+            except Exception:
+                self.Triangles = None
+                break
+        if self.Triangles:
+            total = 0
+            for a, b, c in self.Triangles:
+                total += abs(_cross(a, b, c)) / 2
+                self.Cumulative_Areas.append(total)
+
+    def contains(self, x, y):
+        """
+        Checks whether offsets lie in the region or on its boundary.
+
+        Args:
+            x: The x offset, or an array of x offsets.
+            y: The y offset, or an array of y offsets.
+
+        Returns:
+            The result of the check, for each offset if arrays were given.
+        """
+        return shapely.intersects_xy(self.Prepared_Region.get(), x, y)
+
+    def sample(self, rng=random, max_tries: int = 100) -> tuple[int, int]:
+        """
+        Samples an integer offset uniformly from the region.
+
+        A triangle is picked with probability proportional to its area and a point is drawn uniformly inside it, then rounded
+        to the integer grid. Rounded points that fall out of the region are redrawn.
+
+        Args:
+            rng: The random number generator to use.
+            max_tries (int): The maximum number of draws.
+
+        Returns:
+            tuple[int, int]: The sampled x and y offsets, or (None, None) if the region has no integer offset.
+        """
+        if self.Region.is_empty:
+            return None, None
+        min_x, min_y, max_x, max_y = self.Region.bounds
+        for _ in range(max_tries):
+            if self.Triangles:
+                a, b, c = self.Triangles[bisect.bisect(self.Cumulative_Areas, rng.random() * self.Cumulative_Areas[-1]) % len(self.Triangles)]
+                r1, r2 = rng.random(), rng.random()
+                if r1 + r2 > 1:
+                    r1, r2 = 1 - r1, 1 - r2
+                x = round(a[0] + r1 * (b[0] - a[0]) + r2 * (c[0] - a[0]))
+                y = round(a[1] + r1 * (b[1] - a[1]) + r2 * (c[1] - a[1]))
+            else:
+                if math.ceil(min_x) > math.floor(max_x) or math.ceil(min_y) > math.floor(max_y):
+                    return None, None
+                x = rng.randint(math.ceil(min_x), math.floor(max_x))
+                y = rng.randint(math.ceil(min_y), math.floor(max_y))
+            if self.contains(x, y):
+                return x, y
+        return None, None
+
+
+class NFPCache:
+    """
+    A cache of no-fit polygons (NFPs) and inner-fit regions (IFPs) for translation-only placement.
+
+    The NFP of a fixed shape A and a moving shape B is the set of relative offsets at which B intersects A, which is the
+    Minkowski difference A - B. The IFP of a shape is the set of offsets at which it lies inside the container.
+    Since rotations are not allowed, both only depend on the geometries involved and are computed once.
+
+    The threads of the thread backend share the cache. Entries are computed outside the lock and published under it, so threads
+    computing different entries do not wait for each other, and every thread gets the same, complete entry.
+
+    Attributes:
+        Container_Context (ContainerContext): The cached geometry of the container the shapes are placed in.
+        Pieces (dict): Maps a geometry key to the convex decomposition of the geometry.
+        NFPs (dict): Maps a pair of geometry keys (fixed, moving) to their NFP, with both shapes at zero offsets.
+        Inner_Fit_Regions (dict): Maps a geometry key to the shape's InnerFitRegion.
+        Pockets (list[list[np.ndarray]]): The convex pieces of each region between the container and its bounding box.
+        Lock (threading.Lock): Guards the publication of new entries.
+    """
+
+    def __init__(self, context: ContainerContext):
+        """
+        Initializes an empty cache for a container.
+
+        Args:
+            context (ContainerContext): The cached geometry of the container the shapes are placed in.
+        """
+        self.Container_Context = context
+        self.Pieces = {}
+        self.NFPs = {}
+        self.Inner_Fit_Regions = {}
+        self.Pockets = None
+        self.Lock = threading.Lock()
+
+    def publish(self, cache: dict, key, value):
+        """
+        Stores a newly computed entry in one of the caches, unless another thread stored one first.
+
+        Args:
+            cache (dict): The cache to store the entry in.
+            key: The key of the entry.
+            value: The computed entry.
+
+        Returns:
+            The entry in the cache, which all threads use.
+        """
+        with self.Lock:
+            return cache.setdefault(key, value)
+
+    def get_convex_pieces(self, shape: Shape) -> list[np.ndarray]:
+        """
+        Returns the cached convex decomposition of a shape's geometry.
+
+        Args:
+            shape (Shape): The shape to decompose.
+
+        Returns:
+            list[np.ndarray]: The vertices of each convex piece, without offsets.
+        """
+        key = shape.get_geometry_key()
+        pieces = self.Pieces.get(key)
+        if pieces is None:
+            pieces = self.publish(self.Pieces, key, convex_decomposition(shape.X_cor, shape.Y_cor))
+        return pieces
+
+    def get_nfp(self, fixed: Shape, moving: Shape):
+        """
+        Returns the cached NFP of two shapes, with both shapes at zero offsets.
+
+        Args:
+            fixed (Shape): The shape that stays in place.
+            moving (Shape): The shape being placed.
+
+        Returns:
+            Geometry: The offsets of the moving shape, relative to the fixed shape's offsets, at which the two shapes intersect.
+        """
+        key = (fixed.get_geometry_key(), moving.get_geometry_key())
+        nfp = self.NFPs.get(key)
+        if nfp is None:
+            nfp = self.publish(self.NFPs, key, minkowski_difference(self.get_convex_pieces(fixed), self.get_convex_pieces(moving)))
+        return nfp
+
+    def get_pockets(self) -> list[list[np.ndarray]]:
+        """
+        Returns the convex pieces of the regions between the container and its bounding box.
+
+        A pocket that encloses part of the container is replaced by its exterior, which can only make the inner-fit regions smaller.
+
+        Returns:
+            list[list[np.ndarray]]: The convex pieces of each pocket.
+        """
+        if self.Pockets is None:
+            container_polygon = self.Container_Context.Polygon
+            pockets = []
+            for pocket in shapely.get_parts(box(*container_polygon.bounds).difference(container_polygon)):
+                if isinstance(pocket, Polygon) and pocket.area > 0:
+                    x_cor, y_cor = pocket.exterior.xy
+                    pockets.append(convex_decomposition(list(x_cor)[:-1], list(y_cor)[:-1]))
+            # Only the complete list is published, so a concurrent caller never sees part of it
+            with self.Lock:
+                if self.Pockets is None:
+                    self.Pockets = pockets
+        return self.Pockets
+
+    def get_inner_fit_region(self, shape: Shape) -> InnerFitRegion:
+        """
+        Returns the cached inner-fit region of a shape.
+
+        The region is the rectangle of offsets keeping the shape inside the container's bounding box, minus the NFPs of the
+        pockets between the container and its bounding box.
+
+        Args:
+            shape (Shape): The shape to be placed.
+
+        Returns:
+            InnerFitRegion: The offsets at which the shape lies inside the container.
+        """
+        key = shape.get_geometry_key()
+        inner_fit_region = self.Inner_Fit_Regions.get(key)
+        if inner_fit_region is None:
+            shape_min_x, shape_min_y, shape_max_x, shape_max_y = shape.Prototype.Bounds
+            container_min_x, container_min_y, container_max_x, container_max_y = self.Container_Context.Bounds
+            min_x = container_min_x - shape_min_x
+            max_x = container_max_x - shape_max_x
+            min_y = container_min_y - shape_min_y
+            max_y = container_max_y - shape_max_y
+            if min_x > max_x or min_y > max_y:
+                region = Polygon()
+            else:
+                if min_x == max_x and min_y == max_y:
+                    region = Point(min_x, min_y)
+                elif min_x == max_x or min_y == max_y:
+                    region = LineString([(min_x, min_y), (max_x, max_y)])
+                else:
+                    region = box(min_x, min_y, max_x, max_y)
+                pieces = self.get_convex_pieces(shape)
+                pocket_nfps = [minkowski_difference(pocket, pieces) for pocket in self.get_pockets()]
+                if pocket_nfps:
+                    region = region.difference(union_all(pocket_nfps))
+            inner_fit_region = self.publish(self.Inner_Fit_Regions, key, InnerFitRegion(region))
+        return inner_fit_region
+
+    def get_forbidden_region(self, shape: Shape, solution: Solution):
+        """
+        Calculates the offsets at which a shape intersects one of the shapes already placed in a solution.
+
+        Only the placed shapes whose NFPs can reach the shape's inner-fit region are united: a placed shape's NFP holds the offsets
+        at which the moving shape's bounding box meets the placed shape's. The region of a shape that is not placed is cached in
+        the solution per geometry and extended with the NFPs of the shapes added since, so each NFP is united once per layout
+        instead of at every search. The region of a placed shape, which must leave its own NFP out, is computed from the shapes
+        found by querying the placement index.
+
+        Args:
+            shape (Shape): The shape being placed.
+            solution (Solution): The solution holding the placed shapes.
+
+        Returns:
+            Geometry: The union of the placed shapes' NFPs, translated to their offsets.
+        """
+        inner_fit_region = self.get_inner_fit_region(shape)
+        if inner_fit_region.Region.is_empty:
+            return shapely.union_all([])
+        # The bounding box swept by the shape over its inner-fit region
+        min_x, min_y, max_x, max_y = inner_fit_region.Region.bounds
+        shape_min_x, shape_min_y, shape_max_x, shape_max_y = shape.Prototype.Bounds
+        reach = (min_x + shape_min_x, min_y + shape_min_y, max_x + shape_max_x, max_y + shape_max_y)
+        if shape in solution:
+            neighbours = solution.Placement_Index.query(reach)
+            neighbours.discard(shape.Index)
+            placed = [located_shape for located_shape in solution.Shapes if located_shape.Index in neighbours]
+            return self.unite_nfps(shape, placed)
+        count, region = solution.get_cached_forbidden_region(shape.get_geometry_key())
+        if region is None or count < len(solution):
+            placed = [located_shape for located_shape in solution.get_shapes(count) if self.bounds_intersect(located_shape.get_bounds(), reach)]
+            added = self.unite_nfps(shape, placed)
+            region = added if region is None else union_all([region, added])
+            solution.cache_forbidden_region(shape.get_geometry_key(), len(solution), region)
+        return region
+
+    @staticmethod
+    def bounds_intersect(bounds_a: tuple, bounds_b: tuple) -> bool:
+        """
+        Checks whether two bounding boxes (minx, miny, maxx, maxy) intersect.
+        """
+        return bounds_a[0] <= bounds_b[2] and bounds_b[0] <= bounds_a[2] and bounds_a[1] <= bounds_b[3] and bounds_b[1] <= bounds_a[3]
+
+    def unite_nfps(self, shape: Shape, placed: list[Shape]):
+        """
+        Unites the NFPs of a moving shape with placed shapes, translated to the placed shapes' offsets.
+
+        Args:
+            shape (Shape): The shape being placed.
+            placed (list[Shape]): The placed shapes.
+
+        Returns:
+            Geometry: The union of the NFPs, empty if there are no placed shapes.
+        """
+        if not placed:
+            return shapely.union_all([])
+        nfps = np.array([self.get_nfp(located_shape, shape) for located_shape in placed], dtype=object)
+        offsets = np.array([(located_shape.X_offset, located_shape.Y_offset) for located_shape in placed], dtype=float)
+        # Translate every NFP in one call by repeating each shape's offsets over its NFP's coordinates
+        repeated_offsets = np.repeat(offsets, shapely.get_num_coordinates(nfps), axis=0)
+        return union_all(shapely.transform(nfps, lambda coords: coords + repeated_offsets))
+
+    def find_feasible_positions(self, shape: Shape, solution: Solution, direction: tuple[int, int], seeds: list[tuple[int, int]] = ()) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the integer offsets at the vertices of the region where a shape can be placed inside the container without
+        intersecting the placed shapes.
+
+        Every vertex of the feasible region is rounded to the integer grid towards the inside of the region, given by direction,
+        and the rounded offsets that still fall inside the region are kept. All candidates are generated and filtered in one
+        vectorized pass; the caller checks the survivors exactly.
+
+        Args:
+            shape (Shape): The shape being placed.
+            solution (Solution): The solution holding the placed shapes.
+            direction (tuple[int, int]): The signs of the x and y steps pointing away from the preferred corner, e.g. (1, 1) for bottom-left.
+            seeds (list[tuple[int, int]]): Additional integer offsets to consider.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The x and y offsets of the candidates, unordered and without duplicates.
+        """
+        no_candidates = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        inner_fit_region = self.get_inner_fit_region(shape)
+        if inner_fit_region.Region.is_empty:
+            return no_candidates
+        forbidden = self.get_forbidden_region(shape, solution)
+        region = inner_fit_region.Region.difference(forbidden)
+        if region.is_empty:
+            return no_candidates
+
+        vertices = np.concatenate([shapely.get_coordinates(region), shapely.get_coordinates(shapely.point_on_surface(shapely.get_parts(region)))])
+        step = np.array(direction)
+        base = np.where(step > 0, np.ceil(vertices), np.floor(vertices)).astype(np.int64)
+        steps = np.array([[0, 0], [1, 0], [0, 1], [1, 1]]) * step
+        candidates = (base[:, None, :] + steps[None, :, :]).reshape(-1, 2)
+        if len(seeds):
+            candidates = np.concatenate([candidates, np.array(seeds, dtype=np.int64).reshape(-1, 2)])
+        candidates = np.unique(candidates, axis=0)
+
+        xs, ys = candidates[:, 0], candidates[:, 1]
+        feasible = inner_fit_region.contains(xs, ys)
+        if not forbidden.is_empty:
+            # The region may be cached in the solution and shared by its clones, so a copy of it is prepared rather than the region
+            feasible &= ~shapely.intersects_xy(PreparedGeometry(forbidden).get(), xs, ys)
+        return xs[feasible], ys[feasible]
@@ -0,0 +1,160 @@
+import math
+import numpy as np
+import shapely
+from .ContainerContext import ContainerContext
+from .ShapePrototype import ShapePrototype
+
+# Number of grid cells along the longer side of the container's bounding box
+OCCUPANCY_GRID_RESOLUTION = 128
+# Most mask cells looked up per candidate. Any subset of a conservative mask is conservative too.
+MAX_QUERY_CELLS = 64
+
+
+class OccupancyGrid:
+    """
+    A coarse raster of the container that counts, for each cell, the placed shapes covering the whole cell.
+
+    Every item type has a conservative raster mask: the cells its polygon is sure to cover wherever it is translated to. A
+    candidate whose mask hits an occupied cell overlaps a placed shape, since both cover that cell, so it can be rejected with
+    a few array lookups before any exact geometry runs. A candidate that is not rejected may still overlap and has to be
+    checked exactly.
+
+    A mask is computed on the grid's cell size from blocks of 2x2 cells: a block inside the polygon covers at least one whole
+    cell for any translation, the cell at the block's position plus the translation rounded up to whole cells.
+
+    Attributes:
+        Cell_Size (int): The side length of a cell.
+        Origin (tuple[int, int]): The lower-left corner of the grid, the corner of the container's bounding box.
+        Cells (np.ndarray): The number of placed shapes covering each cell, indexed by row (y) and column (x).
+        Masks (dict[int, tuple]): The mask of each item type by prototype id, shared with the grids of the other solutions of
+            the container: the block columns and rows, and the subset of them looked up for candidates.
+    """
+
+    def __init__(self, context: ContainerContext):
+        """
+        Initializes an empty grid over a container.
+
+        Args:
+            context (ContainerContext): The container's cached geometry. Its Raster_Masks cache holds the masks.
+        """
+        min_x, min_y, max_x, max_y = context.Bounds
+        self.Cell_Size = max(1, math.ceil(max(max_x - min_x, max_y - min_y, 1) / OCCUPANCY_GRID_RESOLUTION))
+        self.Origin = (min_x, min_y)
+        self.Cells = np.zeros((math.ceil((max_y - min_y) / self.Cell_Size) + 1, math.ceil((max_x - min_x) / self.Cell_Size) + 1),
+                              dtype=np.int16)
+        self.Masks = context.Raster_Masks
+
+    def copy(self) -> "OccupancyGrid":
+        """
+        Creates an independent copy of the grid. The masks are shared.
+
+        Returns:
+            OccupancyGrid: The copy of the grid.
+        """
+        grid_copy = OccupancyGrid.__new__(OccupancyGrid)
+        grid_copy.__dict__.update(self.__dict__)
+        grid_copy.Cells = self.Cells.copy()
+        return grid_copy
+
+    def get_mask(self, prototype: ShapePrototype) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the conservative raster mask of an item type, computing it on first use.
+
+        Args:
+            prototype (ShapePrototype): The item type.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The columns and rows of the 2x2 blocks inside the item's
+            polygon, without offsets, and at most MAX_QUERY_CELLS of them, spread evenly, for candidate lookups.
+        """
+        mask = self.Masks.get(prototype.Id)
+        if mask is None:
+            size = self.Cell_Size
+            min_x, min_y, max_x, max_y = prototype.Bounds
+            columns = np.arange(-(-min_x // size), max_x // size - 1)
+            rows = np.arange(-(-min_y // size), max_y // size - 1)
+            columns, rows = (grid.ravel() for grid in np.meshgrid(columns, rows))
+            if len(columns):
+                blocks = shapely.box(columns * size, rows * size, (columns + 2) * size, (rows + 2) * size)
+                inside = shapely.contains(prototype.Base_Polygon, blocks)
+                columns, rows = columns[inside], rows[inside]
+            sample = np.linspace(0, len(columns) - 1, min(len(columns), MAX_QUERY_CELLS)).astype(np.int64)
+            mask = (columns, rows, columns[sample], rows[sample])
+            self.Masks[prototype.Id] = mask
+        return mask
+
+    def get_shifts(self, x_offsets, y_offsets) -> tuple:
+        """
+        Converts offsets to the whole-cell shifts of the masks: the offsets relative to the origin, rounded up to whole cells.
+
+        Args:
+            x_offsets: The x offsets, as an int or an integer array.
+            y_offsets: The y offsets, as an int or an integer array.
+
+        Returns:
+            tuple: The column and row shifts.
+        """
+        return -((self.Origin[0] - x_offsets) // self.Cell_Size), -((self.Origin[1] - y_offsets) // self.Cell_Size)
+
+    def get_covered_cells(self, prototype: ShapePrototype, x_offset: int, y_offset: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the cells of the grid an item placed at the given offsets is sure to cover.
+
+        Args:
+            prototype (ShapePrototype): The item type.
+            x_offset (int): The x offset of the item.
+            y_offset (int): The y offset of the item.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The rows and columns of the covered cells that lie on the grid.
+        """
+        columns, rows, _, _ = self.get_mask(prototype)
+        column_shift, row_shift = self.get_shifts(x_offset, y_offset)
+        columns, rows = columns + column_shift, rows + row_shift
+        on_grid = (columns >= 0) & (columns < self.Cells.shape[1]) & (rows >= 0) & (rows < self.Cells.shape[0])
+        return rows[on_grid], columns[on_grid]
+
+    def insert(self, prototype: ShapePrototype, x_offset: int, y_offset: int) -> None:
+        """
+        Marks the cells covered by a newly placed item.
+
+        Args:
+            prototype (ShapePrototype): The item type.
+            x_offset (int): The x offset of the item.
+            y_offset (int): The y offset of the item.
+        """
+        # A mask covers each cell at most once, so there are no repeated indices
+        self.Cells[self.get_covered_cells(prototype, x_offset, y_offset)] += 1
+
+    def remove(self, prototype: ShapePrototype, x_offset: int, y_offset: int) -> None:
+        """
+        Unmarks the cells covered by an item that is removed from its offsets.
+
+        Args:
+            prototype (ShapePrototype): The item type.
+            x_offset (int): The x offset of the item.
+            y_offset (int): The y offset of the item.
+        """
+        self.Cells[self.get_covered_cells(prototype, x_offset, y_offset)] -= 1
+
+    def get_blocked(self, prototype: ShapePrototype, x_offsets: np.ndarray, y_offsets: np.ndarray) -> np.ndarray:
+        """
+        Checks, for a batch of candidate offsets, whether the item placed there would cover an occupied cell.
+
+        Args:
+            prototype (ShapePrototype): The item type.
+            x_offsets (np.ndarray): The candidate x offsets.
+            y_offsets (np.ndarray): The candidate y offsets.
+
+        Returns:
+            np.ndarray: A boolean array, True where the candidate surely overlaps a placed item.
+        """
+        _, _, columns, rows = self.get_mask(prototype)
+        if not len(columns):
+            return np.zeros(len(x_offsets), dtype=bool)
+        column_shifts, row_shifts = self.get_shifts(np.asarray(x_offsets, dtype=np.int64), np.asarray(y_offsets, dtype=np.int64))
+        columns = columns[None, :] + column_shifts[:, None]
+        rows = rows[None, :] + row_shifts[:, None]
+        on_grid = (columns >= 0) & (columns < self.Cells.shape[1]) & (rows >= 0) & (rows < self.Cells.shape[0])
+        occupied = self.Cells[np.where(on_grid, rows, 0), np.where(on_grid, columns, 0)] > 0
+        return (occupied & on_grid).any(axis=1)
@@ -0,0 +1,47 @@
+import threading
+import shapely
+
+
+class PreparedGeometry:
+    """
+    A geometry prepared for fast predicates, with a prepared copy per thread.
+
+    The index GEOS builds when a geometry is prepared is not thread-safe, and predicates run on one prepared geometry from
+    several threads at once crash the interpreter. Each thread therefore prepares its own copy on first use, while the
+    unprepared geometry is shared.
+
+    Attributes:
+        Geometry (Geometry): The unprepared geometry, safe to use from any thread.
+        Local (threading.local): Holds the prepared copy of each thread.
+    """
+
+    def __init__(self, geometry):
+        """
+        Initializes the wrapper. Nothing is prepared until a thread first asks for it.
+
+        Args:
+            geometry (Geometry): The geometry to prepare.
+        """
+        self.Geometry = geometry
+        self.Local = threading.local()
+
+    def __getstate__(self):
+        return {"Geometry": self.Geometry}
+
+    def __setstate__(self, state):
+        # Thread-local storage is not pickled, so the copies of other processes prepare theirs again
+        self.__init__(state["Geometry"])
+
+    def get(self):
+        """
+        Returns the prepared copy of the geometry for the calling thread, preparing it on first use.
+
+        Returns:
+            Geometry: A prepared geometry equal to Geometry, used only by this thread.
+        """
+        prepared = getattr(self.Local, "Geometry", None)
+        if prepared is None:
+            prepared = shapely.from_wkb(shapely.to_wkb(self.Geometry))
+            shapely.prepare(prepared)
+            self.Local.Geometry = prepared
+        return prepared
@@ -1,54 +1,99 @@
 from shapely.geometry import Polygon
+from .ShapePrototype import ShapePrototype
 
 class Shape:
     """
-    A class representing a geometric shape, defined by a series of coordinates, quantity, value, and an index.
+    A class representing one copy of an item, placed at an offset. The geometry and value are shared with the other copies
+    through the item's prototype.
 
     Attributes:
-        X_cor (list[int]): List of x-coordinates defining the shape.
-        Y_cor (list[int]): List of y-coordinates defining the shape.
-        Quantity (int): The quantity of this shape.
-        real_value (int): The real value of the shape.
+        Prototype (ShapePrototype): The item type of this copy.
+        Copy (int): The number of this copy among the copies of the item.
         X_offset (int): The x-offset applied to the shape.
         Y_offset (int): The y-offset applied to the shape.
-        Value (int): The calculated value of the shape, considering its area.
-        Index (int): The original index of the shape in the instance file.
+
+    The placed polygon is built by translating the prototype's polygon and is cached until the offsets change.
     """
 
-    def __init__(self, x_cor: list[int], y_cor: list[int], qnty: int, val: int, index: int):
+    __slots__ = ("Prototype", "Copy", "_x_offset", "_y_offset", "_polygon")
+
+    def __init__(self, prototype: ShapePrototype, copy_number: int = 0, x_offset: int = 0, y_offset: int = 0):
         """
-        Initializes the Shape class with x and y coordinates, quantity, value, and index.
+        Initializes the Shape class with its prototype, copy number and offsets.
 
         Args:
-            x_cor (list[int]): List of x-coordinates defining the shape.
-            y_cor (list[int]): List of y-coordinates defining the shape.
-            qnty (int): The quantity of this shape.
-            val (int): The real value of the shape.
-            index (int): The original index of the shape in the instance file.
-
-        Raises:
-            Exception: If the length of x_cor and y_cor do not match.
-        """
-        if len(x_cor) != len(y_cor):
-            raise Exception("Unmatched sizes!")
-        self.X_cor = x_cor
-        self.Y_cor = y_cor
-        self.Quantity = qnty
-        self.real_value = val
-        self.X_offset = 0
-        self.Y_offset = 0
-        self.Value = self.calculated_value()
-        self.Index = index
-
-    def calculated_value(self) -> int:
+            prototype (ShapePrototype): The item type of this copy.
+            copy_number (int): The number of this copy among the copies of the item.
+            x_offset (int): The x-offset applied to the shape.
+            y_offset (int): The y-offset applied to the shape.
+        """
+        self.Prototype = prototype
+        self.Copy = copy_number
+        self._x_offset = x_offset
+        self._y_offset = y_offset
+        self._polygon = None
+
+    def __reduce__(self):
+        return Shape, (self.Prototype, self.Copy, self.X_offset, self.Y_offset)
+
+    @property
+    def X_offset(self) -> int:  # noqa: N802
+        """The x-offset applied to the shape."""
+        return self._x_offset
+
+    @X_offset.setter
+    def X_offset(self, value: int):  # noqa: N802
+        self._x_offset = value
+        self._polygon = None
+
+    @property
+    def Y_offset(self) -> int:  # noqa: N802
+        """The y-offset applied to the shape."""
+        return self._y_offset
+
+    @Y_offset.setter
+    def Y_offset(self, value: int):  # noqa: N802
+        self._y_offset = value
+        self._polygon = None
+
+    @property
+    def X_cor(self):  # noqa: N802
+        """The x-coordinates defining the shape, without offsets."""
+        return self.Prototype.X_cor
+
+    @property
+    def Y_cor(self):  # noqa: N802
+        """The y-coordinates defining the shape, without offsets."""
+        return self.Prototype.Y_cor
+
+    @property
+    def Quantity(self) -> int:  # noqa: N802
+        """The quantity of this shape. Each Shape stands for a single copy."""
+        return 1
+
+    @property
+    def real_value(self) -> int:
+        """The real value of the shape."""
+        return self.Prototype.real_value
+
+    @property
+    def Value(self) -> float:  # noqa: N802
+        """The calculated value of the shape, considering its area."""
+        return self.Prototype.Value
+
+    @property
+    def Index(self) -> tuple[int, int]:  # noqa: N802
+        """The original index of the shape in the instance file and its copy number."""
+        return self.Prototype.Id, self.Copy
+
+    def calculated_value(self) -> float:
         """
         Calculates the value of the shape based on its real value and area.
 
         Returns:
-            int: The calculated value of the shape.
+            float: The calculated value of the shape.
         """
-        area = self.get_area()
-        return self.real_value / area
+        return self.Prototype.Value
 
     def __str__(self):
         """
@@ -58,48 +103,63 @@ class Shape:
             str: A string representing the shape's details.
         """
         str_representation = f"Value: {self.real_value} \n Quantity: {self.Quantity} \n"
-        for i in range(len(self.X_cor)):
-            str_representation += f"({self.X_cor[i] + self.X_offset} , {self.Y_cor[i] + self.Y_offset})\n"
-        str_representation += f"Original Index in instance file: {self.Index}"
+        for x, y in zip(self.X_cor, self.Y_cor):
+            str_representation += f"({x + self.X_offset} , {y + self.Y_offset})\n"
+        str_representation += f"Original Index in instance file: {self.Prototype.Id}"
         return str_representation
 
     def get_area(self) -> float:
         """
-        Calculates the area of the shape using its polygon representation.
+        Returns the area of the shape.
 
         Returns:
             float: The area of the shape.
         """
-        poly = self.create_polygon_object()
-        return poly.area
+        return self.Prototype.Area
 
     def get_perimeter(self) -> float:
         """
-        Calculates the perimeter of the shape using its polygon representation.
+        Returns the perimeter of the shape.
 
         Returns:
             float: The perimeter of the shape.
         """
-        poly = self.create_polygon_object()
-        return poly.length
+        return self.Prototype.Perimeter
+
+    def get_geometry_key(self) -> int:
+        """
+        Returns a hashable key identifying the shape's geometry, regardless of its offsets.
+
+        Returns:
+            int: The geometry key of the shape's prototype.
+        """
+        return self.Prototype.Geometry_Key
+
+    def get_bounds(self) -> tuple[int, int, int, int]:
+        """
+        Returns the bounding box of the shape, considering any applied offsets.
+
+        Returns:
+            tuple[int, int, int, int]: The bounding box (minx, miny, maxx, maxy).
+        """
+        return self.Prototype.get_bounds(self._x_offset, self._y_offset)
 
-    def get_real_coords(self) -> list[int]:
+    def get_real_coords(self) -> tuple:
         """
         Returns the real coordinates of the shape, considering any applied offsets.
 
         Returns:
-            list[int]: Two lists containing the real x and y coordinates of the shape.
+            tuple[np.ndarray, np.ndarray]: Two arrays containing the real x and y coordinates of the shape.
         """
-        real_x = [x + self.X_offset for x in self.X_cor]
-        real_y = [y + self.Y_offset for y in self.Y_cor]
-        return real_x, real_y
+        return self.X_cor + self.X_offset, self.Y_cor + self.Y_offset
 
     def create_polygon_object(self) -> Polygon:
         """
-        Creates a Shapely Polygon object representing the shape.
+        Returns a Shapely Polygon object representing the shape.
 
         Returns:
             Polygon: A Shapely Polygon object representing the shape based on its real coordinates.
         """
-        real_x, real_y = self.get_real_coords()
-        return Polygon(list(zip(real_x, real_y)))
+        if self._polygon is None:
+            self._polygon = self.Prototype.get_polygon(self._x_offset, self._y_offset)
+        return self._polygon
@@ -0,0 +1,134 @@
+import numpy as np
+import shapely
+from .Shape import Shape
+from .ShapePrototype import ShapePrototype
+
+# Sort criteria: the prototype attribute to sort by and whether to sort in descending order
+SORT_CRITERIA = {
+    "value": ("Value", True),
+    "real_value": ("real_value", True),
+    "area": ("Area", False),
+    "perimeter": ("Perimeter", False),
+}
+
+
+class ShapeCatalog:
+    """
+    The items of an instance: one shared prototype per item type and one lightweight Shape per copy.
+
+    The catalog behaves like a read-only list of the copies, so it can be used wherever a list of shapes is expected.
+
+    Attributes:
+        Prototypes (list[ShapePrototype]): The item types, in instance file order.
+        Items (list[Shape]): One unplaced Shape per copy of every item type.
+        First_Item (np.ndarray): The position in Items of the first copy of each item type.
+        Orders (dict[str, np.ndarray]): For each sort criterion, the positions in Items in sorted order.
+        Ranks (dict[str, np.ndarray]): For each sort criterion, the rank of each position in Items.
+    """
+
+    def __init__(self, prototypes: list[ShapePrototype]):
+        """
+        Initializes the ShapeCatalog class with the item types and creates a Shape for each copy.
+
+        Args:
+            prototypes (list[ShapePrototype]): The item types, in instance file order.
+        """
+        self.Prototypes = prototypes
+        self.Items = [Shape(prototype, copy_number) for prototype in prototypes for copy_number in range(prototype.Quantity)]
+        quantities = np.array([prototype.Quantity for prototype in prototypes], dtype=np.int64)
+        self.First_Item = np.concatenate(([0], np.cumsum(quantities)[:-1])) if len(prototypes) else np.zeros(0, dtype=np.int64)
+        self.Orders = {}
+        self.Ranks = {}
+        for criterion, (attribute, descending) in SORT_CRITERIA.items():
+            keys = np.repeat(np.array([getattr(prototype, attribute) for prototype in prototypes], dtype=float), quantities)
+            order = np.argsort(-keys if descending else keys, kind="stable")
+            ranks = np.empty_like(order)
+            ranks[order] = np.arange(len(order))
+            self.Orders[criterion] = order
+            self.Ranks[criterion] = ranks
+
+    @classmethod
+    def from_json(cls, items_data: list[dict]) -> "ShapeCatalog":
+        """
+        Creates a catalog from the items of an instance file. Items with identical coordinates share a geometry key.
+
+        Args:
+            items_data (list[dict]): The 'items' entry of an instance file.
+
+        Returns:
+            ShapeCatalog: The catalog of the instance's items.
+        """
+        geometry_keys = {}
+        prototypes = []
+        for index, item in enumerate(items_data):
+            geometry_key = geometry_keys.setdefault((tuple(item['x']), tuple(item['y'])), index)
+            prototypes.append(ShapePrototype(index, item['x'], item['y'], item['quantity'], item['value'], geometry_key))
+        return cls(prototypes)
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "ShapeCatalog":
+        """
+        Creates a catalog from flat int64 arrays, as laid out by SharedCoordinateStore. The prototypes' coordinates are views of
+        the arrays, so arrays in shared or memory-mapped storage are not copied, and their polygons, areas, perimeters and
+        bounds are computed for all items in a few vectorized calls.
+
+        Args:
+            arrays (dict[str, np.ndarray]): The item_x, item_y, item_starts, quantities, values and geometry_keys arrays.
+
+        Returns:
+            ShapeCatalog: The catalog of the instance's items.
+        """
+        item_x, item_y, item_starts = arrays["item_x"], arrays["item_y"], arrays["item_starts"]
+        quantities = arrays["quantities"].tolist()
+        values = arrays["values"].tolist()
+        geometry_keys = arrays["geometry_keys"].tolist()
+        starts, ends = item_starts[:-1].tolist(), item_starts[1:].tolist()
+        if not starts:
+            return cls([])
+        ring_ids = np.repeat(np.arange(len(starts)), np.diff(item_starts))
+        polygons = shapely.polygons(shapely.linearrings(np.column_stack((item_x, item_y)), indices=ring_ids))
+        areas, perimeters = shapely.area(polygons).tolist(), shapely.length(polygons).tolist()
+        bounds = np.column_stack([np.minimum.reduceat(item_x, item_starts[:-1]), np.minimum.reduceat(item_y, item_starts[:-1]),
+                                  np.maximum.reduceat(item_x, item_starts[:-1]), np.maximum.reduceat(item_y, item_starts[:-1])]).tolist()
+        prototypes = [ShapePrototype(index, item_x[start:end], item_y[start:end], quantities[index], values[index], geometry_keys[index],
+                                     (polygons[index], areas[index], perimeters[index], tuple(bounds[index])))
+                      for index, (start, end) in enumerate(zip(starts, ends))]
+        return cls(prototypes)
+
+    def get_item_position(self, shape: Shape) -> int:
+        """
+        Returns the position in Items of the copy a shape stands for.
+
+        Args:
+            shape (Shape): A copy of one of the catalog's items.
+
+        Returns:
+            int: The position of the copy in Items.
+        """
+        return int(self.First_Item[shape.Prototype.Id]) + shape.Copy
+
+    def sort_shapes(self, shapes_list: list[Shape], criterion: str) -> list[Shape]:
+        """
+        Sorts shapes using the precomputed order of a sort criterion. Shapes with equal keys keep their catalog order.
+
+        Args:
+            shapes_list (list[Shape]): Copies of the catalog's items, or the catalog itself.
+            criterion (str): One of the keys of SORT_CRITERIA.
+
+        Returns:
+            list[Shape]: A new list of the shapes, sorted.
+        """
+        if shapes_list is self:
+            return [self.Items[position] for position in self.Orders[criterion].tolist()]
+        positions = np.array([self.get_item_position(shape) for shape in shapes_list], dtype=np.int64)
+        order = np.argsort(self.Ranks[criterion][positions])
+        return [shapes_list[i] for i in order.tolist()]
+
+    def __len__(self):
+        return len(self.Items)
+
+    def __iter__(self):
+        return iter(self.Items)
+
+    def __getitem__(self, index):
+        return self.Items[index]
@@ -0,0 +1,135 @@
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from .Instrumentation import INSTRUMENTATION
+
+
+class ShapePrototype:
+    """
+    An immutable item type of an instance, shared by all the copies of the item.
+
+    Attributes:
+        Id (int): The index of the item in the instance file.
+        X_cor (np.ndarray): Read-only array of x-coordinates defining the item.
+        Y_cor (np.ndarray): Read-only array of y-coordinates defining the item.
+        Quantity (int): The number of copies of the item.
+        real_value (int): The real value of a copy of the item.
+        Value (float): The real value of the item divided by its area.
+        Area (float): The area of the item.
+        Perimeter (float): The perimeter of the item.
+        Bounds (tuple[int, int, int, int]): The bounding box (minx, miny, maxx, maxy) of the item, without offsets.
+        Base_Polygon (Polygon): The Shapely polygon of the item, without offsets.
+        Geometry_Key (int): Identifies the item's geometry. Items with identical coordinates share the same key.
+    """
+
+    __slots__ = ("Id", "X_cor", "Y_cor", "Quantity", "real_value", "Value", "Area", "Perimeter", "Bounds", "Base_Polygon", "Geometry_Key")
+
+    def __init__(self, prototype_id: int, x_cor, y_cor, qnty: int, val: int, geometry_key: int = None, geometry: tuple = None):
+        """
+        Initializes the ShapePrototype class with the item's index, coordinates, quantity and value.
+
+        Args:
+            prototype_id (int): The index of the item in the instance file.
+            x_cor (list[int]): List of x-coordinates defining the item.
+            y_cor (list[int]): List of y-coordinates defining the item.
+            qnty (int): The number of copies of the item.
+            val (int): The real value of a copy of the item.
+            geometry_key (int): Identifies the item's geometry. Defaults to the item's index.
+            geometry (tuple): The item's polygon, area, perimeter and bounds, if they were computed for many items at once.
+                Defaults to computing them from the coordinates.
+
+        Raises:
+            Exception: If the length of x_cor and y_cor do not match.
+        """
+        if len(x_cor) != len(y_cor):
+            raise Exception("Unmatched sizes!")
+        # Arrays that are already int64, such as views of a shared coordinate store, are used without copying
+        x_array = np.asarray(x_cor, dtype=np.int64)
+        y_array = np.asarray(y_cor, dtype=np.int64)
+        x_array.flags.writeable = False
+        y_array.flags.writeable = False
+        if geometry is None:
+            polygon = Polygon(np.column_stack((x_array, y_array)))
+            geometry = (polygon, polygon.area, polygon.length, (int(x_array.min()), int(y_array.min()), int(x_array.max()), int(y_array.max())))
+        polygon, area, perimeter, bounds = geometry
+        object.__setattr__(self, "Id", prototype_id)
+        object.__setattr__(self, "X_cor", x_array)
+        object.__setattr__(self, "Y_cor", y_array)
+        object.__setattr__(self, "Quantity", qnty)
+        object.__setattr__(self, "real_value", val)
+        object.__setattr__(self, "Area", area)
+        object.__setattr__(self, "Perimeter", perimeter)
+        object.__setattr__(self, "Bounds", bounds)
+        object.__setattr__(self, "Base_Polygon", polygon)
+        object.__setattr__(self, "Value", val / area)
+        object.__setattr__(self, "Geometry_Key", prototype_id if geometry_key is None else geometry_key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ShapePrototype is immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return ShapePrototype, (self.Id, self.X_cor, self.Y_cor, self.Quantity, self.real_value, self.Geometry_Key)
+
+    def get_polygon(self, x_offset: int = 0, y_offset: int = 0) -> Polygon:
+        """
+        Returns the polygon of the item translated by the given offsets, without rebuilding it from the coordinates.
+
+        Args:
+            x_offset (int): The x offset to translate by.
+            y_offset (int): The y offset to translate by.
+
+        Returns:
+            Polygon: A Shapely Polygon object of the translated item.
+        """
+        if x_offset == 0 and y_offset == 0:
+            return self.Base_Polygon
+        INSTRUMENTATION.count("polygons_built")
+        return shapely.transform(self.Base_Polygon, lambda coords: coords + (x_offset, y_offset))
+
+    def get_polygons(self, x_offsets: np.ndarray, y_offsets: np.ndarray) -> np.ndarray:
+        """
+        Creates the polygons of the item translated by each pair of offsets, in one vectorized call.
+
+        Args:
+            x_offsets (np.ndarray): The x offsets to translate by.
+            y_offsets (np.ndarray): The y offsets to translate by.
+
+        Returns:
+            np.ndarray: An array of Shapely Polygon objects, one per pair of offsets.
+        """
+        coords = np.column_stack((self.X_cor, self.Y_cor))
+        offsets = np.column_stack((x_offsets, y_offsets))
+        INSTRUMENTATION.count("polygons_built", len(offsets))
+        return shapely.polygons(coords[None, :, :] + offsets[:, None, :])
+
+    def get_bounds(self, x_offset: int = 0, y_offset: int = 0) -> tuple[int, int, int, int]:
+        """
+        Returns the bounding box of the item translated by the given offsets.
+
+        Args:
+            x_offset (int): The x offset to translate by.
+            y_offset (int): The y offset to translate by.
+
+        Returns:
+            tuple[int, int, int, int]: The bounding box (minx, miny, maxx, maxy).
+        """
+        min_x, min_y, max_x, max_y = self.Bounds
+        return min_x + x_offset, min_y + y_offset, max_x + x_offset, max_y + y_offset
+
+    def __str__(self):
+        """
+        Returns a string representation of the item, including its index, value, quantity and coordinates.
+
+        Returns:
+            str: A string representing the item's details.
+        """
+        str_representation = f"Item {self.Id} \n Value: {self.real_value} \n Quantity: {self.Quantity} \n"
+        for x, y in zip(self.X_cor, self.Y_cor):
+            str_representation += f"({x} , {y})\n"
+        return str_representation
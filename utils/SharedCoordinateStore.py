@@ -0,0 +1,162 @@
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+from .Container import Container
+from .ShapeCatalog import ShapeCatalog
+
+# Every array of the store is int64, so each one starts on an 8-byte boundary
+ITEM_SIZE = np.dtype(np.int64).itemsize
+
+
+class SharedCoordinateStore:
+    """
+    The geometry of an instance, stored once in shared memory as flat NumPy arrays that worker processes attach to without copying.
+
+    The store holds the following arrays:
+        item_x, item_y: The vertices of all items, one item after the other.
+        item_starts: The position of each item's first vertex in item_x and item_y, followed by the total number of vertices.
+        quantities, values, geometry_keys: The quantity, value and geometry key of each item.
+        container_x, container_y: The vertices of the container.
+
+    Attributes:
+        Shared_Memory (SharedMemory): The shared memory block holding the arrays.
+        Layout (dict[str, tuple[int, int]]): Maps an array name to its start and length, in int64 elements, in the block.
+        Arrays (dict[str, np.ndarray]): Maps an array name to its view of the block.
+        Instance_Name (str): The name of the instance.
+        Owner (bool): Whether this store created the block, and has to release it.
+    """
+
+    def __init__(self, shared_memory: SharedMemory, layout: dict[str, tuple[int, int]], instance_name: str, owner: bool):
+        """
+        Initializes the store over an existing shared memory block. Use create or attach instead.
+
+        Args:
+            shared_memory (SharedMemory): The shared memory block holding the arrays.
+            layout (dict[str, tuple[int, int]]): Maps an array name to its start and length in the block.
+            instance_name (str): The name of the instance.
+            owner (bool): Whether this store created the block.
+        """
+        self.Shared_Memory = shared_memory
+        self.Layout = layout
+        self.Instance_Name = instance_name
+        self.Owner = owner
+        self.Arrays = {}
+        for name, (start, length) in layout.items():
+            array = np.ndarray((length,), dtype=np.int64, buffer=shared_memory.buf, offset=start * ITEM_SIZE)
+            if not owner:
+                array.flags.writeable = False
+            self.Arrays[name] = array
+
+    @classmethod
+    def create(cls, shapes: ShapeCatalog, cont: Container) -> "SharedCoordinateStore":
+        """
+        Copies the geometry of an instance into a new shared memory block.
+
+        Args:
+            shapes (ShapeCatalog): The catalog of the instance's items.
+            cont (Container): The instance's container.
+
+        Returns:
+            SharedCoordinateStore: The store owning the new block.
+        """
+        arrays = cls.get_arrays(shapes, cont)
+        layout = cls.get_layout(arrays)
+        shared_memory = SharedMemory(create=True, size=max(sum(length for _, length in layout.values()), 1) * ITEM_SIZE)
+        store = cls(shared_memory, layout, cont.Instance_Name, True)
+        for name, values in arrays.items():
+            store.Arrays[name][:] = values
+        return store
+
+    @staticmethod
+    def get_arrays(shapes: ShapeCatalog, cont: Container) -> dict[str, np.ndarray]:
+        """
+        Flattens the geometry of an instance into the int64 arrays of the store.
+
+        Args:
+            shapes (ShapeCatalog): The catalog of the instance's items.
+            cont (Container): The instance's container.
+
+        Returns:
+            dict[str, np.ndarray]: The arrays, by name, in layout order.
+        """
+        prototypes = shapes.Prototypes
+        vertex_counts = [len(prototype.X_cor) for prototype in prototypes]
+        arrays = {
+            "item_x": np.concatenate([prototype.X_cor for prototype in prototypes]) if prototypes else np.zeros(0),
+            "item_y": np.concatenate([prototype.Y_cor for prototype in prototypes]) if prototypes else np.zeros(0),
+            "item_starts": np.concatenate(([0], np.cumsum(vertex_counts))),
+            "quantities": [prototype.Quantity for prototype in prototypes],
+            "values": [prototype.real_value for prototype in prototypes],
+            "geometry_keys": [prototype.Geometry_Key for prototype in prototypes],
+            "container_x": cont.X_cor,
+            "container_y": cont.Y_cor,
+        }
+        return {name: np.asarray(values, dtype=np.int64) for name, values in arrays.items()}
+
+    @staticmethod
+    def get_layout(arrays: dict[str, np.ndarray]) -> dict[str, tuple[int, int]]:
+        """
+        Places arrays one after the other in a flat int64 buffer.
+
+        Args:
+            arrays (dict[str, np.ndarray]): The arrays, by name.
+
+        Returns:
+            dict[str, tuple[int, int]]: Maps an array name to its start and length, in int64 elements, in the buffer.
+        """
+        layout = {}
+        start = 0
+        for name, values in arrays.items():
+            layout[name] = (start, len(values))
+            start += len(values)
+        return layout
+
+    @classmethod
+    def attach(cls, descriptor: tuple[str, dict[str, tuple[int, int]], str]) -> "SharedCoordinateStore":
+        """
+        Attaches to a block created by another process, without copying it.
+
+        Args:
+            descriptor (tuple[str, dict[str, tuple[int, int]], str]): The descriptor returned by the creator's get_descriptor.
+
+        Returns:
+            SharedCoordinateStore: A read-only store over the block.
+        """
+        name, layout, instance_name = descriptor
+        shared_memory = SharedMemory(name=name)
+        return cls(shared_memory, layout, instance_name, False)
+
+    def get_descriptor(self) -> tuple[str, dict[str, tuple[int, int]], str]:
+        """
+        Returns what another process needs to attach to the store. It is small and cheap to pickle.
+
+        Returns:
+            tuple[str, dict[str, tuple[int, int]], str]: The name of the block, its layout and the name of the instance.
+        """
+        return self.Shared_Memory.name, self.Layout, self.Instance_Name
+
+    def build_catalog(self) -> ShapeCatalog:
+        """
+        Creates a shape catalog whose prototypes' coordinates are views of the shared arrays.
+
+        Returns:
+            ShapeCatalog: The catalog of the instance's items.
+        """
+        return ShapeCatalog.from_arrays(self.Arrays)
+
+    def build_container(self) -> Container:
+        """
+        Creates the instance's container.
+
+        Returns:
+            Container: The container.
+        """
+        return Container(self.Arrays["container_x"].tolist(), self.Arrays["container_y"].tolist(), self.Instance_Name)
+
+    def close(self) -> None:
+        """
+        Detaches from the block, and releases it if this store created it.
+        """
+        self.Arrays = {}
+        self.Shared_Memory.close()
+        if self.Owner:
+            self.Shared_Memory.unlink()
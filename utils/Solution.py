@@ -1,24 +1,109 @@
 import json
+import math
+import numpy as np
+import shapely
 from matplotlib import pyplot as plt, patches
 from shapely.geometry import Polygon
 from .Container import Container
+from .FreeSpace import FreeSpace
+from .ContainerContext import ContainerContext
+from .Instrumentation import INSTRUMENTATION
+from .OccupancyGrid import OccupancyGrid
 from .Shape import Shape
+from .SpatialIndex import SpatialIndex
 
 PLOT_OFFSET = 300
+INDEX_GRID_RESOLUTION = 64
+INITIAL_CAPACITY = 16
+# Tolerance for rounding slide distances that are integral up to floating point error
+SLIDE_TOLERANCE = 1e-9
+
+
+def _to_motion_frame(coords: np.ndarray, direction: tuple[int, int]) -> np.ndarray:
+    """
+    Maps coordinates to a frame in which moving in the given axis direction is moving towards positive x.
+
+    Args:
+        coords (np.ndarray): An (n, 2) array of coordinates.
+        direction (tuple[int, int]): The direction of motion, one of (1, 0), (-1, 0), (0, 1) and (0, -1).
+
+    Returns:
+        np.ndarray: The mapped (n, 2) array of coordinates.
+    """
+    x_sign, y_sign = direction
+    if x_sign:
+        return np.column_stack((x_sign * coords[:, 0], coords[:, 1]))
+    return np.column_stack((y_sign * coords[:, 1], coords[:, 0]))
+
+
+def _ring_edges(polygons) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collects the vertices and the edges of the exterior rings of one or more polygons.
+
+    Args:
+        polygons: A Shapely polygon or an array of them.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: The vertices, and the start and end points of the edges, as (n, 2) arrays.
+    """
+    coords, ring_ids = shapely.get_coordinates(shapely.get_exterior_ring(polygons), return_index=True)
+    same_ring = ring_ids[:-1] == ring_ids[1:]
+    return coords, coords[:-1][same_ring], coords[1:][same_ring]
+
+
+def _first_hit(points: np.ndarray, starts: np.ndarray, ends: np.ndarray, strict: bool) -> float:
+    """
+    Casts a ray towards positive x from every point and finds the shortest distance at which one of them meets an edge.
+
+    Edges parallel to the rays are skipped: a point can only meet them at an endpoint, which is shared with a non-parallel edge.
+
+    Args:
+        points (np.ndarray): The (n, 2) ray origins.
+        starts (np.ndarray): The (m, 2) start points of the edges.
+        ends (np.ndarray): The (m, 2) end points of the edges.
+        strict (bool): Whether to ignore edges met at distance zero.
+
+    Returns:
+        float: The shortest distance, or infinity if no ray meets an edge.
+    """
+    if len(points) == 0 or len(starts) == 0:
+        return np.inf
+    point_x, point_y = points[:, 0, None], points[:, 1, None]
+    start_x, start_y, end_x, end_y = starts[None, :, 0], starts[None, :, 1], ends[None, :, 0], ends[None, :, 1]
+    height = end_y - start_y
+    spans = (height != 0) & (np.minimum(start_y, end_y) <= point_y) & (point_y <= np.maximum(start_y, end_y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distances = start_x + (point_y - start_y) * (end_x - start_x) / height - point_x
+    hits = spans & ((distances > 0) if strict else (distances >= 0))
+    return float(distances[hits].min()) if hits.any() else np.inf
+
 
 class Solution:
     """
     A class representing a solution for packing shapes into a container.
 
+    The placed shapes are stored as parallel NumPy arrays of prototype ids, copy numbers and offsets. Clones share these
+    arrays, and the placement index, until one of them is modified.
+
     Attributes:
         Type (str): The type of the solution.
         Name (str): The name of the instance.
         Meta (dict[str:str]): Metadata associated with the solution.
         Container (Container): The container in which the shapes are packed.
-        Shapes (list[Shape]): A list of shapes included in the solution.
+        Container_Context (ContainerContext): The container's cached geometry. Shared between clones.
+        Prototypes (dict[int, ShapePrototype]): The prototypes of the placed shapes, by id. Shared between clones.
+        Prototype_ids (np.ndarray): The prototype id of each placed shape.
+        Copies (np.ndarray): The copy number of each placed shape.
+        X_offsets (np.ndarray): The x offset of each placed shape.
+        Y_offsets (np.ndarray): The y offset of each placed shape.
+        Placement_Index (SpatialIndex): A spatial index over the bounding boxes of the placed shapes, keyed by shape index.
+        Occupancy_Grid (OccupancyGrid): A coarse raster of the cells covered by the placed shapes, to reject overlapping
+            candidates of can_place before the exact checks, or None until can_place first needs it.
+        Free_Space (FreeSpace): The connected components of the container's free space, to skip shapes too large for all of them.
+        Layout_Version (int): The number of times space was freed by removing or moving a shape. Adding shapes keeps the version.
     """
 
-    def __init__(self, type: str, name: str, meta: dict[str:str], cont: Container, shapes: list[Shape]):
+    def __init__(self, type: str, name: str, meta: dict[str:str], cont: Container, shapes: list[Shape], context: ContainerContext = None):
         """
         Initializes the Solution class with type, name, metadata, container, and shapes.
 
@@ -27,13 +112,78 @@ class Solution:
             name (str): The name of the instance.
             meta (dict[str:str]): Metadata associated with the solution.
             cont (Container): The container in which the shapes are packed.
-            shapes (list[Shape]): A list of shapes included in the solution.
+            shapes (list[Shape]): A list of shapes included in the solution, at their current offsets.
+            context (ContainerContext): The container's cached geometry. Built from the container if not given.
         """
         self.Type = type
         self.Name = name
         self.Meta = meta
         self.Container = cont
-        self.Shapes = shapes
+        self.Container_Context = ContainerContext(cont) if context is None else context
+        self.Prototypes = {}
+        capacity = max(INITIAL_CAPACITY, len(shapes))
+        self._prototype_ids = np.empty(capacity, dtype=np.int32)
+        self._copies = np.empty(capacity, dtype=np.int32)
+        self._x_offsets = np.empty(capacity, dtype=np.int64)
+        self._y_offsets = np.empty(capacity, dtype=np.int64)
+        self._size = 0
+        self._positions = {}
+        self._polygons = {}
+        self._grade = 0
+        self._area = 0.0
+        self._misfits = {}
+        self._forbidden_regions = {}
+        self.Layout_Version = 0
+        self._owned = True
+        self.Placement_Index = SpatialIndex(self.get_index_cell_size())
+        self.Occupancy_Grid = None
+        self.Free_Space = FreeSpace(self.Container_Context)
+        for shape in shapes:
+            self.add_shape(shape)
+
+    @property
+    def Prototype_ids(self) -> np.ndarray:  # noqa: N802
+        return self._prototype_ids[:self._size]
+
+    @property
+    def Copies(self) -> np.ndarray:  # noqa: N802
+        return self._copies[:self._size]
+
+    @property
+    def X_offsets(self) -> np.ndarray:  # noqa: N802
+        return self._x_offsets[:self._size]
+
+    @property
+    def Y_offsets(self) -> np.ndarray:  # noqa: N802
+        return self._y_offsets[:self._size]
+
+    @property
+    def Shapes(self) -> list[Shape]:  # noqa: N802
+        """
+        The placed shapes, as new Shape objects carrying their offsets. Changing them does not change the solution.
+        """
+        return self.get_shapes()
+
+    def get_shapes(self, start: int = 0) -> list[Shape]:
+        """
+        Returns the placed shapes from a position on, in the order they were added since space was last freed.
+
+        Args:
+            start (int): The position of the first shape to return.
+
+        Returns:
+            list[Shape]: New Shape objects carrying the shapes' offsets.
+        """
+        return [Shape(self.Prototypes[prototype_id], copy_number, x_offset, y_offset)
+                for prototype_id, copy_number, x_offset, y_offset
+                in zip(self.Prototype_ids[start:].tolist(), self.Copies[start:].tolist(), self.X_offsets[start:].tolist(),
+                       self.Y_offsets[start:].tolist())]
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, shape: Shape):
+        return shape.Index in self._positions
 
     def __str__(self):
         """
@@ -42,11 +192,92 @@ class Solution:
         Returns:
             str: A string representing the solution's details.
         """
-        str_representation = f"Selected {len(self.Shapes)} shapes. Total value: {self.grade()}\n"
+        str_representation = f"Selected {len(self)} shapes. Total value: {self.grade()}\n"
         for shape in self.Shapes:
             str_representation += f"{shape}\n"
         return str_representation
 
+    def clone(self) -> "Solution":
+        """
+        Creates a copy of the solution that shares its arrays, placement index, occupancy grid and free space until either of them
+        is modified.
+
+        Returns:
+            Solution: The copy of the solution.
+        """
+        copy_solution = Solution.__new__(Solution)
+        copy_solution.__dict__.update(self.__dict__)
+        self._owned = False
+        copy_solution._owned = False
+        return copy_solution
+
+    def _own(self) -> None:
+        """
+        Makes private copies of the arrays, the placement index, the occupancy grid and the free space shared with other clones
+        before modifying them.
+        """
+        if self._owned:
+            return
+        self._prototype_ids = self._prototype_ids.copy()
+        self._copies = self._copies.copy()
+        self._x_offsets = self._x_offsets.copy()
+        self._y_offsets = self._y_offsets.copy()
+        self._positions = dict(self._positions)
+        self._polygons = dict(self._polygons)
+        self._misfits = dict(self._misfits)
+        self._forbidden_regions = dict(self._forbidden_regions)
+        self.Placement_Index = self.Placement_Index.copy()
+        if self.Occupancy_Grid is not None:
+            self.Occupancy_Grid = self.Occupancy_Grid.copy()
+        self.Free_Space = self.Free_Space.copy()
+        self._owned = True
+
+    def _grow(self) -> None:
+        """
+        Doubles the capacity of the arrays.
+        """
+        capacity = 2 * len(self._prototype_ids)
+        for name in ("_prototype_ids", "_copies", "_x_offsets", "_y_offsets"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def get_placement(self, canonical: bool = False) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns a compact copy of the placed shapes, cheap to send between processes.
+
+        Args:
+            canonical (bool): Whether to sort the shapes by prototype id and copy number, so that the same layout always gives the
+                same arrays whatever order its shapes were added in.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The prototype ids, copy numbers, x offsets and y offsets of the
+            placed shapes.
+        """
+        if canonical:
+            order = np.lexsort((self.Copies, self.Prototype_ids))
+            return self.Prototype_ids[order], self.Copies[order], self.X_offsets[order], self.Y_offsets[order]
+        return self.Prototype_ids.copy(), self.Copies.copy(), self.X_offsets.copy(), self.Y_offsets.copy()
+
+    def get_shape_polygon(self, index: tuple[int, int]) -> Polygon:
+        """
+        Returns the polygon of a placed shape, translating its prototype's polygon on first use and caching it until the shape moves.
+
+        Args:
+            index (tuple[int, int]): The index of the placed shape.
+
+        Returns:
+            Polygon: A Shapely Polygon object of the placed shape.
+        """
+        polygon = self._polygons.get(index)
+        if polygon is None:
+            position = self._positions[index]
+            prototype = self.Prototypes[int(self._prototype_ids[position])]
+            polygon = prototype.get_polygon(int(self._x_offsets[position]), int(self._y_offsets[position]))
+            self._polygons[index] = polygon
+        return polygon
+
     def export_to_json(self) -> json:
         """
         Serializes the solution to a JSON-compatible dictionary.
@@ -54,13 +285,13 @@ class Solution:
         Returns:
             dict: A dictionary containing the solution's type, name, number of included items, metadata, item indices, and translations.
         """
-        item_indices = [str(item.Index).split('_')[0] for item in self.Shapes]
-        y_translations = [item.Y_offset for item in self.Shapes]
-        x_translations = [item.X_offset for item in self.Shapes]
+        item_indices = [str(prototype_id) for prototype_id in self.Prototype_ids.tolist()]
+        y_translations = self.Y_offsets.tolist()
+        x_translations = self.X_offsets.tolist()
         json_data = {
             "type": self.Type,
             "instance_name": self.Name,
-            "num_included_items": len(self.Shapes),
+            "num_included_items": len(self),
             "meta": self.Meta,
             "item_indices": item_indices,
             "x_translations": x_translations,
@@ -68,6 +299,310 @@ class Solution:
         }
         return json_data
 
+    def get_index_cell_size(self) -> float:
+        """
+        Calculates the grid cell size of the placement index from the container's extent.
+
+        Returns:
+            float: The side length of a grid cell.
+        """
+        min_x, min_y, max_x, max_y = self.Container_Context.Bounds
+        width = max_x - min_x
+        height = max_y - min_y
+        return max(width, height, 1) / INDEX_GRID_RESOLUTION
+
+    def add_shape(self, shape: Shape, x_offset: int = None, y_offset: int = None) -> None:
+        """
+        Adds a shape to the solution, the placement index and the occupancy grid.
+
+        Args:
+            shape (Shape): The shape to add.
+            x_offset (int): The x offset to place the shape at. Defaults to the shape's own offset.
+            y_offset (int): The y offset to place the shape at. Defaults to the shape's own offset.
+
+        Raises:
+            Exception: If the shape is already part of the solution.
+        """
+        if shape.Index in self._positions:
+            raise Exception(f"Shape {shape.Index} is already part of the solution")
+        x_offset = int(shape.X_offset if x_offset is None else x_offset)
+        y_offset = int(shape.Y_offset if y_offset is None else y_offset)
+        self._own()
+        if self._size == len(self._prototype_ids):
+            self._grow()
+        prototype = shape.Prototype
+        self.Prototypes.setdefault(prototype.Id, prototype)
+        position = self._size
+        self._prototype_ids[position] = prototype.Id
+        self._copies[position] = shape.Copy
+        self._x_offsets[position] = x_offset
+        self._y_offsets[position] = y_offset
+        self._positions[shape.Index] = position
+        self._size += 1
+        self._grade += prototype.real_value
+        self._area += prototype.Area
+        self.Placement_Index.insert(shape.Index, prototype.get_bounds(x_offset, y_offset))
+        if self.Occupancy_Grid is not None:
+            self.Occupancy_Grid.insert(prototype, x_offset, y_offset)
+        self.Free_Space.record(True, prototype, x_offset, y_offset)
+
+    def remove_shape(self, shape: Shape) -> None:
+        """
+        Removes a shape from the solution, the placement index and the occupancy grid.
+
+        Args:
+            shape (Shape): The shape to remove.
+        """
+        self._own()
+        position = self._positions.pop(shape.Index)
+        prototype = self.Prototypes[shape.Prototype.Id]
+        if self.Occupancy_Grid is not None:
+            self.Occupancy_Grid.remove(prototype, int(self._x_offsets[position]), int(self._y_offsets[position]))
+        self.Free_Space.record(False, prototype, int(self._x_offsets[position]), int(self._y_offsets[position]))
+        for name in ("_prototype_ids", "_copies", "_x_offsets", "_y_offsets"):
+            array = getattr(self, name)
+            array[position:self._size - 1] = array[position + 1:self._size]
+        self._size -= 1
+        for index, later_position in self._positions.items():
+            if later_position > position:
+                self._positions[index] = later_position - 1
+        self._grade -= prototype.real_value
+        self._area -= prototype.Area
+        self._polygons.pop(shape.Index, None)
+        self.Placement_Index.remove(shape.Index)
+        self.Layout_Version += 1
+
+    def move_shape(self, shape: Shape, x_offset: int, y_offset: int) -> None:
+        """
+        Moves a shape of the solution to new offsets and updates the placement index and the occupancy grid.
+
+        Args:
+            shape (Shape): The shape to move. Its own offsets are updated as well.
+            x_offset (int): The new x offset of the shape.
+            y_offset (int): The new y offset of the shape.
+        """
+        self._own()
+        x_offset, y_offset = int(x_offset), int(y_offset)
+        position = self._positions[shape.Index]
+        if self.Occupancy_Grid is not None:
+            self.Occupancy_Grid.remove(shape.Prototype, int(self._x_offsets[position]), int(self._y_offsets[position]))
+            self.Occupancy_Grid.insert(shape.Prototype, x_offset, y_offset)
+        self.Free_Space.record(False, shape.Prototype, int(self._x_offsets[position]), int(self._y_offsets[position]))
+        self.Free_Space.record(True, shape.Prototype, x_offset, y_offset)
+        self._x_offsets[position] = x_offset
+        self._y_offsets[position] = y_offset
+        shape.X_offset = x_offset
+        shape.Y_offset = y_offset
+        self._polygons.pop(shape.Index, None)
+        self.Placement_Index.move(shape.Index, shape.Prototype.get_bounds(x_offset, y_offset))
+        self.Layout_Version += 1
+
+    def can_place(self, shape: Shape, dx: int, dy: int) -> bool:
+        """
+        Checks whether a shape placed at the given offsets lies inside the container and does not intersect any other shape of the solution.
+
+        Candidates covering a cell of the occupancy grid that a placed shape covers are rejected without exact checks. Otherwise
+        only the shapes whose bounding boxes overlap the candidate's bounding box are tested exactly. The grid pays off for
+        offsets sampled at random, many of which overlap a placed shape, and is built on the first such check.
+        The shape itself is ignored if it is already part of the solution, so this can also be used to test a move. The occupancy
+        grid is then skipped, since it does not tell the shape's own cells apart.
+
+        Args:
+            shape (Shape): The shape to place.
+            dx (int): The candidate x offset of the shape.
+            dy (int): The candidate y offset of the shape.
+
+        Returns:
+            bool: True if the shape can be placed at the given offsets, False otherwise.
+        """
+        with INSTRUMENTATION.timer("can_place"):
+            if shape.Index not in self._positions and self.get_occupancy_grid().get_blocked(shape.Prototype, np.array([dx]), np.array([dy]))[0]:
+                INSTRUMENTATION.count("occupancy_grid.rejected")
+                return False
+            candidate_polygon = shape.Prototype.get_polygon(dx, dy)
+            if not self.Container_Context.contains(candidate_polygon):
+                return False
+            neighbours = self.Placement_Index.query(candidate_polygon.bounds)
+            neighbours.discard(shape.Index)
+            for neighbour in neighbours:
+                if candidate_polygon.intersects(self.get_shape_polygon(neighbour)):
+                    return False
+            return True
+
+    def get_occupancy_grid(self) -> OccupancyGrid:
+        """
+        Returns the occupancy grid, building it from the placed shapes on first use. It is kept up to date from then on.
+
+        Returns:
+            OccupancyGrid: The occupancy grid of the solution.
+        """
+        if self.Occupancy_Grid is None:
+            self.Occupancy_Grid = OccupancyGrid(self.Container_Context)
+            for position in range(self._size):
+                prototype = self.Prototypes[int(self._prototype_ids[position])]
+                self.Occupancy_Grid.insert(prototype, int(self._x_offsets[position]), int(self._y_offsets[position]))
+        return self.Occupancy_Grid
+
+    def can_fit(self, shape: Shape) -> bool:
+        """
+        Checks whether a shape that is not part of the solution may fit somewhere: whether its area fits in the remaining area, and
+        the core of its polygon in one connected component of the free space.
+
+        Args:
+            shape (Shape): The shape to check.
+
+        Returns:
+            bool: False if the shape surely cannot be placed, True if it may fit.
+        """
+        if shape.get_area() > self.get_remaining_area_in_container():
+            return False
+        self.Free_Space.update(lambda: [self.get_shape_polygon(index) for index in self._positions],
+                               lambda bounds: [self.get_shape_polygon(index) for index in self.Placement_Index.query(bounds)])
+        return self.Free_Space.can_fit(shape.Prototype)
+
+    def is_known_misfit(self, shape: Shape, search: str) -> bool:
+        """
+        Checks whether a search for a position already failed for a shape of the same geometry since space was last freed. Only
+        shapes were added since, so the layout is the same or fuller.
+
+        This is a heuristic. A fuller layout never has more room, but its forbidden region has new vertices, and a search that
+        only tries positions near the vertices may find a position it missed before.
+
+        Args:
+            shape (Shape): The shape to check.
+            search (str): The search, such as the corner it places shapes closest to. Each search has its own record.
+
+        Returns:
+            bool: True if the search is known to fail for the shape's geometry, False otherwise.
+        """
+        return self._misfits.get((search, shape.get_geometry_key())) == self.Layout_Version
+
+    def record_misfit(self, shape: Shape, search: str) -> None:
+        """
+        Records that a search for a position failed for a shape, until space is next freed. Clones sharing the record share the
+        layout as well, so it holds for them too.
+
+        Args:
+            shape (Shape): The shape that could not be placed.
+            search (str): The search that failed.
+        """
+        self._misfits[(search, shape.get_geometry_key())] = self.Layout_Version
+
+    def get_cached_forbidden_region(self, geometry_key: int) -> tuple[int, object]:
+        """
+        Returns the forbidden region of a geometry cached since space was last freed. Shapes are only appended in between, so the
+        region is brought up to date by adding the NFPs of the shapes placed after the cached count.
+
+        Args:
+            geometry_key (int): The geometry of the shape being placed.
+
+        Returns:
+            tuple[int, Geometry]: The number of placed shapes the region covers and the region, or (0, None) if nothing is cached.
+        """
+        version, count, region = self._forbidden_regions.get(geometry_key, (None, 0, None))
+        if version != self.Layout_Version:
+            return 0, None
+        return count, region
+
+    def cache_forbidden_region(self, geometry_key: int, count: int, region) -> None:
+        """
+        Caches the forbidden region of a geometry, covering the first placed shapes, until space is next freed. Clones sharing the
+        cache share the layout as well, so it holds for them too.
+
+        Args:
+            geometry_key (int): The geometry of the shape being placed.
+            count (int): The number of placed shapes the region covers.
+            region (Geometry): The union of their NFPs, translated to their offsets.
+        """
+        self._forbidden_regions[geometry_key] = (self.Layout_Version, count, region)
+
+    def can_place_many(self, shape: Shape, x_offsets: np.ndarray, y_offsets: np.ndarray) -> np.ndarray:
+        """
+        Checks, for a batch of candidate offsets, whether the shape placed there lies inside the container and does not intersect
+        any other shape of the solution. Works like can_place, but the exact checks run as Shapely array operations. The
+        candidates come from the vertices of the no-fit polygons, which rarely overlap a placed shape, so the occupancy grid is
+        not checked.
+
+        Args:
+            shape (Shape): The shape to place.
+            x_offsets (np.ndarray): The candidate x offsets of the shape.
+            y_offsets (np.ndarray): The candidate y offsets of the shape.
+
+        Returns:
+            np.ndarray: A boolean array, True where the shape can be placed.
+        """
+        INSTRUMENTATION.count("can_place_many.candidates", len(x_offsets))
+        with INSTRUMENTATION.timer("can_place_many"):
+            candidate_polygons = shape.Prototype.get_polygons(x_offsets, y_offsets)
+            feasible = shapely.contains(self.Container_Context.Prepared_Polygon.get(), candidate_polygons)
+            candidate_indices = []
+            neighbour_polygons = []
+            for i in np.flatnonzero(feasible).tolist():
+                neighbours = self.Placement_Index.query(shape.Prototype.get_bounds(int(x_offsets[i]), int(y_offsets[i])))
+                neighbours.discard(shape.Index)
+                for neighbour in neighbours:
+                    candidate_indices.append(i)
+                    neighbour_polygons.append(self.get_shape_polygon(neighbour))
+            if candidate_indices:
+                candidate_indices = np.array(candidate_indices)
+                overlapping = shapely.intersects(candidate_polygons[candidate_indices], np.array(neighbour_polygons, dtype=object))
+                feasible[candidate_indices[overlapping]] = False
+            return feasible
+
+    def get_slide_distance(self, shape: Shape, direction: tuple[int, int]) -> int:
+        """
+        Calculates how far a placed shape can slide along an axis before it touches another shape or leaves the container.
+
+        Rays are cast from the vertices of the shape along the direction of motion, and from the vertices of the container and of
+        the neighbours in the swept area against it, so the distance is found in one pass instead of by probing offsets.
+        Touching another shape counts as an overlap, while touching the container's boundary is allowed.
+        A vertex lying on the container's boundary is not stopped by it, so the result should be confirmed with can_place.
+
+        Args:
+            shape (Shape): A shape of the solution.
+            direction (tuple[int, int]): The direction of motion, one of (1, 0), (-1, 0), (0, 1) and (0, -1).
+
+        Returns:
+            int: The largest whole distance the shape can slide, or 0 if it cannot move.
+        """
+        polygon = self.get_shape_polygon(shape.Index)
+        min_x, min_y, max_x, max_y = polygon.bounds
+        container_min_x, container_min_y, container_max_x, container_max_y = self.Container_Context.Bounds
+        x_sign, y_sign = direction
+        if x_sign:
+            limit = container_max_x - max_x if x_sign > 0 else min_x - container_min_x
+        else:
+            limit = container_max_y - max_y if y_sign > 0 else min_y - container_min_y
+        if limit <= 0:
+            return 0
+
+        vertices, starts, ends = _ring_edges(polygon)
+        vertices, starts, ends = (_to_motion_frame(coords, direction) for coords in (vertices, starts, ends))
+        # Seen from the other polygon, the shape's edges come towards it, so its rays are cast towards negative x
+        flip = np.array([-1, 1])
+
+        container_vertices, container_starts, container_ends = _ring_edges(self.Container_Context.Polygon)
+        container_vertices, container_starts, container_ends = (_to_motion_frame(coords, direction)
+                                                                for coords in (container_vertices, container_starts, container_ends))
+        container_distance = min(_first_hit(vertices, container_starts, container_ends, True),
+                                 _first_hit(container_vertices * flip, starts * flip, ends * flip, True))
+        slide = min(limit, math.floor(container_distance + SLIDE_TOLERANCE)) if np.isfinite(container_distance) else limit
+
+        swept_bounds = (min_x + min(x_sign, 0) * slide, min_y + min(y_sign, 0) * slide,
+                        max_x + max(x_sign, 0) * slide, max_y + max(y_sign, 0) * slide)
+        neighbours = self.Placement_Index.query(swept_bounds)
+        neighbours.discard(shape.Index)
+        if neighbours:
+            neighbour_polygons = np.array([self.get_shape_polygon(neighbour) for neighbour in neighbours], dtype=object)
+            neighbour_vertices, neighbour_starts, neighbour_ends = _ring_edges(neighbour_polygons)
+            neighbour_vertices, neighbour_starts, neighbour_ends = (_to_motion_frame(coords, direction)
+                                                                    for coords in (neighbour_vertices, neighbour_starts, neighbour_ends))
+            neighbour_distance = min(_first_hit(vertices, neighbour_starts, neighbour_ends, False),
+                                     _first_hit(neighbour_vertices * flip, starts * flip, ends * flip, False))
+            if np.isfinite(neighbour_distance):
+                slide = min(slide, math.ceil(neighbour_distance - SLIDE_TOLERANCE) - 1)
+        return int(max(slide, 0))
+
     def is_valid(self) -> bool:
         """
         Validates the solution by checking if all shapes are within the container and do not overlap.
@@ -75,14 +610,12 @@ class Solution:
         Returns:
             bool: True if the solution is valid, False otherwise.
         """
-        container_polygon = Polygon(list(zip(self.Container.X_cor, self.Container.Y_cor)))
-        for item1 in self.Shapes:
-            item1_polygon = item1.create_polygon_object()
-            if not container_polygon.contains(item1_polygon):
+        polygons = {index: self.get_shape_polygon(index) for index in self._positions}
+        for index, item_polygon in polygons.items():
+            if not self.Container_Context.contains(item_polygon):
                 return False
-            for item2 in self.Shapes:
-                item2_polygon = item2.create_polygon_object()
-                if item1 != item2 and item1_polygon.intersects(item2_polygon):
+            for neighbour in self.Placement_Index.query(item_polygon.bounds):
+                if neighbour != index and item_polygon.intersects(polygons[neighbour]):
                     return False
         return True
 
@@ -94,7 +627,7 @@ class Solution:
         ax.cla()
 
         # Set title with data about the solution
-        ax.set_title(f"Solution: {self.Name}\nValue of solution: {self.grade():,}\nNumber of shapes: {len(self.Shapes)}")
+        ax.set_title(f"Solution: {self.Name}\nValue of solution: {self.grade():,}\nNumber of shapes: {len(self)}")
 
         # Plot the container
         container_polygon = patches.Polygon(list(zip(self.Container.X_cor, self.Container.Y_cor)), closed=True,
@@ -102,8 +635,8 @@ class Solution:
         ax.add_patch(container_polygon)
 
         # Collect all coordinates for container and items
-        all_x_coords = self.Container.X_cor[:]
-        all_y_coords = self.Container.Y_cor[:]
+        all_x_coords = list(self.Container.X_cor)
+        all_y_coords = list(self.Container.Y_cor)
 
         for shape in self.Shapes:
             item_x, item_y = shape.get_real_coords()
@@ -123,15 +656,12 @@ class Solution:
 
     def grade(self) -> int:
         """
-        Calculates the total value of the solution by summing the values of all included shapes.
+        Returns the total value of the solution, the sum of the values of all included shapes.
 
         Returns:
             int: The total value of the solution.
         """
-        grade = 0
-        for shape in self.Shapes:
-            grade += shape.real_value
-        return grade
+        return self._grade
 
     def get_remaining_area_in_container(self) -> float:
         """
@@ -140,7 +670,4 @@ class Solution:
         Returns:
             float: The remaining area in the container.
         """
-        remaining_area = self.Container.get_area()
-        for item in self.Shapes:
-            remaining_area -= item.get_area()
-        return remaining_area
+        return self.Container_Context.Area - self._area
@@ -0,0 +1,126 @@
+import math
+
+
+class SpatialIndex:
+    """
+    A dynamic uniform-grid index over axis-aligned bounding boxes.
+
+    Unlike Shapely's STRtree, which is immutable once built, this index supports inserting, removing and moving a single entry,
+    which is what incremental placement needs.
+
+    Attributes:
+        Cell_Size (float): The side length of a grid cell.
+        Cells (dict[tuple[int, int], set]): Maps a grid cell to the keys of the entries whose bounding box touches it.
+        Bounds (dict): Maps an entry key to its bounding box (minx, miny, maxx, maxy).
+    """
+
+    def __init__(self, cell_size: float):
+        """
+        Initializes an empty index.
+
+        Args:
+            cell_size (float): The side length of a grid cell.
+
+        Raises:
+            Exception: If the cell size is not positive.
+        """
+        if cell_size <= 0:
+            raise Exception("Cell size must be positive")
+        self.Cell_Size = cell_size
+        self.Cells = {}
+        self.Bounds = {}
+
+    def __len__(self):
+        return len(self.Bounds)
+
+    def __contains__(self, key):
+        return key in self.Bounds
+
+    def copy(self) -> "SpatialIndex":
+        """
+        Creates an independent copy of the index.
+
+        Returns:
+            SpatialIndex: The copy of the index.
+        """
+        index_copy = SpatialIndex(self.Cell_Size)
+        index_copy.Cells = {cell: set(bucket) for cell, bucket in self.Cells.items()}
+        index_copy.Bounds = dict(self.Bounds)
+        return index_copy
+
+    def _cell_range(self, bounds: tuple[float, float, float, float]):
+        """
+        Yields every grid cell touched by a bounding box.
+
+        Args:
+            bounds (tuple[float, float, float, float]): The bounding box (minx, miny, maxx, maxy).
+        """
+        minx, miny, maxx, maxy = bounds
+        for i in range(math.floor(minx / self.Cell_Size), math.floor(maxx / self.Cell_Size) + 1):
+            for j in range(math.floor(miny / self.Cell_Size), math.floor(maxy / self.Cell_Size) + 1):
+                yield i, j
+
+    def insert(self, key, bounds: tuple[float, float, float, float]) -> None:
+        """
+        Inserts an entry into the index.
+
+        Args:
+            key: A hashable key identifying the entry.
+            bounds (tuple[float, float, float, float]): The bounding box (minx, miny, maxx, maxy) of the entry.
+
+        Raises:
+            Exception: If the key is already in the index.
+        """
+        if key in self.Bounds:
+            raise Exception(f"Key {key} is already in the index")
+        self.Bounds[key] = bounds
+        for cell in self._cell_range(bounds):
+            self.Cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key) -> None:
+        """
+        Removes an entry from the index.
+
+        Args:
+            key: The key of the entry to remove.
+        """
+        bounds = self.Bounds.pop(key)
+        for cell in self._cell_range(bounds):
+            bucket = self.Cells[cell]
+            bucket.discard(key)
+            if not bucket:
+                del self.Cells[cell]
+
+    def move(self, key, bounds: tuple[float, float, float, float]) -> None:
+        """
+        Updates the bounding box of an entry already in the index.
+
+        Args:
+            key: The key of the entry to move.
+            bounds (tuple[float, float, float, float]): The new bounding box of the entry.
+        """
+        self.remove(key)
+        self.insert(key, bounds)
+
+    def query(self, bounds: tuple[float, float, float, float]) -> set:
+        """
+        Finds the entries whose bounding box intersects the given bounding box.
+
+        Args:
+            bounds (tuple[float, float, float, float]): The query bounding box (minx, miny, maxx, maxy).
+
+        Returns:
+            set: The keys of the intersecting entries.
+        """
+        minx, miny, maxx, maxy = bounds
+        candidates = set()
+        for cell in self._cell_range(bounds):
+            bucket = self.Cells.get(cell)
+            if bucket:
+                candidates.update(bucket)
+        result = set()
+        for key in candidates:
+            b_minx, b_miny, b_maxx, b_maxy = self.Bounds[key]
+            if b_minx <= maxx and minx <= b_maxx and b_miny <= maxy and miny <= b_maxy:
+                result.add(key)
+        return result
@@ -1,17 +1,30 @@
+import hashlib
 import json
 import logging
+import os
+import tempfile
+import numpy as np
 from utils.Container import Container
-from utils.Shape import Shape
+from utils.ShapeCatalog import ShapeCatalog
+from utils.SharedCoordinateStore import SharedCoordinateStore
 
-def load_json_from_file(file_path: str) -> tuple[Container, list[Shape]]:
+# Where converted instances are cached, and the chunk size used to hash instance files
+INSTANCE_CACHE_DIR = "./instance_cache"
+HASH_CHUNK_SIZE = 1 << 20
+# The version of the layout of cached conversions. Changing the conversion needs a new version, which keys new conversions.
+CACHE_FORMAT_VERSION = 1
+
+def load_json_from_file(file_path: str) -> tuple[Container, ShapeCatalog]:
     """
-    Loads JSON data from a file and parses it into a Container and a list of Shapes.
+    Loads JSON data from a file and parses it into a Container and a catalog of Shapes.
+
+    Every item type is stored once as a prototype, and the catalog holds one lightweight Shape per copy.
 
     Args:
         file_path (str): The path to the JSON file.
 
     Returns:
-        tuple[Container, list[Shape]]: A tuple containing the Container and a list of Shapes.
+        tuple[Container, ShapeCatalog]: A tuple containing the Container and the catalog of Shapes, which behaves like a list of Shapes.
 
     Raises:
         FileNotFoundError: If the file at the specified path is not found.
@@ -20,15 +33,9 @@ def load_json_from_file(file_path: str) -> tuple[Container, list[Shape]]:
     try:
         with open(file_path, 'r') as file:
             json_data = json.load(file)
-            shapes_data = json_data['items']
-            shapes_list = []
             cont = Container(json_data['container']['x'], json_data['container']['y'], json_data['instance_name'])
-            for index, item in enumerate(shapes_data):
-                quantity = item['quantity']
-                if quantity > 0:
-                    for i in range(quantity):
-                        shapes_list.append(Shape(item['x'], item['y'], 1, item['value'], f"{index}_{i}"))
-            return cont, shapes_list
+            catalog = ShapeCatalog.from_json(json_data['items'])
+            return cont, catalog
 
     except FileNotFoundError:
         logging.error(f"File not found: {file_path}")
@@ -36,3 +43,168 @@ def load_json_from_file(file_path: str) -> tuple[Container, list[Shape]]:
     except json.JSONDecodeError as e:
         logging.error(f"Error decoding JSON from {file_path}: {e}")
         return None
+
+
+def get_instance_cache_path(file_path: str, cache_dir: str = INSTANCE_CACHE_DIR) -> str:
+    """
+    Returns where the conversion of an instance file is cached. The path is keyed by a hash of CACHE_FORMAT_VERSION and the
+    file's content, so an edited file, or a file cached in an older format, is converted again.
+
+    Hashing a large file on every load is slow, so the hash is remembered under the file's path, size and modification time, and
+    the content is only hashed again when one of them changes.
+
+    Args:
+        file_path (str): The path to the JSON file.
+        cache_dir (str): The directory of the cache.
+
+    Returns:
+        str: The path of the conversion, without extension. The arrays are stored in a .npy file and their layout in a .json file.
+    """
+    stat = os.stat(file_path)
+    stat_key = f"{CACHE_FORMAT_VERSION}|{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    stat_path = os.path.join(cache_dir, "stat", hashlib.blake2b(stat_key.encode(), digest_size=16).hexdigest())
+    try:
+        with open(stat_path, 'r') as file:
+            return os.path.join(cache_dir, file.read())
+    except FileNotFoundError:
+        pass
+    digest = hashlib.blake2b(f"{CACHE_FORMAT_VERSION}|".encode(), digest_size=16)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    write_atomically(stat_path, lambda file: file.write(digest.hexdigest()))
+    return os.path.join(cache_dir, digest.hexdigest())
+
+
+def cache_instance(file_path: str, cache_dir: str = INSTANCE_CACHE_DIR) -> str:
+    """
+    Converts an instance file to flat int64 arrays in a raw .npy file, unless it is cached already. The arrays are laid out like
+    a SharedCoordinateStore, and a .json file next to it holds their layout, the instance name, the number of items and the
+    format version.
+
+    Args:
+        file_path (str): The path to the JSON file.
+        cache_dir (str): The directory of the cache.
+
+    Returns:
+        str: The path of the conversion, without extension, or None if the file could not be loaded.
+    """
+    cache_path = get_instance_cache_path(file_path, cache_dir)
+    # The metadata is written last, so a conversion is complete if it exists
+    if os.path.exists(cache_path + ".json") and read_instance_cache_metadata(cache_path).get("format_version") == CACHE_FORMAT_VERSION:
+        return cache_path
+    instance_data = load_json_from_file(file_path)
+    if instance_data is None:
+        return None
+    cont, shapes = instance_data
+    arrays = SharedCoordinateStore.get_arrays(shapes, cont)
+    metadata = {"format_version": CACHE_FORMAT_VERSION, "instance_name": cont.Instance_Name, "source": file_path, "items": len(shapes),
+                "layout": SharedCoordinateStore.get_layout(arrays)}
+    buffer = np.concatenate(list(arrays.values())) if arrays else np.zeros(0, dtype=np.int64)
+    write_atomically(cache_path + ".npy", lambda file: np.save(file, buffer), binary=True)
+    write_json_atomically(metadata, cache_path + ".json")
+    logging.info(f"Cached {file_path} as {cache_path}")
+    return cache_path
+
+
+def read_instance_cache_metadata(cache_path: str) -> dict:
+    """
+    Reads the metadata of a cached instance.
+
+    Args:
+        cache_path (str): The path of the conversion, without extension.
+
+    Returns:
+        dict: The format version, the instance name, the source file, the number of items and the layout of the arrays.
+    """
+    with open(cache_path + ".json", 'r') as file:
+        return json.load(file)
+
+
+def load_cached_instance(cache_path: str) -> tuple[Container, ShapeCatalog]:
+    """
+    Loads a cached instance by memory-mapping its arrays. The prototypes' coordinates are views of the mapped file, so nothing is
+    parsed or copied, and processes loading the same instance share its pages.
+
+    Args:
+        cache_path (str): The path of the conversion, without extension.
+
+    Returns:
+        tuple[Container, ShapeCatalog]: A tuple containing the Container and the catalog of Shapes.
+
+    Raises:
+        Exception: If the conversion was written in another format.
+    """
+    metadata = read_instance_cache_metadata(cache_path)
+    if metadata.get("format_version") != CACHE_FORMAT_VERSION:
+        raise Exception(f"Cached instance {cache_path} has format version {metadata.get('format_version')}, expected {CACHE_FORMAT_VERSION}")
+    buffer = np.load(cache_path + ".npy", mmap_mode='r').view(np.ndarray)
+    arrays = {name: buffer[start:start + length] for name, (start, length) in metadata["layout"].items()}
+    cont = Container(arrays["container_x"].tolist(), arrays["container_y"].tolist(), metadata["instance_name"])
+    return cont, ShapeCatalog.from_arrays(arrays)
+
+
+def load_instance(file_path: str, cache_dir: str = INSTANCE_CACHE_DIR) -> tuple[Container, ShapeCatalog]:
+    """
+    Loads an instance file through the instance cache: it is converted on first use, and memory-mapped from then on.
+
+    Args:
+        file_path (str): The path to the JSON file.
+        cache_dir (str): The directory of the cache.
+
+    Returns:
+        tuple[Container, ShapeCatalog]: A tuple containing the Container and the catalog of Shapes, or None if the file could not
+        be loaded.
+    """
+    cache_path = cache_instance(file_path, cache_dir)
+    if cache_path is None:
+        return None
+    return load_cached_instance(cache_path)
+
+
+def write_atomically(file_path: str, write, binary: bool = False) -> None:
+    """
+    Writes a file atomically: the content is written to a temporary file in the same directory, which then replaces the target.
+    Readers, and a run that is killed meanwhile, never see a partially written file.
+
+    Args:
+        file_path (str): The path of the file to write.
+        write (callable): Called with the open temporary file to write the content.
+        binary (bool): Whether to open the temporary file in binary mode.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, 0o644)
+        with os.fdopen(file_descriptor, 'wb' if binary else 'w') as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def write_json_atomically(json_data: dict, file_path: str) -> None:
+    """
+    Writes JSON data to a file atomically.
+
+    Args:
+        json_data (dict): The data to write.
+        file_path (str): The path of the file to write.
+    """
+    write_atomically(file_path, lambda file: json.dump(json_data, file, indent=4))
+
+
+def save_npz_atomically(arrays: dict[str, np.ndarray], file_path: str) -> None:
+    """
+    Saves NumPy arrays to a compressed .npz file atomically.
+
+    Args:
+        arrays (dict[str, np.ndarray]): The arrays to save, by name.
+        file_path (str): The path of the file to write.
+    """
+    write_atomically(file_path, lambda file: np.savez_compressed(file, **arrays), binary=True)
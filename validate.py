@@ -0,0 +1,157 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+import numpy as np
+import shapely
+from utils.Container import Container
+from utils.ShapeCatalog import ShapeCatalog
+from utils.utils import load_instance
+
+SOLUTION_TYPE = "cgshop2024_solution"
+
+def setup_logging():
+    log_file = 'validate_logs.txt'
+    if os.path.exists(log_file):
+        os.remove(log_file)
+    logging.basicConfig(filename=log_file, level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Validator of cgshop2024 solutions')
+    parser.add_argument('--instance', type=str, required=True, help='Path to instance JSON file')
+    parser.add_argument('--solution', type=str, required=True, help='Path to solution JSON file')
+    parser.add_argument('--allow-touching', action='store_true',
+                        help='Only reject items whose interiors overlap. By default touching items overlap, as in the solver')
+    parser.add_argument('--max-report', type=int, default=20, help='Most violations of each kind to print')
+    return parser.parse_args()
+
+def build_polygons(shapes: ShapeCatalog, item_indices: np.ndarray, x_translations: np.ndarray, y_translations: np.ndarray) -> np.ndarray:
+    """
+    Creates the polygons of the placed items in one vectorized call.
+
+    Args:
+        shapes (ShapeCatalog): The instance's items.
+        item_indices (np.ndarray): The item of each placement.
+        x_translations (np.ndarray): The x offset of each placement.
+        y_translations (np.ndarray): The y offset of each placement.
+
+    Returns:
+        np.ndarray: The polygon of each placement.
+    """
+    prototypes = [shapes.Prototypes[index] for index in item_indices.tolist()]
+    vertex_counts = [len(prototype.X_cor) for prototype in prototypes]
+    if not prototypes:
+        return np.empty(0, dtype=object)
+    coords = np.column_stack((np.concatenate([prototype.X_cor for prototype in prototypes]),
+                              np.concatenate([prototype.Y_cor for prototype in prototypes])))
+    coords += np.repeat(np.column_stack((x_translations, y_translations)), vertex_counts, axis=0)
+    ring_ids = np.repeat(np.arange(len(prototypes)), vertex_counts)
+    return shapely.polygons(shapely.linearrings(coords, indices=ring_ids))
+
+def validate_solution(cont: Container, shapes: ShapeCatalog, solution_data: dict, allow_touching: bool = False) -> dict[str, list]:
+    """
+    Checks a solution file against its instance: its format, the quantities of the items, that every item lies inside the
+    container, and that no two items overlap.
+
+    Overlaps are found with an STRtree over the items' bounding boxes, so only the pairs whose boxes intersect are tested exactly.
+
+    Args:
+        cont (Container): The instance's container.
+        shapes (ShapeCatalog): The instance's items.
+        solution_data (dict): The content of the solution file.
+        allow_touching (bool): Whether items may touch. By default touching counts as overlapping, as in Solution.is_valid.
+
+    Returns:
+        dict[str, list]: The violations of each kind: "format" messages, "quantity" items used too often, "outside" placements
+        not inside the container and "overlap" pairs of placements. The solution is valid if all are empty.
+    """
+    violations = {"format": [], "quantity": [], "outside": [], "overlap": []}
+    if solution_data.get("type") != SOLUTION_TYPE:
+        violations["format"].append(f"Type is {solution_data.get('type')}, expected {SOLUTION_TYPE}")
+    if solution_data.get("instance_name") != cont.Instance_Name:
+        violations["format"].append(f"Instance name is {solution_data.get('instance_name')}, expected {cont.Instance_Name}")
+    try:
+        item_indices = np.array([int(index) for index in solution_data["item_indices"]], dtype=np.int64)
+        x_translations = np.array(solution_data["x_translations"], dtype=np.int64)
+        y_translations = np.array(solution_data["y_translations"], dtype=np.int64)
+    except (KeyError, TypeError, ValueError) as e:
+        violations["format"].append(f"Unreadable placements: {e}")
+        return violations
+    if not len(item_indices) == len(x_translations) == len(y_translations):
+        violations["format"].append("item_indices, x_translations and y_translations differ in length")
+        return violations
+    if "num_included_items" in solution_data and solution_data["num_included_items"] != len(item_indices):
+        violations["format"].append(f"num_included_items is {solution_data['num_included_items']}, but {len(item_indices)} items are placed")
+    unknown = (item_indices < 0) | (item_indices >= len(shapes.Prototypes))
+    if unknown.any():
+        violations["format"].append(f"Unknown item indices: {sorted(set(item_indices[unknown].tolist()))}")
+        return violations
+
+    for index, count in sorted(Counter(item_indices.tolist()).items()):
+        if count > shapes.Prototypes[index].Quantity:
+            violations["quantity"].append((index, count, shapes.Prototypes[index].Quantity))
+
+    polygons = build_polygons(shapes, item_indices, x_translations, y_translations)
+    container_polygon = shapely.Polygon(np.column_stack((cont.X_cor, cont.Y_cor)))
+    shapely.prepare(container_polygon)
+    violations["outside"] = np.flatnonzero(~shapely.contains(container_polygon, polygons)).tolist()
+
+    # Broad phase: pairs whose bounding boxes intersect. Narrow phase: exact intersection of those pairs only.
+    tree = shapely.STRtree(polygons)
+    first, second = tree.query(polygons, predicate="intersects")
+    is_pair = first < second
+    first, second = first[is_pair], second[is_pair]
+    if allow_touching and len(first):
+        overlapping = ~shapely.touches(polygons[first], polygons[second])
+        first, second = first[overlapping], second[overlapping]
+    violations["overlap"] = list(zip(first.tolist(), second.tolist()))
+    return violations
+
+def main():
+    # Setup logging
+    setup_logging()
+
+    # Parse command-line arguments
+    args = parse_arguments()
+
+    # Load the instance and the solution
+    start_time = time.time()
+    instance_data = load_instance(args.instance)
+    if instance_data is None:
+        raise Exception(f"Could not load instance {args.instance}")
+    cont, shapes = instance_data
+    with open(args.solution, 'r') as file:
+        solution_data = json.load(file)
+
+    # Validate and report the violations
+    violations = validate_solution(cont, shapes, solution_data, args.allow_touching)
+    duration = time.time() - start_time
+    placed = len(solution_data.get("item_indices", []))
+    for kind, found in violations.items():
+        for violation in found[:args.max_report]:
+            if kind == "quantity":
+                message = f"Item {violation[0]} is placed {violation[1]} times, but its quantity is {violation[2]}"
+            elif kind == "outside":
+                message = f"Placement {violation} (item {solution_data['item_indices'][violation]}) is not inside the container"
+            elif kind == "overlap":
+                message = (f"Placements {violation[0]} and {violation[1]} (items {solution_data['item_indices'][violation[0]]} and "
+                           f"{solution_data['item_indices'][violation[1]]}) overlap")
+            else:
+                message = violation
+            print(message)
+            logging.error(message)
+        if len(found) > args.max_report:
+            print(f"... and {len(found) - args.max_report} more {kind} violations")
+    invalid = any(violations.values())
+    summary = (f"{'Invalid' if invalid else 'Valid'} solution for {cont.Instance_Name}: {placed} placements, "
+               + ", ".join(f"{len(found)} {kind}" for kind, found in violations.items()) + f" violations, checked in {duration:.3f} seconds")
+    print(summary)
+    logging.info(summary)
+    if invalid:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()